@@ -1,6 +1,19 @@
 import argparse
-import random
+import math
+import os
+import secrets
+import struct
+import time
+import zlib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import numpy as np
 from PIL import Image, ImageDraw
+# Shapes are seeded per cell of this fixed grid, so the artwork is the same whatever the tile size or number of workers
+SEED_CELL = 256
+# Triangles reach this far above their starting point
+TRIANGLE_RISE = 100
 # Define a function to generate a random color palette
 def generate_color_palette(palette_type):
     # Predefined color palettes
@@ -10,34 +23,167 @@ def generate_color_palette(palette_type):
         'monochrome': ['#000000', '#333333', '#666666', '#999999', '#CCCCCC']
     }
     return palettes.get(palette_type, ['#FFFFFF', '#000000'])
+def generate_cell_shapes(settings, cell_x, cell_y):
+    """
+    Generate every shape that starts in one seed cell, as NumPy arrays.
+    Each cell has its own random stream derived from the seed and the cell's position, so any tile can regenerate
+    exactly the shapes it needs without the others.
+    """
+    rng = np.random.default_rng([settings['seed'], cell_y, cell_x])
+    count = rng.poisson(settings['shapes_per_cell'])
+    left = cell_x * SEED_CELL
+    top = cell_y * SEED_CELL
+    x0 = rng.integers(left, min(left + SEED_CELL, settings['width']) + 1, count)
+    y0 = rng.integers(top, min(top + SEED_CELL, settings['height']) + 1, count)
+    min_size, max_size = settings['shape_size']
+    return {
+        'type': rng.integers(0, len(settings['shapes']), count),
+        'color': rng.integers(0, len(settings['palette']), count),
+        'x0': x0,
+        'y0': y0,
+        'x1': x0 + rng.integers(min_size, max_size + 1, count),
+        'y1': y0 + rng.integers(min_size, max_size + 1, count),
+        # Drawing order across cells, so overlapping shapes stack the same way in every tile
+        'z': rng.random(count),
+    }
+@lru_cache(maxsize=None)
+def shape_mask(shape_type, width, height):
+    """
+    Rasterize one shape on its own canvas, with its bounding box at the origin, and return it as a mask.
+    Drawing every shape in its own coordinates instead of the tile's means it comes out the same pixels
+    in whichever tile it lands, so the tile edges never show.
+    """
+    rise = TRIANGLE_RISE if shape_type == 'triangle' else 0
+    mask = Image.new('L', (width + 1, height + rise + 1), 0)
+    draw = ImageDraw.Draw(mask)
+    if shape_type == 'circle':
+        draw.ellipse([0, 0, width, height], fill=255, outline=None)
+    elif shape_type == 'square':
+        draw.rectangle([0, 0, width, height], fill=255, outline=None)
+    elif shape_type == 'triangle':
+        draw.polygon([0, rise, width // 2, 0, width, height + rise], fill=255)
+    return mask
+def render_tile(job):
+    """
+    Render one tile of the canvas and return its pixels as an (height, width, 3) uint8 array.
+    """
+    settings, (left, top, right, bottom) = job
+    max_size = settings['shape_size'][1]
+    # Shapes that start up to one shape size left of or above the tile, or a triangle's rise below it, can still reach into it
+    first_cell_x = max(0, (left - max_size) // SEED_CELL)
+    first_cell_y = max(0, (top - max_size) // SEED_CELL)
+    last_cell_x = min((settings['width'] - 1) // SEED_CELL, (right - 1) // SEED_CELL)
+    last_cell_y = min((settings['height'] - 1) // SEED_CELL, (bottom - 1 + TRIANGLE_RISE) // SEED_CELL)
+    cells = [generate_cell_shapes(settings, cell_x, cell_y) for cell_y in range(first_cell_y, last_cell_y + 1) for cell_x in range(first_cell_x, last_cell_x + 1)]
+    shapes = {key: np.concatenate([cell[key] for cell in cells]) for key in cells[0]}
+    # Keep only the shapes whose bounding box overlaps the tile, then draw them back to front
+    is_triangle = np.array([shape == 'triangle' for shape in settings['shapes']])[shapes['type']]
+    shape_top = np.where(is_triangle, shapes['y0'] - TRIANGLE_RISE, shapes['y0'])
+    visible = (shapes['x1'] >= left) & (shapes['x0'] < right) & (shapes['y1'] >= top) & (shape_top < bottom)
+    order = np.flatnonzero(visible)[np.argsort(shapes['z'][visible], kind='stable')]
+    tile = Image.new('RGB', (right - left, bottom - top), color='white')
+    for index in order:
+        shape_type = settings['shapes'][shapes['type'][index]]
+        color = settings['palette'][shapes['color'][index]]
+        x0 = int(shapes['x0'][index])
+        y0 = int(shapes['y0'][index])
+        mask = shape_mask(shape_type, int(shapes['x1'][index]) - x0, int(shapes['y1'][index]) - y0)
+        # Stamp the shape at its position relative to the tile; the parts outside the tile are clipped
+        tile.paste(color, (x0 - left, int(shape_top[index]) - top), mask)
+    return np.asarray(tile)
+class PNGStreamWriter:
+    """
+    Writes a PNG a band of rows at a time, so the whole image never has to be in memory.
+    Rows use PNG's Sub filter, which compresses flat areas of colour very well.
+    """
+    def __init__(self, path, width, height):
+        self.file = open(path, 'wb')
+        self.compressor = zlib.compressobj(6)
+        self.file.write(b'\x89PNG\r\n\x1a\n')
+        # 8-bit RGB, no interlacing
+        self._chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+    def _chunk(self, kind, data):
+        self.file.write(struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xFFFFFFFF))
+    def write_rows(self, pixels):
+        rows = pixels.reshape(len(pixels), -1)
+        filtered = np.empty((len(rows), rows.shape[1] + 1), dtype=np.uint8)
+        # Each row starts with its filter type (1 = Sub), then every byte minus the same channel of the pixel to its left
+        filtered[:, 0] = 1
+        filtered[:, 1:4] = rows[:, :3]
+        filtered[:, 4:] = rows[:, 3:] - rows[:, :-3]
+        data = self.compressor.compress(filtered.tobytes())
+        if data:
+            self._chunk(b'IDAT', data)
+    def close(self):
+        self._chunk(b'IDAT', self.compressor.flush())
+        self._chunk(b'IEND', b'')
+        self.file.close()
+def tile_rows(width, height, tile_size):
+    # Tile boxes, one list per band of the image, top to bottom
+    return [[(left, top, min(left + tile_size, width), min(top + tile_size, height)) for left in range(0, width, tile_size)] for top in range(0, height, tile_size)]
+def render_bands(settings, rows, workers):
+    """
+    Yield the image one band of tiles at a time. With several workers, tiles render in a process pool,
+    at most two bands ahead of the one being written, so memory stays bounded however big the image is.
+    """
+    if workers <= 1 or len(rows) * len(rows[0]) == 1:
+        for row in rows:
+            yield np.hstack([render_tile((settings, box)) for box in row])
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        rows_left = iter(rows)
+        for row in rows_left:
+            pending.append([executor.submit(render_tile, (settings, box)) for box in row])
+            if len(pending) == 2:
+                break
+        while pending:
+            band = np.hstack([future.result() for future in pending.popleft()])
+            next_row = next(rows_left, None)
+            if next_row is not None:
+                pending.append([executor.submit(render_tile, (settings, box)) for box in next_row])
+            yield band
 # Define a function to create abstract art
 def create_abstract_art(args):
     try:
+        start = time.perf_counter()
         # Parse the resolution
-        width, height = map(int, args.resolution.split('x'))
-        # Create a new image with white background
-        image = Image.new('RGB', (width, height), color='white')
-        draw = ImageDraw.Draw(image)
-        # Generate color palette
-        color_palette = generate_color_palette(args.color_palette)
-        # Generate shapes based on user input
-        for _ in range(args.density * 10):
-            shape_type = random.choice(args.shapes)
-            color = random.choice(color_palette)
-            x0 = random.randint(0, width)
-            y0 = random.randint(0, height)
-            x1 = x0 + random.randint(10, 100)
-            y1 = y0 + random.randint(10, 100)
-            if shape_type == 'circle':
-                draw.ellipse([x0, y0, x1, y1], fill=color, outline=None)
-            elif shape_type == 'square':
-                draw.rectangle([x0, y0, x1, y1], fill=color, outline=None)
-            elif shape_type == 'triangle':
-                draw.polygon([x0, y0, (x0 + x1) // 2, y0 - 100, x1, y1], fill=color)
-        # Save the generated image
-        image.save(args.output_file, format=args.file_format.upper())
+        width, height = map(int, args.resolution.lower().split('x'))
+        # A random seed unless one was given, printed so the artwork can be made again
+        seed = args.seed if args.seed is not None else secrets.randbits(32)
+        shape_count = args.shape_count if args.shape_count is not None else args.density * 10
+        cells = math.ceil(width / SEED_CELL) * math.ceil(height / SEED_CELL)
+        settings = {
+            'width': width,
+            'height': height,
+            'seed': seed,
+            'shapes': args.shapes,
+            # Generate color palette
+            'palette': generate_color_palette(args.color_palette),
+            'shapes_per_cell': shape_count / cells,
+            'shape_size': tuple(args.shape_size),
+        }
+        rows = tile_rows(width, height, args.tile_size)
+        workers = args.workers or os.cpu_count() or 1
+        if args.file_format.upper() == 'PNG':
+            # PNGs are streamed to disk a band at a time
+            writer = PNGStreamWriter(args.output_file, width, height)
+            try:
+                for band in render_bands(settings, rows, workers):
+                    writer.write_rows(band)
+            finally:
+                writer.close()
+        else:
+            # JPEG can't be written in pieces, so the bands are put together in memory first
+            image = Image.new('RGB', (width, height), color='white')
+            top = 0
+            for band in render_bands(settings, rows, workers):
+                image.paste(Image.fromarray(band), (0, top))
+                top += len(band)
+            image.save(args.output_file, format=args.file_format.upper())
         # Log the parameters used
-        print(f"Artwork created with parameters: Color Palette - {args.color_palette}, Shapes - {args.shapes}, Density - {args.density}, Resolution - {args.resolution}, Format - {args.file_format}")
+        print(f"Artwork created with parameters: Color Palette - {args.color_palette}, Shapes - {args.shapes}, Density - {args.density}, Resolution - {args.resolution}, Format - {args.file_format}, Seed - {seed}")
+        print(f"Rendered {len(rows) * len(rows[0])} tiles with {min(workers, len(rows) * len(rows[0]))} worker(s) in {time.perf_counter() - start:.2f}s")
     except Exception as e:
         print(f"An error occurred: {e}")
 def main():
@@ -47,18 +193,29 @@ def main():
                                                  "1. Choose a color palette from predefined options or provide your own.\n"
                                                  "2. Select shape types you want to include in the artwork.\n"
                                                  "3. Specify pattern density, resolution, and output file format.\n"
-                                                 "4. Run the script with these parameters to generate your artwork.")
+                                                 "4. Run the script with these parameters to generate your artwork.\n"
+                                                 "5. For print-size artwork, raise --shape_count and --shape_size. Tiles are rendered on every CPU core,\n"
+                                                 "   and PNGs are written as they render, so even images bigger than your RAM work.\n"
+                                                 "6. Pass the same --seed to get the same artwork again.",
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
     # Define command-line arguments
     parser.add_argument('--color_palette', type=str, default='vibrant', help="Color palette to use (e.g., vibrant, pastel, monochrome)")
     parser.add_argument('--shapes', nargs='+', default=['circle', 'square', 'triangle'], help="Types of shapes to include (e.g., circle, square, triangle)")
     parser.add_argument('--density', type=int, default=5, choices=[1, 2, 3, 4, 5], help="Pattern density (1=low, 5=high)")
+    parser.add_argument('--shape_count', type=int, help="Total number of shapes, overrides --density (which draws density × 10)")
+    parser.add_argument('--shape_size', type=int, nargs=2, default=[10, 100], metavar=('MIN', 'MAX'), help="Smallest and largest shape size in pixels")
     parser.add_argument('--resolution', type=str, default='1920x1080', help="Resolution of the image (e.g., 1920x1080)")
     parser.add_argument('--file_format', type=str, default='PNG', choices=['PNG', 'JPEG'], help="Output file format")
     parser.add_argument('--output_file', type=str, default='abstract_art.png', help="Output file name")
+    parser.add_argument('--seed', type=int, help="Random seed, the same seed and settings always give the same artwork")
+    parser.add_argument('--tile_size', type=int, default=1024, help="Size of the square tiles the canvas is rendered in")
+    parser.add_argument('--workers', type=int, help="Number of processes to render tiles with (default: one per CPU core)")
     # Parse the arguments
     args = parser.parse_args()
+    if args.shape_size[0] < 1 or args.shape_size[0] > args.shape_size[1]:
+        parser.error("--shape_size needs 1 <= MIN <= MAX")
     # Call the function to create abstract art
     create_abstract_art(args)
 # Run the main function
 if __name__ == '__main__':
-    main()
\ No newline at end of file
+    main()
@@ -1,8 +1,11 @@
 import argparse
 import os
+import time
+from math import cos, radians, sin
 import requests
+import schedule
 import emoji
-from PIL import Image, ImageDraw
+from PIL import Image, ImageDraw, ImageFont
 from datetime import datetime
 # Helper functions
 def get_weather_emoji(weather_condition):
@@ -34,20 +37,40 @@ def get_trend_emoji(trend):
         return "🎬"
     else:
         return "❓"
-def create_mandala(emojis, size=20):
+class GlyphAtlas:
+    """
+    Rasterizes each distinct emoji/color pair once and keeps the result, so drawing an emoji is a single paste.
+    """
+    def __init__(self, font=None):
+        self.font = font or ImageFont.load_default()
+        self.tiles = {}
+    def get(self, emoji, color):
+        """
+        Returns the emoji's color tile, its mask, and where the tile sits relative to the point it's drawn at.
+        """
+        key = (emoji, color)
+        if key not in self.tiles:
+            left, top, right, bottom = self.font.getbbox(emoji)
+            mask = Image.new("L", (max(1, right - left), max(1, bottom - top)), 0)
+            ImageDraw.Draw(mask).text((-left, -top), emoji, font=self.font, fill=255)
+            self.tiles[key] = (Image.new("RGB", mask.size, color), mask, (left, top))
+        return self.tiles[key]
+# Kept for the life of the process, so every daily run after the first reuses the glyphs already rendered
+GLYPH_ATLAS = GlyphAtlas()
+def create_mandala(emojis, size=20, atlas=GLYPH_ATLAS):
     """
     Creates a mandala image from a list of emojis.
     """
     image = Image.new("RGB", (size * 10, size * 10), color="white")
-    draw = ImageDraw.Draw(image)
-    font = None  # Use system default font
     x, y = size * 5, size * 5
     for i, emoji in enumerate(emojis):
         angle = i * (360 / len(emojis))
         radius = size * (i % 5) + size
         emoji_x = x + radius * cos(radians(angle))
         emoji_y = y + radius * sin(radians(angle))
-        draw.text((emoji_x, emoji_y), emoji, font=font, fill="black")
+        # Paste the emoji's cached tile instead of rendering the glyph again
+        tile, mask, (left, top) = atlas.get(emoji, (0, 0, 0))
+        image.paste(tile, (round(emoji_x) + left, round(emoji_y) + top), mask)
     return image
 # Command-line argument parsing
 parser = argparse.ArgumentParser(
@@ -66,7 +89,7 @@ def main():
         if args.source == "weather":
             # Use a weather API to get the current weather condition
             # You'll need to replace the URL and API key with a valid one
-            weather_url = f"https://api.openweathermap.org/data/2.5/weather?q=London,uk&appid={args.api-key}"
+            weather_url = f"https://api.openweathermap.org/data/2.5/weather?q=London,uk&appid={args.api_key}"
             response = requests.get(weather_url)
             response.raise_for_status()
             weather_data = response.json()
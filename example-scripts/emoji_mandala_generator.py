@@ -1,8 +1,28 @@
 import argparse
 from collections import defaultdict
-from PIL import Image, ImageDraw, ImageColor
+from PIL import Image, ImageDraw, ImageColor, ImageFont
 import random
-def create_mandala(size, emojis, color_map, output_format):
+class GlyphAtlas:
+    """
+    Rasterizes each distinct emoji/color pair once and keeps the result, so drawing an emoji is a single paste.
+    Args:
+        font (ImageFont, optional): The font to draw with. Defaults to Pillow's default font, like draw.text does.
+    """
+    def __init__(self, font=None):
+        self.font = font or ImageFont.load_default()
+        self.tiles = {}
+    def get(self, emoji, color):
+        """
+        Returns the emoji's color tile, its mask, and where the tile sits relative to the point it's drawn at.
+        """
+        key = (emoji, color)
+        if key not in self.tiles:
+            left, top, right, bottom = self.font.getbbox(emoji)
+            mask = Image.new('L', (max(1, right - left), max(1, bottom - top)), 0)
+            ImageDraw.Draw(mask).text((-left, -top), emoji, font=self.font, fill=255)
+            self.tiles[key] = (Image.new('RGB', mask.size, color), mask, (left, top))
+        return self.tiles[key]
+def create_mandala(size, emojis, color_map, output_format, font=None):
     """
     Generates an intricate mandala pattern using the specified emojis and colors.
     Args:
@@ -10,25 +30,35 @@ def create_mandala(size, emojis, color_map, output_format):
         emojis (list): The list of emojis to use in the mandala.
         color_map (dict): A dictionary mapping emojis to their corresponding colors.
         output_format (str): The output format for the mandala ('png' or 'jpg').
+        font (ImageFont, optional): The font to draw the emojis with.
     Returns:
         None
     """
     # Create a new image with the specified size
     mandala = Image.new('RGB', (size, size), color=(0, 0, 0))
-    draw = ImageDraw.Draw(mandala)
     # Calculate the center of the mandala
     center_x, center_y = size // 2, size // 2
-    # Generate the mandala pattern
-    for i in range(size):
-        for j in range(size):
+    # Every emoji/color pair is rasterized once, then pasted wherever it goes
+    atlas = GlyphAtlas(font)
+    # The emoji only depends on the distance from the center, so only the top-left quadrant is drawn, then mirrored into the other three
+    quadrant = Image.new('RGB', (center_x + 1, center_y + 1), color=(0, 0, 0))
+    for i in range(center_x + 1):
+        for j in range(center_y + 1):
             # Calculate the distance from the center
             distance = ((i - center_x) ** 2 + (j - center_y) ** 2) ** 0.5
             # Select the emoji based on the distance from the center
             emoji = emojis[int(distance / size * (len(emojis) - 1))]
             # Get the color for the emoji
             color = color_map.get(emoji, (255, 255, 255))
-            # Draw the emoji on the mandala
-            draw.text((i, j), emoji, font=None, fill=color)
+            # Paste the emoji's cached tile onto the quadrant
+            tile, mask, (left, top) = atlas.get(emoji, color)
+            quadrant.paste(tile, (i + left, j + top), mask)
+    # Mirror around the center column, then around the center row. The center itself isn't repeated
+    right = quadrant.crop((2 * center_x + 1 - size, 0, center_x + 1, center_y + 1)).transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    mandala.paste(quadrant, (0, 0))
+    mandala.paste(right, (center_x, 0))
+    bottom = mandala.crop((0, 2 * center_y + 1 - size, size, center_y + 1)).transpose(Image.Transpose.FLIP_TOP_BOTTOM)
+    mandala.paste(bottom, (0, center_y))
     # Save the mandala as an image
     mandala.save(f'mandala.{output_format}')
     print(f'Mandala saved as mandala.{output_format}')
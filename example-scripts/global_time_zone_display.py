@@ -1,29 +1,113 @@
 #!/usr/bin/env python3
 import argparse
-import pytz
-from datetime import datetime
+import os
+import shutil
+import time
+from datetime import datetime, timezone
 from collections import defaultdict
+from typing import NamedTuple, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
 import sys
 import textwrap
-def get_current_times():
+# Entries in the time zone database that aren't real places
+SKIPPED_ZONES = {"Factory", "localtime", "posixrules"}
+# How far ahead to look for a zone's next offset change, and how finely. Zones with no change in that window are rechecked when it runs out
+TRANSITION_SEARCH_DAYS = 400
+TRANSITION_SEARCH_STEP = 7 * 24 * 3600
+class ZoneMeta(NamedTuple):
+    name: str
+    region: str
+    # Offset from UTC in seconds and abbreviation (e.g. 3600, 'CET'), valid from valid_from until valid_until
+    offset: int
+    abbreviation: str
+    # UTC timestamp when the offset or abbreviation next changes, None if not within TRANSITION_SEARCH_DAYS
+    next_transition: Optional[int]
+    # UTC timestamp the entry was built for; nothing is known about the offset before it
+    valid_from: int
+    valid_until: int
+# The zone table is built once and kept between calls, only zones whose entry doesn't cover the timestamp get rebuilt
+_zone_table = {}
+_zone_table_starts = 0
+_zone_table_expires = 0
+def zone_state(zone, timestamp):
+    # The offset and abbreviation a zone has at a UTC timestamp
+    local = datetime.fromtimestamp(timestamp, zone)
+    return int(local.utcoffset().total_seconds()), local.tzname()
+def find_next_transition(zone, timestamp):
+    """
+    Find when a zone next changes offset or abbreviation after a UTC timestamp.
+    Steps a week at a time, then bisects to the exact second, so it's a few dozen lookups per zone instead of one per day.
+    Returns:
+        The UTC timestamp of the change, or None if there isn't one within TRANSITION_SEARCH_DAYS.
+    """
+    current = zone_state(zone, timestamp)
+    low = timestamp
+    for high in range(timestamp + TRANSITION_SEARCH_STEP, timestamp + TRANSITION_SEARCH_DAYS * 86400, TRANSITION_SEARCH_STEP):
+        if zone_state(zone, high) != current:
+            # The change is somewhere in (low, high], narrow it down to the second
+            while high - low > 1:
+                middle = (low + high) // 2
+                if zone_state(zone, middle) == current:
+                    low = middle
+                else:
+                    high = middle
+            return high
+        low = high
+    return None
+def build_zone_meta(name, timestamp):
+    zone = ZoneInfo(name)
+    offset, abbreviation = zone_state(zone, timestamp)
+    next_transition = find_next_transition(zone, timestamp)
+    valid_until = next_transition if next_transition is not None else timestamp + TRANSITION_SEARCH_DAYS * 86400
+    return ZoneMeta(name, name.split('/')[0], offset, abbreviation, next_transition, timestamp, valid_until)
+def get_zone_table(timestamp=None):
+    """
+    Return the metadata for every time zone, building it on the first call.
+    Later calls reuse it, and only rebuild the zones whose entry doesn't cover the timestamp, whether it's later than the
+    next change or earlier than the entry was built for.
+    Returns:
+        A dict of zone name to ZoneMeta.
+    """
+    global _zone_table_starts, _zone_table_expires
+    timestamp = int(time.time() if timestamp is None else timestamp)
+    if not _zone_table:
+        for name in sorted(available_timezones() - SKIPPED_ZONES):
+            try:
+                _zone_table[name] = build_zone_meta(name, timestamp)
+            except (ZoneInfoNotFoundError, ValueError, OSError):
+                print(f"Warning: Unable to process timezone {name}", file=sys.stderr)
+    elif not _zone_table_starts <= timestamp < _zone_table_expires:
+        for name, meta in _zone_table.items():
+            if not meta.valid_from <= timestamp < meta.valid_until:
+                _zone_table[name] = build_zone_meta(name, timestamp)
+    _zone_table_starts = max((meta.valid_from for meta in _zone_table.values()), default=timestamp)
+    _zone_table_expires = min((meta.valid_until for meta in _zone_table.values()), default=timestamp + 86400)
+    return _zone_table
+def format_offset(offset):
+    sign = '+' if offset >= 0 else '-'
+    hours, minutes = divmod(abs(offset) // 60, 60)
+    return f"UTC{sign}{hours:02d}:{minutes:02d}"
+def get_current_times(timestamp=None):
     """
     Retrieve current times for all time zones and organize them by region.
+    Every zone's time is its offset applied to one UTC timestamp, and each distinct offset is only formatted once.
     Returns:
         A defaultdict with regions as keys and lists of (timezone, time) tuples as values.
     """
+    timestamp = int(time.time() if timestamp is None else timestamp)
+    table = get_zone_table(timestamp)
+    formatted = {}
     times = defaultdict(list)
-    for tz in pytz.all_timezones:
-        try:
-            timezone = pytz.timezone(tz)
-            current_time = datetime.now(timezone)
-            region = tz.split('/')[0]
-            times[region].append((tz, current_time.strftime("%Y-%m-%d %H:%M:%S %Z")))
-        except pytz.exceptions.PytzError:
-            print(f"Warning: Unable to process timezone {tz}", file=sys.stderr)
+    for meta in table.values():
+        key = (meta.offset, meta.abbreviation)
+        if key not in formatted:
+            local = datetime.fromtimestamp(timestamp + meta.offset, timezone.utc)
+            formatted[key] = f"{local:%Y-%m-%d %H:%M:%S} {meta.abbreviation}"
+        times[meta.region].append((meta.name, formatted[key]))
     return times
-def display_times(times, region=None, compact=False):
+def render_lines(times, region=None, compact=False):
     """
-    Display times for all regions or a specific region.
+    Lay out the times for all regions or a specific region, one string per line of output.
     Args:
         times (defaultdict): Organized time data.
         region (str, optional): Specific region to display. If None, display all regions.
@@ -33,15 +117,65 @@ def display_times(times, region=None, compact=False):
         regions = [region] if region in times else []
     else:
         regions = sorted(times.keys())
+    table = get_zone_table() if not compact else None
+    lines = []
     for r in regions:
-        print(f"\n{r:=^60}")
-        for tz, time in sorted(times[r]):
+        lines += ["", f"{r:=^60}"]
+        for tz, time_text in sorted(times[r]):
             if compact:
-                print(f"{tz:<40} {time}")
+                lines.append(f"{tz:<40} {time_text}")
             else:
-                print(f"Timezone: {tz}")
-                print(f"Current time: {time}")
-                print("-" * 50)
+                meta = table[tz]
+                change = f"next change {datetime.fromtimestamp(meta.next_transition, timezone.utc):%Y-%m-%d %H:%M} UTC" if meta.next_transition else "no change coming up"
+                lines += [f"Timezone: {tz}", f"Current time: {time_text}", f"UTC offset: {format_offset(meta.offset)} ({change})", "-" * 50]
+    return lines
+def display_times(times, region=None, compact=False):
+    """
+    Display times for all regions or a specific region.
+    Args:
+        times (defaultdict): Organized time data.
+        region (str, optional): Specific region to display. If None, display all regions.
+        compact (bool): If True, use a compact display format.
+    """
+    print("\n".join(render_lines(times, region, compact)))
+def repaint(previous, lines):
+    """
+    Build the terminal output that turns the previous screen into the new one.
+    Only lines that changed are touched, starting from the first character that differs, so a ticking clock rewrites a digit or two per line.
+    """
+    parts = []
+    for row, line in enumerate(lines):
+        old = previous[row] if row < len(previous) else ""
+        if line != old:
+            column = len(os.path.commonprefix([old, line]))
+            parts.append(f"\033[{row + 1};{column + 1}H{line[column:]}\033[K")
+    # Clear lines left over from a longer previous screen
+    for row in range(len(lines), len(previous)):
+        parts.append(f"\033[{row + 1};1H\033[K")
+    return "".join(parts)
+def watch_times(region=None, compact=False, interval=1.0):
+    """
+    Keep the display up to date until interrupted, repainting only what changed on every tick.
+    """
+    previous = []
+    # Clear the screen and hide the cursor while watching
+    sys.stdout.write("\033[2J\033[H\033[?25l")
+    try:
+        while True:
+            lines = render_lines(get_current_times(), region, compact)[1:]
+            # Lines below the bottom of the terminal would scroll the screen, so only what fits is shown
+            height = shutil.get_terminal_size().lines - 1
+            if len(lines) > height:
+                hidden = len(lines) - height + 1
+                lines = lines[:height - 1] + [f"... {hidden} more lines, narrow it down with --region or --compact"]
+            sys.stdout.write(repaint(previous, lines))
+            sys.stdout.flush()
+            previous = lines
+            # Wake up right as the next tick starts, so the seconds change on time
+            time.sleep(interval - time.time() % interval)
+    finally:
+        sys.stdout.write(f"\033[{len(previous) + 1};1H\033[?25h")
+        sys.stdout.flush()
 def main():
     parser = argparse.ArgumentParser(
         description="Display current times for every time zone on Earth.",
@@ -51,22 +185,30 @@ def main():
         2. Specify a region: python global_time_zone_display.py --region America
         3. Use compact display: python global_time_zone_display.py --compact
         4. Combine options: python global_time_zone_display.py --region Europe --compact
+        5. Keep it running as a live clock wall: python global_time_zone_display.py --region Europe --compact --watch
         """),
         formatter_class=argparse.RawDescriptionHelpFormatter
     )
     parser.add_argument('--region', help='Display times for a specific region')
     parser.add_argument('--compact', action='store_true', help='Use compact display format')
+    parser.add_argument('--watch', action='store_true', help='Keep the display open and update it live (Ctrl+C to stop)')
+    parser.add_argument('--interval', type=float, default=1.0, help='Seconds between updates in --watch mode (default: 1)')
     args = parser.parse_args()
+    if args.interval <= 0:
+        parser.error("--interval must be positive")
     try:
         times = get_current_times()
         if args.region and args.region not in times:
             print(f"Error: Region '{args.region}' not found. Available regions: {', '.join(sorted(times.keys()))}")
             sys.exit(1)
-        display_times(times, args.region, args.compact)
+        if args.watch:
+            watch_times(args.region, args.compact, args.interval)
+        else:
+            display_times(times, args.region, args.compact)
     except KeyboardInterrupt:
         print("\nOperation cancelled by user.")
     except Exception as e:
         print(f"An unexpected error occurred: {e}", file=sys.stderr)
         sys.exit(1)
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
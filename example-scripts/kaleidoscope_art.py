@@ -1,14 +1,52 @@
 import tkinter as tk
 from tkinter import colorchooser, filedialog
 import math
+from PIL import Image, ImageDraw, ImageFont
+CANVAS_SIZE = 600
+# Emojis sit on a grid with this spacing before being rotated and shifted
+GRID_STEP = 50
+EMOJI_FONT = ("Arial", 20)
+# Slider events are coalesced into at most one redraw per frame (~60 fps)
+FRAME_MS = 16
+# Fonts tried in turn for saved images, emoji fonts first. Pillow's own font is the last resort
+EXPORT_FONTS = ["seguiemj.ttf", "Apple Color Emoji.ttc", "NotoColorEmoji.ttf", "arial.ttf", "Arial.ttf", "DejaVuSans.ttf"]
+def grid_points():
+    """Returns the unrotated position of every emoji in the pattern."""
+    return [(x, y) for x in range(0, CANVAS_SIZE, GRID_STEP) for y in range(0, CANVAS_SIZE, GRID_STEP)]
+def pattern_positions(points, rotation, shift):
+    """Rotates the points around the canvas origin and shifts them, working out the sine and cosine once for all of them."""
+    cos_r = math.cos(math.radians(rotation))
+    sin_r = math.sin(math.radians(rotation))
+    return [(x * cos_r - y * sin_r + shift, x * sin_r + y * cos_r + shift) for x, y in points]
+def load_export_font(pixel_size):
+    """Loads the first available font for saved images, at the given size in pixels."""
+    for name in EXPORT_FONTS:
+        try:
+            return ImageFont.truetype(name, pixel_size)
+        except OSError:
+            # Not installed, or a bitmap emoji font that doesn't come in this size
+            continue
+    return ImageFont.load_default(pixel_size)
+def render_pattern_image(emoji, color, rotation, shift, pixel_size, size=(CANVAS_SIZE, CANVAS_SIZE)):
+    """Draws the pattern offscreen with Pillow, the same way it appears on the canvas."""
+    image = Image.new("RGB", size, "black")
+    draw = ImageDraw.Draw(image)
+    font = load_export_font(pixel_size)
+    for x, y in pattern_positions(grid_points(), rotation, shift):
+        # Anchored at the middle, like canvas text items
+        draw.text((x, y), emoji, fill=color, font=font, anchor="mm", embedded_color=True)
+    return image
 class EmojiKaleidoscope(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Emoji Kaleidoscope Art")
         self.geometry("800x600")
         self.configure(bg="black")
+        # Nothing is drawn or scheduled yet, the sliders may ask for a redraw as soon as they exist
+        self.drawn_style = None
+        self.redraw_job = None
         # Create a canvas to draw the kaleidoscope
-        self.canvas = tk.Canvas(self, width=600, height=600, bg="black", highlightthickness=0)
+        self.canvas = tk.Canvas(self, width=CANVAS_SIZE, height=CANVAS_SIZE, bg="black", highlightthickness=0)
         self.canvas.pack(side=tk.LEFT, padx=10, pady=10)
         # Create a frame for controls
         controls_frame = tk.Frame(self, bg="black")
@@ -22,14 +60,14 @@ class EmojiKaleidoscope(tk.Tk):
         self.emoji_color = "yellow"
         choose_color_button = tk.Button(controls_frame, text="Choose Color", command=self.choose_color, fg="white", bg="black")
         choose_color_button.pack(pady=5)
-        # Create sliders for rotation and shift
+        # Create sliders for rotation and shift. Every change, by dragging, clicking or keyboard, asks for a redraw
         rotation_label = tk.Label(controls_frame, text="Rotation:", fg="white", bg="black")
         rotation_label.pack(pady=5)
-        self.rotation_slider = tk.Scale(controls_frame, from_=0, to=360, orient=tk.HORIZONTAL, fg="white", bg="black")
+        self.rotation_slider = tk.Scale(controls_frame, from_=0, to=360, orient=tk.HORIZONTAL, fg="white", bg="black", command=self.update_pattern)
         self.rotation_slider.pack(pady=5)
         shift_label = tk.Label(controls_frame, text="Shift:", fg="white", bg="black")
         shift_label.pack(pady=5)
-        self.shift_slider = tk.Scale(controls_frame, from_=0, to=200, orient=tk.HORIZONTAL, fg="white", bg="black")
+        self.shift_slider = tk.Scale(controls_frame, from_=0, to=200, orient=tk.HORIZONTAL, fg="white", bg="black", command=self.update_pattern)
         self.shift_slider.pack(pady=5)
         # Create a button to save the pattern
         save_button = tk.Button(controls_frame, text="Save Pattern", command=self.save_pattern, fg="white", bg="black")
@@ -40,8 +78,9 @@ class EmojiKaleidoscope(tk.Tk):
         self.shift_slider.set(0)
         # Bind events
         self.emoji_entry.bind("<Return>", self.update_pattern)
-        self.rotation_slider.bind("<B1-Motion>", self.update_pattern)
-        self.shift_slider.bind("<B1-Motion>", self.update_pattern)
+        # The text items are created once, redraws only move them and change their text or color
+        self.points = grid_points()
+        self.items = [self.canvas.create_text(x, y, text="", fill=self.emoji_color, font=EMOJI_FONT, tags="emoji") for x, y in self.points]
         # Draw the initial pattern
         self.draw_pattern()
     def choose_color(self):
@@ -49,42 +88,39 @@ class EmojiKaleidoscope(tk.Tk):
         color = colorchooser.askcolor(title="Choose Emoji Color")[1]
         if color:
             self.emoji_color = color
-            self.draw_pattern()
+            self.update_pattern()
     def draw_pattern(self):
         """Draws the kaleidoscope pattern on the canvas."""
-        self.canvas.delete("all")
         emoji = self.emoji_entry.get()
         rotation = self.rotation_slider.get()
         shift = self.shift_slider.get()
-        for x in range(0, 600, 50):
-            for y in range(0, 600, 50):
-                # Calculate the rotated and shifted position
-                rotated_x = x * math.cos(math.radians(rotation)) - y * math.sin(math.radians(rotation))
-                rotated_y = x * math.sin(math.radians(rotation)) + y * math.cos(math.radians(rotation))
-                shifted_x = rotated_x + shift
-                shifted_y = rotated_y + shift
-                # Draw the emoji at the rotated and shifted position
-                self.canvas.create_text(shifted_x, shifted_y, text=emoji, fill=self.emoji_color, font=("Arial", 20))
+        # One call restyles every item through their shared tag, and only when the emoji or color actually changed
+        if self.drawn_style != (emoji, self.emoji_color):
+            self.canvas.itemconfigure("emoji", text=emoji, fill=self.emoji_color)
+            self.drawn_style = (emoji, self.emoji_color)
+        # Move each emoji to its rotated and shifted position
+        for item, (x, y) in zip(self.items, pattern_positions(self.points, rotation, shift)):
+            self.canvas.coords(item, x, y)
     def update_pattern(self, event=None):
-        """Updates the kaleidoscope pattern based on user input."""
+        """Updates the kaleidoscope pattern based on user input, at most once per frame however many events arrive."""
+        if self.redraw_job is None:
+            self.redraw_job = self.after(FRAME_MS, self.redraw)
+    def redraw(self):
+        self.redraw_job = None
         self.draw_pattern()
     def save_pattern(self):
         """Saves the current pattern as an image file."""
         try:
             file_path = filedialog.asksaveasfilename(defaultextension=".png", filetypes=[("PNG Files", "*.png")])
             if file_path:
-                x = self.winfo_rootx() + self.canvas.winfo_x()
-                y = self.winfo_rooty() + self.canvas.winfo_y()
-                x1 = x + self.canvas.winfo_width()
-                y1 = y + self.canvas.winfo_height()
-                image = tk.PhotoImage(subsample=2)
-                canvas = tk.Canvas(width=self.canvas.winfo_width(), height=self.canvas.winfo_height(), bg="black")
-                self.canvas.create_image(0, 0, image=image, anchor=tk.NW)
-                canvas.pack()
-                canvas.postscript(file=file_path, colormode="color", x=x, y=y, width=x1-x, height=y1-y)
-                canvas.destroy()
+                # Rendered offscreen at the canvas's size, so it works even if the window is covered or off screen
+                color = tuple(value // 257 for value in self.winfo_rgb(self.emoji_color))
+                pixel_size = round(EMOJI_FONT[1] * self.winfo_fpixels("1i") / 72)
+                image = render_pattern_image(self.emoji_entry.get(), color, self.rotation_slider.get(), self.shift_slider.get(), pixel_size)
+                image.save(file_path)
+                print(f"Pattern saved as {file_path}")
         except Exception as e:
             print(f"Error saving pattern: {e}")
 if __name__ == "__main__":
     app = EmojiKaleidoscope()
-    app.mainloop()
\ No newline at end of file
+    app.mainloop()
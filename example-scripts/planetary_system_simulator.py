@@ -1,119 +1,361 @@
 import argparse
-import numpy as np
-from manim import *
+import math
 import random
-class PlanetarySystem(Scene):
-    def __init__(self, planets, duration, timestep, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.planets = planets
-        self.duration = duration
-        self.timestep = timestep
-        self.G = 6.67430e-11  # Gravitational constant
-        self.sun_mass = 1.989e30  # Mass of the Sun in kg
-
-    def construct(self):
-        # Create a VGroup to hold all celestial bodies
-        celestial_bodies = VGroup()
-        # Create and add the central star (Sun)
-        sun = Dot(color=YELLOW, radius=0.05).move_to(ORIGIN)
-        celestial_bodies.add(sun)
-        # Create and add planets
-        for planet in self.planets:
-            planet_obj = Dot(color=planet['color'], radius=0.03).move_to(planet['initial_position'])
-            planet['object'] = planet_obj
-            celestial_bodies.add(planet_obj)
-        self.add(celestial_bodies)
-        # Create paths for planets
-        paths = VGroup(*[
-            TracedPath(planet['object'].get_center, stroke_opacity=0.8, stroke_color=planet['color'])
-            for planet in self.planets
-        ])
-        self.add(paths)
-        # Simulate planetary motion
-        def update_planets(mob, dt):
-            for planet in self.planets:
-                r = np.array(planet['object'].get_center())
-                # Calculate gravitational force from the Sun
-                F = -self.G * self.sun_mass * planet['mass'] / np.linalg.norm(r)**3 * r
-                # Update velocity and position
-                planet['velocity'] += F / planet['mass'] * self.timestep
-                new_pos = planet['object'].get_center() + planet['velocity'] * self.timestep
-                planet['object'].move_to(new_pos)
-        # Run the animation
-        self.play(
-            UpdateFromAlphaFunc(celestial_bodies, update_planets),
-            run_time=self.duration,
-            rate_func=linear
-        )
+import sys
+import numpy as np
+# Units: AU, years and solar masses, in which the gravitational constant is 4π²
+G = 4 * np.pi ** 2
+EARTH_MASS = 3.003e-6  # Earth mass in solar masses
+# Rows of the pairwise distance matrix computed at once, so memory stays at chunk × N instead of N × N
+ALL_PAIRS_CHUNK = 512
+# Above this many bodies the automatic method switches from exact all-pairs gravity to Barnes–Hut
+BARNES_HUT_THRESHOLD = 5000
+# Depth of the Barnes–Hut octree, 16 levels × 3 axes fit in a 48-bit Morton key
+TREE_LEVELS = 16
+def all_pairs_accelerations(positions, masses, softening):
+    """
+    Exact gravitational acceleration on every body from every other body with mass, O(N²) but fully vectorized.
+    """
+    accelerations = np.zeros_like(positions)
+    # Massless test particles feel gravity but don't pull on anything, so only bodies with mass are sources
+    sources = np.flatnonzero(masses > 0)
+    source_positions = positions[sources]
+    source_masses = masses[sources]
+    # Where each body sits among the sources, -1 for massless ones, to zero out self-interaction
+    source_index = np.full(len(masses), -1)
+    source_index[sources] = np.arange(len(sources))
+    softening_squared = softening ** 2
+    for start in range(0, len(masses), ALL_PAIRS_CHUNK):
+        stop = min(start + ALL_PAIRS_CHUNK, len(masses))
+        # Squared distances from each body in the chunk to each source, one coordinate at a time,
+        # which keeps every temporary a flat (chunk, sources) array instead of a (chunk, sources, 3) one
+        distance_squared = np.full((stop - start, len(sources)), softening_squared)
+        for axis in range(3):
+            offset = source_positions[None, :, axis] - positions[start:stop, axis, None]
+            offset *= offset
+            distance_squared += offset
+        weights = distance_squared * np.sqrt(distance_squared)
+        np.divide(source_masses[None, :], weights, out=weights)
+        # A body doesn't pull on itself
+        rows = np.flatnonzero(source_index[start:stop] >= 0)
+        weights[rows, source_index[start + rows]] = 0.0
+        # Σ w_ij (x_j - x_i) = W·X - (Σ w_ij) x_i, a matrix product instead of another (chunk, sources, 3) array
+        accelerations[start:stop] = G * (weights @ source_positions - weights.sum(axis=1)[:, None] * positions[start:stop])
+    return accelerations
+def _spread_bits(values):
+    # Spread the low 21 bits of each value out to every third bit, for interleaving into a Morton key
+    values = values & 0x1FFFFF
+    values = (values | values << 32) & 0x1F00000000FFFF
+    values = (values | values << 16) & 0x1F0000FF0000FF
+    values = (values | values << 8) & 0x100F00F00F00F00F
+    values = (values | values << 4) & 0x10C30C30C30C30C3
+    values = (values | values << 2) & 0x1249249249249249
+    return values
+def barnes_hut_accelerations(positions, masses, softening, theta):
+    """
+    Approximate gravitational accelerations with a Barnes–Hut octree, O(N log N).
+    The tree is built level by level from sorted Morton keys, and all bodies walk it together, one level per
+    pass, so every step is a NumPy operation over arrays instead of a Python loop over bodies or nodes.
+    """
+    count = len(masses)
+    origin = positions.min(axis=0)
+    size = float((positions.max(axis=0) - origin).max()) * (1 + 1e-9) or 1.0
+    cells_per_axis = 1 << TREE_LEVELS
+    cells = np.minimum(((positions - origin) / size * cells_per_axis).astype(np.int64), cells_per_axis - 1)
+    keys = _spread_bits(cells[:, 0]) | _spread_bits(cells[:, 1]) << 1 | _spread_bits(cells[:, 2]) << 2
+    # Each level of the tree: node keys, which node every body is in, and each node's body count, mass and centre of mass
+    levels = []
+    for level in range(TREE_LEVELS + 1):
+        node_keys, body_node = np.unique(keys >> (3 * (TREE_LEVELS - level)), return_inverse=True)
+        node_count = np.bincount(body_node, minlength=len(node_keys))
+        node_mass = np.bincount(body_node, weights=masses, minlength=len(node_keys))
+        weighted = np.stack([np.bincount(body_node, weights=masses * positions[:, axis], minlength=len(node_keys)) for axis in range(3)], axis=1)
+        centre = np.divide(weighted, node_mass[:, None], out=np.zeros_like(weighted), where=node_mass[:, None] > 0)
+        levels.append((node_keys, body_node, node_count, node_mass, centre))
+        # Once every body has a cell to itself, deeper levels would just repeat this one
+        if node_count.max() == 1:
+            break
+    # Children of each node are a contiguous run of the next level's sorted keys
+    children = []
+    for (parent_keys, *_), (child_keys, *_) in zip(levels, levels[1:]):
+        parent_of_child = np.searchsorted(parent_keys, child_keys >> 3)
+        first_child = np.searchsorted(parent_of_child, np.arange(len(parent_keys)), side="left")
+        last_child = np.searchsorted(parent_of_child, np.arange(len(parent_keys)), side="right")
+        children.append((first_child, last_child - first_child))
+    accelerations = np.zeros_like(positions)
+    softening_squared = softening ** 2
+    # Every (body, node) pair still to be looked at, starting with every body against the root
+    bodies = np.arange(count)
+    nodes = np.zeros(count, dtype=np.int64)
+    for level, (node_keys, body_node, node_count, node_mass, centre) in enumerate(levels):
+        last_level = level == len(levels) - 1
+        contains = body_node[bodies] == nodes
+        pair_mass = node_mass[nodes]
+        pair_centre = centre[nodes]
+        if last_level:
+            # Bodies closer together than the finest cell share a leaf, take each body's own mass back out of it
+            own_mass = np.where(contains, masses[bodies], 0.0)
+            remaining = pair_mass - own_mass
+            pair_centre = np.divide(pair_centre * pair_mass[:, None] - positions[bodies] * own_mass[:, None], remaining[:, None], out=np.zeros_like(pair_centre), where=remaining[:, None] > 0)
+            pair_mass = remaining
+        offsets = pair_centre - positions[bodies]
+        distance_squared = np.einsum("ij,ij->i", offsets, offsets) + softening_squared
+        node_size = size / (1 << level)
+        # A node is used as a single point mass when it's far enough away, or when it is just one other body
+        accept = ~contains & ((node_size * node_size < theta * theta * distance_squared) | (node_count[nodes] == 1))
+        if last_level:
+            accept = pair_mass > 0
+        strength = np.where(accept, G * pair_mass * distance_squared ** -1.5, 0.0)
+        for axis in range(3):
+            accelerations[:, axis] += np.bincount(bodies, weights=strength * offsets[:, axis], minlength=count)
+        if last_level:
+            break
+        # Open the rest: nodes too close to approximate, except a body's own single-body leaf
+        expand = ~accept & ~(contains & (node_count[nodes] == 1)) & (node_mass[nodes] > 0)
+        first_child, child_count = children[level]
+        parents = nodes[expand]
+        repeats = child_count[parents]
+        bodies = np.repeat(bodies[expand], repeats)
+        offsets_in_parent = np.arange(repeats.sum()) - np.repeat(np.cumsum(repeats) - repeats, repeats)
+        nodes = np.repeat(first_child[parents], repeats) + offsets_in_parent
+        if not len(bodies):
+            break
+    return accelerations
+class NBodySystem:
+    """
+    Struct-of-arrays state for N bodies: positions and velocities are (N, 3) arrays, masses an (N,) array.
+    Advanced with a kick-drift-kick leapfrog, which is symplectic, so orbits don't spiral in or out over long runs.
+    """
+    def __init__(self, positions, velocities, masses, softening=1e-3, method="auto", theta=0.5):
+        self.positions = np.asarray(positions, dtype=np.float64)
+        self.velocities = np.asarray(velocities, dtype=np.float64)
+        self.masses = np.asarray(masses, dtype=np.float64)
+        self.softening = softening
+        self.theta = theta
+        if method == "auto":
+            method = "barnes-hut" if len(self.masses) > BARNES_HUT_THRESHOLD else "all-pairs"
+        self.method = method
+        self.time = 0.0
+        # Accelerations at the current positions, reused as the first kick of the next step
+        self.accelerations = self.compute_accelerations()
+    def compute_accelerations(self):
+        if self.method == "barnes-hut":
+            return barnes_hut_accelerations(self.positions, self.masses, self.softening, self.theta)
+        return all_pairs_accelerations(self.positions, self.masses, self.softening)
+    def step(self, dt):
+        # Half kick, full drift, new forces, half kick
+        self.velocities += 0.5 * dt * self.accelerations
+        self.positions += dt * self.velocities
+        self.accelerations = self.compute_accelerations()
+        self.velocities += 0.5 * dt * self.accelerations
+        self.time += dt
+    def advance(self, duration, max_timestep):
+        # Cover the duration in equal steps no longer than max_timestep
+        steps = max(1, math.ceil(duration / max_timestep - 1e-9))
+        for _ in range(steps):
+            self.step(duration / steps)
+    def energy(self):
+        # Total kinetic plus potential energy, used to check how well the integrator conserves it
+        kinetic = 0.5 * np.sum(self.masses * np.einsum("ij,ij->i", self.velocities, self.velocities))
+        potential = 0.0
+        softening_squared = self.softening ** 2
+        for start in range(0, len(self.masses), ALL_PAIRS_CHUNK):
+            stop = min(start + ALL_PAIRS_CHUNK, len(self.masses))
+            offsets = self.positions[None, :, :] - self.positions[start:stop, None, :]
+            distance = np.sqrt(np.einsum("ijk,ijk->ij", offsets, offsets) + softening_squared)
+            pair_potential = self.masses[start:stop, None] * self.masses[None, :] / distance
+            # Count each pair once, and skip bodies paired with themselves
+            pair_potential[np.arange(start, stop)[:, None] >= np.arange(len(self.masses))[None, :]] = 0.0
+            potential -= G * pair_potential.sum()
+        return kinetic + potential
+def orbit_state(semi_major_axis, eccentricity, angle, central_mass=1.0):
+    """
+    Position and velocity of a body on a Keplerian orbit, at the given angle from periapsis.
+    """
+    p = semi_major_axis * (1 - eccentricity ** 2)
+    r = p / (1 + eccentricity * np.cos(angle))
+    speed = np.sqrt(G * central_mass / p)
+    # Radial and tangential velocity on the ellipse
+    radial = speed * eccentricity * np.sin(angle)
+    tangential = speed * (1 + eccentricity * np.cos(angle))
+    position = np.stack([r * np.cos(angle), r * np.sin(angle), np.zeros_like(r)], axis=-1)
+    velocity = np.stack([radial * np.cos(angle) - tangential * np.sin(angle), radial * np.sin(angle) + tangential * np.cos(angle), np.zeros_like(r)], axis=-1)
+    return position, velocity
+def build_system(args, rng):
+    """
+    The Sun, the planets from the command line, and optionally a belt of random small bodies.
+    """
+    planet_angles = rng.uniform(0, 2 * np.pi, len(args.masses))
+    planet_positions, planet_velocities = orbit_state(np.array(args.semi_major_axes), np.array(args.eccentricities), planet_angles)
+    positions = [np.zeros((1, 3)), planet_positions.reshape(-1, 3)]
+    velocities = [np.zeros((1, 3)), planet_velocities.reshape(-1, 3)]
+    masses = [np.ones(1), np.array(args.masses) * EARTH_MASS]
+    if args.random_bodies:
+        inner, outer = args.belt
+        belt_axes = rng.uniform(inner, outer, args.random_bodies)
+        belt_eccentricities = rng.uniform(0, 0.1, args.random_bodies)
+        belt_positions, belt_velocities = orbit_state(belt_axes, belt_eccentricities, rng.uniform(0, 2 * np.pi, args.random_bodies))
+        positions.append(belt_positions)
+        velocities.append(belt_velocities)
+        masses.append(np.full(args.random_bodies, args.random_body_mass * EARTH_MASS))
+    positions = np.concatenate(positions)
+    velocities = np.concatenate(velocities)
+    masses = np.concatenate(masses)
+    # Move into the centre-of-mass frame, so the whole system doesn't drift off screen
+    velocities -= (masses[:, None] * velocities).sum(axis=0) / masses.sum()
+    return NBodySystem(positions, velocities, masses, softening=args.softening, method=args.method, theta=args.theta)
+class TrajectoryWriter:
+    """
+    Streams body positions to disk a frame at a time, so long runs never hold the whole trajectory in memory.
+    .npy files are preallocated as a (frames, bodies, 3) float32 array and written through a memory map,
+    anything else is written as CSV rows of time, body, x, y, z.
+    """
+    def __init__(self, path, frames, bodies):
+        self.path = path
+        self.frame = 0
+        if path.endswith(".npy"):
+            self.array = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=(frames, bodies, 3))
+            self.file = None
+        else:
+            self.array = None
+            self.file = open(path, "w")
+            self.file.write("time,body,x,y,z\n")
+            self.body_ids = np.arange(bodies)
+    def write(self, time, positions):
+        if self.array is not None:
+            self.array[self.frame] = positions
+        else:
+            block = np.column_stack([np.full(len(positions), time), self.body_ids, positions])
+            np.savetxt(self.file, block, fmt=["%.6f", "%d", "%.9g", "%.9g", "%.9g"], delimiter=",")
+        self.frame += 1
+    def close(self):
+        if self.array is not None:
+            self.array.flush()
+            del self.array
+        else:
+            self.file.close()
+def run_headless(system, args):
+    """
+    Simulate without rendering, saving every save_every-th step to the output file.
+    """
+    steps = max(1, math.ceil(args.duration / args.timestep - 1e-9))
+    dt = args.duration / steps
+    frames = steps // args.save_every + 1
+    energy_check = len(system.masses) <= 5000
+    initial_energy = system.energy() if energy_check else None
+    writer = TrajectoryWriter(args.output, frames, len(system.masses))
+    try:
+        writer.write(system.time, system.positions)
+        # Report progress about every 10% of the run
+        report_every = max(1, steps // 10)
+        for step in range(1, steps + 1):
+            system.step(dt)
+            if step % args.save_every == 0:
+                writer.write(system.time, system.positions)
+            if step % report_every == 0:
+                print(f"  {100 * step / steps:5.1f}%  t = {system.time:.3f} years")
+    finally:
+        writer.close()
+    print(f"Simulated {len(system.masses)} bodies for {args.duration} years in {steps} steps ({system.method}).")
+    print(f"Saved {writer.frame} frames to {args.output}")
+    if energy_check:
+        drift = abs((system.energy() - initial_energy) / initial_energy)
+        print(f"Relative energy drift: {drift:.2e}")
+def render_animation(system, args):
+    """
+    Render the simulation with Manim, advancing the engine once per video frame.
+    """
+    # Manim is only needed for rendering, so headless runs work without it
+    from manim import BLUE, GREEN, ORANGE, PURPLE, RED, TEAL, WHITE, YELLOW, Dot, Scene, TracedPath, VGroup, config
+    config.frame_rate = args.frame_rate
+    config.pixel_height = int(args.resolution[:-1])
+    config.pixel_width = int(16 / 9 * config.pixel_height)
+    colors = [RED, GREEN, BLUE, ORANGE, PURPLE, TEAL]
+    # Fit the widest orbit into the frame
+    scale = 3.5 / max(float(np.abs(system.positions[:, :2]).max()), 1e-9)
+    years_per_second = args.duration / args.video_seconds
+    planet_count = len(args.masses)
+    class PlanetarySystem(Scene):
+        def construct(self):
+            # The Sun, the planets and the belt bodies, which are drawn smaller and without trails
+            dots = [Dot(color=YELLOW, radius=0.05)]
+            dots += [Dot(color=random.choice(colors), radius=0.03) for _ in range(planet_count)]
+            dots += [Dot(color=WHITE, radius=0.01) for _ in range(len(system.masses) - planet_count - 1)]
+            for dot, position in zip(dots, system.positions * scale):
+                dot.move_to(position)
+            bodies = VGroup(*dots)
+            self.add(bodies)
+            self.add(VGroup(*[TracedPath(dot.get_center, stroke_opacity=0.8, stroke_color=dot.color) for dot in dots[1:planet_count + 1]]))
+            def update_bodies(mob, dt):
+                system.advance(years_per_second * dt, args.timestep)
+                for dot, position in zip(dots, system.positions * scale):
+                    dot.move_to(position)
+            bodies.add_updater(update_bodies)
+            self.wait(args.video_seconds)
+    PlanetarySystem().render()
 def main():
-    parser = argparse.ArgumentParser(description="""
+    parser = argparse.ArgumentParser(formatter_class=argparse.RawDescriptionHelpFormatter, description="""
     Planetary System Simulator
-    This script uses Manim to simulate and visualize a planetary system. 
-    You can specify the number of planets and their properties such as mass, 
-    initial position, velocity, semi-major axis, and eccentricity.
+    Simulates a planetary system with full N-body gravity, where every body pulls on every other, and either renders it
+    with Manim or, with --no-render, streams the trajectories to a .npy or CSV file. Up to 5000 bodies use exact all-pairs
+    gravity, bigger systems use a Barnes–Hut tree. Add thousands of asteroids with --random_bodies.
     How to use:
-    1. Specify the number of planets using the --num_planets argument.
-    2. For each planet, provide its mass, semi-major axis, and eccentricity.
-    3. Set the simulation duration and timestep.
-    4. Choose the frame rate and resolution for the output animation.
-    Example:
-    python planetary_system_simulator.py --num_planets 3 
-           --masses 1 0.5 0.3 
-           --semi_major_axes 1 1.5 2 
-           --eccentricities 0.1 0.2 0.3 
-           --duration 10 
-           --timestep 0.01 
-           --frame_rate 30 
+    1. Give each planet a mass, semi-major axis and eccentricity.
+    2. Set the simulation duration and timestep.
+    3. Render an animation, or add --no-render and an --output file to save the trajectories.
+    Examples:
+    python planetary_system_simulator.py --masses 1 0.5 0.3
+           --semi_major_axes 1 1.5 2
+           --eccentricities 0.1 0.2 0.3
+           --duration 10
+           --timestep 0.01
+           --frame_rate 30
            --resolution 1080p
+    python planetary_system_simulator.py --masses 317.8 95.2 --semi_major_axes 5.2 9.5 --eccentricities 0.05 0.06
+           --random_bodies 5000 --duration 100 --timestep 0.01 --no-render --output belt.npy --save_every 10
     """)
-    parser.add_argument('--num_planets', type=int, required=True, help='Number of planets in the system')
-    parser.add_argument('--masses', type=float, nargs='+', required=True, help='Masses of planets (in Earth masses)')
-    parser.add_argument('--semi_major_axes', type=float, nargs='+', required=True, help='Semi-major axes of planet orbits (in AU)')
-    parser.add_argument('--eccentricities', type=float, nargs='+', required=True, help='Eccentricities of planet orbits')
+    parser.add_argument('--num_planets', type=int, help='Number of planets in the system, defaults to the number of masses given')
+    parser.add_argument('--masses', type=float, nargs='+', default=[], help='Masses of planets (in Earth masses)')
+    parser.add_argument('--semi_major_axes', type=float, nargs='+', default=[], help='Semi-major axes of planet orbits (in AU)')
+    parser.add_argument('--eccentricities', type=float, nargs='+', default=[], help='Eccentricities of planet orbits')
+    parser.add_argument('--random_bodies', type=int, default=0, help='Number of random small bodies to add in a belt')
+    parser.add_argument('--belt', type=float, nargs=2, default=[2.2, 3.3], metavar=('INNER', 'OUTER'), help='Inner and outer edge of the belt of random bodies (in AU)')
+    parser.add_argument('--random_body_mass', type=float, default=1e-4, help='Mass of each random body (in Earth masses), 0 for massless test particles')
     parser.add_argument('--duration', type=float, required=True, help='Simulation duration (in years)')
     parser.add_argument('--timestep', type=float, required=True, help='Simulation timestep (in years)')
+    parser.add_argument('--method', choices=['auto', 'all-pairs', 'barnes-hut'], default='auto', help='How to compute gravity, auto picks all-pairs for small systems and Barnes–Hut for large ones')
+    parser.add_argument('--theta', type=float, default=0.5, help='Barnes–Hut opening angle, smaller is more accurate and slower')
+    parser.add_argument('--softening', type=float, default=1e-3, help='Gravitational softening length (in AU), keeps close encounters finite')
+    parser.add_argument('--seed', type=int, help='Random seed, for reproducible starting positions')
+    parser.add_argument('--no-render', action='store_true', help='Simulate without Manim and save the trajectories to --output')
+    parser.add_argument('--output', default='trajectories.npy', help='Trajectory file for --no-render, .npy for a (frames, bodies, 3) array, anything else for CSV')
+    parser.add_argument('--save_every', type=int, default=1, help='Save every Nth step in --no-render mode')
     parser.add_argument('--frame_rate', type=int, default=30, help='Frame rate of the output animation')
     parser.add_argument('--resolution', choices=['480p', '720p', '1080p'], default='1080p', help='Resolution of the output animation')
+    parser.add_argument('--video_seconds', type=float, default=10, help='Length of the rendered animation (in seconds)')
     args = parser.parse_args()
     # Validate input
-    if args.num_planets != len(args.masses) or args.num_planets != len(args.semi_major_axes) or args.num_planets != len(args.eccentricities):
-        raise ValueError("Number of planets must match the number of masses, semi-major axes, and eccentricities provided")
-    # Convert units
-    AU = 1.496e11  # 1 AU in meters
-    year = 365.25 * 24 * 3600  # 1 year in seconds
-    earth_mass = 5.97e24  # Earth mass in kg
-    # Create planet objects
-    planets = []
-    colors = [RED, GREEN, BLUE, ORANGE, PURPLE, TEAL]  # Add more colors if needed
-    for i in range(args.num_planets):
-        # Calculate initial position and velocity based on orbital elements
-        a = args.semi_major_axes[i] * AU
-        e = args.eccentricities[i]
-        # Random angle for initial position
-        theta = random.uniform(0, 2*np.pi)
-        r = a * (1 - e**2) / (1 + e * np.cos(theta))
-        x = r * np.cos(theta)
-        y = r * np.sin(theta)
-        # Calculate velocity (perpendicular to position vector)
-        v = np.sqrt(6.67430e-11 * 1.989e30 * (2/r - 1/a))  # Use Sun's mass
-        vx = -v * np.sin(theta)
-        vy = v * np.cos(theta)
-        planets.append({
-            'mass': args.masses[i] * earth_mass,
-            'initial_position': np.array([x, y, 0]) / (100 * AU),  # Scale down further for better visualization
-            'velocity': np.array([vx, vy, 0]) / (100 * AU) * year,  # Scale velocity accordingly
-            'color': random.choice(colors)
-        })
-    # Set up Manim configuration
-    config.frame_rate = args.frame_rate
-    config.pixel_height = int(args.resolution[:-1])
-    config.pixel_width = int(16/9 * config.pixel_height)
-    # Create and render the animation
+    num_planets = len(args.masses) if args.num_planets is None else args.num_planets
+    if num_planets != len(args.masses) or num_planets != len(args.semi_major_axes) or num_planets != len(args.eccentricities):
+        parser.error("Number of planets must match the number of masses, semi-major axes, and eccentricities provided")
+    if not num_planets and not args.random_bodies:
+        parser.error("Add at least one planet, or some --random_bodies")
+    if args.timestep <= 0 or args.duration <= 0 or args.save_every < 1:
+        parser.error("Duration, timestep and save_every must be positive")
+    random.seed(args.seed)
+    rng = np.random.default_rng(args.seed)
+    system = build_system(args, rng)
     try:
-        scene = PlanetarySystem(planets, args.duration, args.timestep / year)
-        scene.render()
-        print("Animation rendered successfully!")
+        if args.no_render:
+            run_headless(system, args)
+        else:
+            render_animation(system, args)
+            print("Animation rendered successfully!")
+    except ImportError:
+        print("Rendering needs Manim (pip install manim). Use --no-render to simulate without it.", file=sys.stderr)
+        sys.exit(1)
     except Exception as e:
-        print(f"An error occurred during rendering: {str(e)}")
+        print(f"An error occurred during the simulation: {str(e)}", file=sys.stderr)
+        sys.exit(1)
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,11 +1,16 @@
 import argparse
+import os
+import secrets
 import string
-import random
+import sys
+import time
 # Define the character sets
 LOWERCASE_CHARS = string.ascii_lowercase
 UPPERCASE_CHARS = string.ascii_uppercase
 DIGIT_CHARS = string.digits
 SPECIAL_CHARS = string.punctuation
+# Random bytes are drawn from the OS this many at a time
+BLOCK_SIZE = 1 << 20
 # Create the parser
 parser = argparse.ArgumentParser(
     prog="secure_password_generator",
@@ -16,6 +21,7 @@ parser = argparse.ArgumentParser(
     2. Specify the desired password length using the '--length' flag (e.g., '--length 12')
     3. Optionally, include or exclude specific character types using the '--include' and '--exclude' flags (e.g., '--include d,s' to include digits and special characters)
     4. The generated password will be printed to the console.
+    5. Need lots of them? '--count 500000 --output passwords.txt' writes one per line, readable only by you.
     """,
 )
 parser.add_argument("--length", type=int, default=8, help="Specify the desired password length (default: 8)")
@@ -29,6 +35,8 @@ parser.add_argument(
     metavar="chars",
     help="Exclude specific character types: l (lowercase), u (uppercase), d (digits), s (special)",
 )
+parser.add_argument("--count", type=int, default=1, help="Number of passwords to generate (default: 1)")
+parser.add_argument("--output", metavar="file", help="Write the passwords to this file, one per line, instead of printing them")
 # Define the character type mapping
 CHAR_TYPE_MAP = {
     "l": LOWERCASE_CHARS,
@@ -36,23 +44,68 @@ CHAR_TYPE_MAP = {
     "d": DIGIT_CHARS,
     "s": SPECIAL_CHARS,
 }
-# Function to generate the password
-def generate_password(length, include_chars, exclude_chars):
+# Function to build the character set
+def build_char_set(include_chars, exclude_chars):
     """
-    Generate a random password based on the specified length and character types.
+    Combine the included character types, minus the excluded ones, into one string of characters.
     """
     # Ensure at least one digit and one special character are included
     include_chars += "d" if "d" not in include_chars else ""
     include_chars += "s" if "s" not in include_chars else ""
     # Create the character set by combining the specified character types
-    char_set = "".join(CHAR_TYPE_MAP[char_type] for char_type in include_chars if char_type not in exclude_chars)
-    # Generate the password by randomly selecting characters from the character set
-    password = "".join(random.choice(char_set) for _ in range(length))
-    # Shuffle the password for added security
-    password = "".join(random.sample(password, len(password)))
-    return password
+    char_set = "".join(CHAR_TYPE_MAP[char_type] for char_type in dict.fromkeys(include_chars) if char_type not in exclude_chars)
+    if not char_set:
+        raise ValueError("No characters left to build passwords from, check --include and --exclude.")
+    return char_set
+# Function to draw random characters in bulk
+def random_chars(char_set, count, block_size=BLOCK_SIZE):
+    """
+    Yield chunks of bytes, count characters in total, each drawn uniformly from char_set.
+    Random bytes come from the OS in large blocks. Bytes at or above the largest multiple of len(char_set) are thrown away,
+    so every character is exactly equally likely, and the rest map to characters with a single bytes.translate call.
+    """
+    size = len(char_set)
+    limit = 256 - 256 % size
+    # Byte b becomes char_set[b % size], rejected bytes are deleted before the table is applied
+    table = bytes(char_set.encode("ascii")[value % size] for value in range(256))
+    rejected = bytes(range(limit, 256))
+    remaining = count
+    while remaining:
+        # Ask for enough extra bytes to make up for the ones that will be rejected
+        block = secrets.token_bytes(min(block_size, remaining * 256 // limit + 64))
+        chars = block.translate(table, rejected)[:remaining]
+        remaining -= len(chars)
+        yield chars
+# Function to generate many passwords
+def generate_passwords(count, length, char_set):
+    """
+    Yield count passwords of the given length, a block's worth of them at a time as lists of strings.
+    """
+    buffer = b""
+    for chars in random_chars(char_set, count * length):
+        buffer += chars
+        complete = len(buffer) // length * length
+        if complete:
+            text = buffer[:complete].decode("ascii")
+            buffer = buffer[complete:]
+            yield [text[start:start + length] for start in range(0, complete, length)]
+# Function to generate the password
+def generate_password(length, include_chars, exclude_chars):
+    """
+    Generate a random password based on the specified length and character types.
+    """
+    char_set = build_char_set(include_chars, exclude_chars)
+    return "".join(b.decode("ascii") for b in random_chars(char_set, length))
+# Function to write passwords out as they're generated
+def write_passwords(output, count, length, char_set):
+    for passwords in generate_passwords(count, length, char_set):
+        output.write("\n".join(passwords) + "\n")
 # Parse the command-line arguments
 args = parser.parse_args()
+if args.length < 1:
+    parser.error("--length must be at least 1")
+if args.count < 1:
+    parser.error("--count must be at least 1")
 # Process the include and exclude character types
 include_chars = ""
 exclude_chars = ""
@@ -60,17 +113,30 @@ if args.include:
     for char_type in args.include.lower():
         if char_type in CHAR_TYPE_MAP:
             include_chars += char_type
-        else:
+        elif char_type not in ", ":
             print(f"Warning: Invalid character type '{char_type}' in --include flag.")
 if args.exclude:
     for char_type in args.exclude.lower():
         if char_type in CHAR_TYPE_MAP:
             exclude_chars += char_type
-        else:
+        elif char_type not in ", ":
             print(f"Warning: Invalid character type '{char_type}' in --exclude flag.")
 # Generate the password
 try:
-    password = generate_password(args.length, include_chars, exclude_chars)
-    print(f"Generated password: {password}")
+    if args.count == 1 and not args.output:
+        password = generate_password(args.length, include_chars, exclude_chars)
+        print(f"Generated password: {password}")
+    else:
+        char_set = build_char_set(include_chars, exclude_chars)
+        start = time.perf_counter()
+        if args.output:
+            # Created readable and writable by the owner only, these are credentials
+            with os.fdopen(os.open(args.output, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as output:
+                write_passwords(output, args.count, args.length, char_set)
+            print(f"Wrote {args.count} passwords to {args.output} in {time.perf_counter() - start:.2f}s")
+        else:
+            write_passwords(sys.stdout, args.count, args.length, char_set)
 except ValueError as e:
-    print(f"Error: {e}")
\ No newline at end of file
+    print(f"Error: {e}")
+except OSError as e:
+    print(f"Error: Couldn't write passwords: {e}")
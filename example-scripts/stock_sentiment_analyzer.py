@@ -1,5 +1,8 @@
 import argparse
+from collections import deque
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import islice
 import random
 import json
 import csv
@@ -7,6 +10,11 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 from textblob import TextBlob
 import pandas as pd
+# Headlines are read, scored and aggregated this many at a time, so memory stays flat however many years of news there are
+DEFAULT_CHUNK_SIZE = 50_000
+# How many distinct headlines keep their sentiment score cached
+SENTIMENT_CACHE_SIZE = 1 << 18
+DEFAULT_SOURCES = ['Bloomberg', 'Reuters', 'CNBC']
 def parse_arguments():
     """Parse command line arguments."""
     parser = argparse.ArgumentParser(description="""
@@ -17,19 +25,23 @@ def parse_arguments():
     3. Define custom buzzwords with --buzzwords
     4. Choose output format with --output-format
     5. Set analysis frequency with --frequency
+    6. Analyze your own headlines with --input (a CSV or JSON Lines file with date, source and headline columns).
+       Big files are processed in chunks of --chunk-size headlines, so years of news fit in memory.
     Example:
     python stock_sentiment_analyzer.py --sources Bloomberg Reuters --start-date 2023-01-01 --end-date 2023-06-30 --buzzwords bullish bearish crypto --output-format csv --frequency weekly
+    python stock_sentiment_analyzer.py --input headlines.csv --start-date 2015-01-01 --end-date 2023-12-31 --frequency weekly
     """)
-    parser.add_argument('--sources', nargs='+', default=['Bloomberg', 'Reuters', 'CNBC'], help='List of news sources')
+    parser.add_argument('--sources', nargs='+', help=f"List of news sources (default: {' '.join(DEFAULT_SOURCES)} for generated headlines, all sources in --input)")
     parser.add_argument('--start-date', type=str, required=True, help='Start date (YYYY-MM-DD)')
     parser.add_argument('--end-date', type=str, required=True, help='End date (YYYY-MM-DD)')
     parser.add_argument('--buzzwords', nargs='+', default=['bullish', 'bearish', 'volatility', 'recession', 'growth'], help='Custom buzzwords to track')
     parser.add_argument('--output-format', choices=['csv', 'json'], default='csv', help='Output format for data')
     parser.add_argument('--frequency', choices=['daily', 'weekly'], default='daily', help='Analysis frequency')
+    parser.add_argument('--input', type=str, help='CSV or JSON Lines file of headlines to analyze instead of generated ones')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help=f'Headlines processed at a time (default: {DEFAULT_CHUNK_SIZE})')
     return parser.parse_args()
-def generate_dummy_headlines(start_date, end_date, sources, buzzwords):
-    """Generate dummy headlines for the specified date range."""
-    headlines = []
+def iter_dummy_headlines(start_date, end_date, sources, buzzwords):
+    """Generate dummy headlines for the specified date range, one at a time."""
     current_date = start_date
     while current_date <= end_date:
         for _ in range(random.randint(1, 5)):  # 1-5 headlines per day
@@ -41,32 +53,126 @@ def generate_dummy_headlines(start_date, end_date, sources, buzzwords):
             # Add a buzzword with 30% probability
             if random.random() < 0.3:
                 headline += f" {random.choice(buzzwords)}"
-            headlines.append({
+            yield {
                 'date': current_date.strftime('%Y-%m-%d'),
                 'source': source,
                 'headline': headline
-            })
+            }
         current_date += timedelta(days=1)
-    return headlines
+def generate_dummy_headlines(start_date, end_date, sources, buzzwords):
+    """Generate dummy headlines for the specified date range."""
+    return list(iter_dummy_headlines(start_date, end_date, sources, buzzwords))
+def chunk_records(records, chunk_size):
+    """Group an iterable of headline dicts into DataFrames of at most chunk_size rows."""
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, chunk_size))
+        if not chunk:
+            return
+        yield pd.DataFrame(chunk)
+def read_headline_chunks(path, chunk_size):
+    """Read a CSV or JSON Lines file of headlines in chunks, without loading it all at once."""
+    if path.endswith(('.jsonl', '.json')):
+        reader = pd.read_json(path, lines=True, chunksize=chunk_size, dtype={'source': str, 'headline': str})
+    else:
+        reader = pd.read_csv(path, chunksize=chunk_size, usecols=['date', 'source', 'headline'], dtype={'source': str, 'headline': str})
+    with reader:
+        yield from reader
+@lru_cache(maxsize=SENTIMENT_CACHE_SIZE)
 def analyze_sentiment(headline):
-    """Analyze sentiment of a headline using TextBlob."""
+    """Analyze sentiment of a headline using TextBlob. Repeated headlines are only scored once."""
     return TextBlob(headline).sentiment.polarity
+class BuzzwordMatcher:
+    """Aho-Corasick automaton that finds every buzzword in a headline in a single pass over its characters."""
+    def __init__(self, buzzwords):
+        self.buzzwords = [buzzword.lower() for buzzword in buzzwords]
+        # Trie of the buzzwords: each node's transitions, and the buzzwords that end at it
+        transitions = [{}]
+        outputs = [set()]
+        for index, buzzword in enumerate(self.buzzwords):
+            node = 0
+            for character in buzzword:
+                if character not in transitions[node]:
+                    transitions[node][character] = len(transitions)
+                    transitions.append({})
+                    outputs.append(set())
+                node = transitions[node][character]
+            outputs[node].add(index)
+        # Breadth-first, link every node to the longest suffix of its text that's also in the trie, and fill in the missing
+        # transitions from there, so matching never has to backtrack
+        fail = [0] * len(transitions)
+        queue = deque(transitions[0].values())
+        while queue:
+            node = queue.popleft()
+            outputs[node] |= outputs[fail[node]]
+            for character, child in list(transitions[node].items()):
+                fail[child] = transitions[fail[node]].get(character, 0) if node else 0
+                queue.append(child)
+            if node:
+                for character, target in transitions[fail[node]].items():
+                    transitions[node].setdefault(character, target)
+        self.transitions = transitions
+        self.outputs = [frozenset(output) for output in outputs]
+    def matches(self, headline):
+        """Return the indexes of the buzzwords that appear in a headline."""
+        transitions = self.transitions
+        outputs = self.outputs
+        found = set(outputs[0])
+        node = 0
+        for character in headline.lower():
+            node = transitions[node].get(character, 0)
+            if outputs[node]:
+                found |= outputs[node]
+        return found
+    def count(self, headline):
+        """Count how many of the buzzwords appear in a headline."""
+        return len(self.matches(headline))
+@lru_cache(maxsize=32)
+def buzzword_matcher(buzzwords):
+    """Build the matcher for a tuple of buzzwords once, and reuse it for every headline checked against the same list."""
+    return BuzzwordMatcher(buzzwords)
 def count_buzzwords(headline, buzzwords):
     """Count occurrences of buzzwords in a headline."""
-    return sum(buzzword.lower() in headline.lower() for buzzword in buzzwords)
-def aggregate_data(headlines, buzzwords, frequency):
-    """Aggregate headline data based on the specified frequency."""
-    df = pd.DataFrame(headlines)
-    df['date'] = pd.to_datetime(df['date'])
-    df['sentiment'] = df['headline'].apply(analyze_sentiment)
-    df['buzzword_count'] = df['headline'].apply(lambda x: count_buzzwords(x, buzzwords))
+    return buzzword_matcher(tuple(buzzwords)).count(headline)
+def score_chunk(chunk, matcher, frequency):
+    """Score one chunk of headlines and sum it up per period, ready to be merged with the other chunks."""
+    # Sentiment and buzzwords are worked out once per distinct headline, then spread back over the rows
+    unique = pd.Series(chunk['headline'].astype(str).unique())
+    chunk = chunk.assign(
+        date=pd.to_datetime(chunk['date']),
+        sentiment=chunk['headline'].astype(str).map(dict(zip(unique, unique.map(analyze_sentiment)))),
+        buzzword_count=chunk['headline'].astype(str).map(dict(zip(unique, unique.map(matcher.count)))),
+    )
     if frequency == 'weekly':
-        df['date'] = df['date'].dt.to_period('W').apply(lambda r: r.start_time)
-    aggregated = df.groupby('date').agg({
-        'sentiment': 'mean',
-        'buzzword_count': 'sum'
-    }).reset_index()
-    return aggregated
+        chunk['date'] = chunk['date'].dt.to_period('W').dt.start_time
+    # Sums and counts rather than means, so chunks can simply be added together
+    return chunk.groupby('date').agg(sentiment_sum=('sentiment', 'sum'), headlines=('sentiment', 'size'), buzzword_count=('buzzword_count', 'sum'))
+def aggregate_chunks(chunks, buzzwords, frequency, start_date=None, end_date=None, sources=None):
+    """Aggregate headline chunks based on the specified frequency, holding only one chunk and the running totals in memory."""
+    matcher = buzzword_matcher(tuple(buzzwords))
+    totals = None
+    rows = 0
+    for chunk in chunks:
+        if sources:
+            chunk = chunk[chunk['source'].isin(sources)]
+        if start_date is not None:
+            dates = pd.to_datetime(chunk['date'])
+            chunk = chunk[(dates >= start_date) & (dates < end_date + timedelta(days=1))]
+        if chunk.empty:
+            continue
+        partial = score_chunk(chunk, matcher, frequency)
+        totals = partial if totals is None else totals.add(partial, fill_value=0)
+        rows += len(chunk)
+    if totals is None:
+        return pd.DataFrame(columns=['date', 'sentiment', 'buzzword_count']), 0
+    aggregated = pd.DataFrame({
+        'sentiment': totals['sentiment_sum'] / totals['headlines'],
+        'buzzword_count': totals['buzzword_count'].astype(int),
+    }).sort_index().rename_axis('date').reset_index()
+    return aggregated, rows
+def aggregate_data(headlines, buzzwords, frequency, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Aggregate headline data based on the specified frequency."""
+    return aggregate_chunks(chunk_records(headlines, chunk_size), buzzwords, frequency)[0]
 def visualize_data(data):
     """Create visualizations for sentiment and buzzword frequency."""
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10))
@@ -74,7 +180,8 @@ def visualize_data(data):
     ax1.set_title('Sentiment Trend Over Time')
     ax1.set_xlabel('Date')
     ax1.set_ylabel('Average Sentiment')
-    sns.barplot(x='date', y='buzzword_count', data=data, ax=ax2)
+    # A plain bar chart on a date axis, seaborn's barplot would put a label under every one of possibly thousands of bars
+    ax2.bar(data['date'], data['buzzword_count'], width=0.8 * (data['date'].diff().min().days if len(data) > 1 else 1))
     ax2.set_title('Buzzword Frequency Over Time')
     ax2.set_xlabel('Date')
     ax2.set_ylabel('Buzzword Count')
@@ -101,14 +208,31 @@ def main():
     if start_date > end_date:
         print("Error: Start date must be before end date.")
         return
-    print("Generating dummy headlines...")
-    headlines = generate_dummy_headlines(start_date, end_date, args.sources, args.buzzwords)
+    if args.chunk_size < 1:
+        print("Error: --chunk-size must be at least 1.")
+        return
+    if args.input:
+        print(f"Reading headlines from '{args.input}'...")
+        chunks = read_headline_chunks(args.input, args.chunk_size)
+        filters = {'start_date': start_date, 'end_date': end_date, 'sources': args.sources}
+    else:
+        print("Generating dummy headlines...")
+        chunks = chunk_records(iter_dummy_headlines(start_date, end_date, args.sources or DEFAULT_SOURCES, args.buzzwords), args.chunk_size)
+        filters = {}
     print("Analyzing sentiment and counting buzzwords...")
-    aggregated_data = aggregate_data(headlines, args.buzzwords, args.frequency)
+    try:
+        aggregated_data, rows = aggregate_chunks(chunks, args.buzzwords, args.frequency, **filters)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Error: Couldn't read headlines: {e}")
+        return
+    if aggregated_data.empty:
+        print("No headlines found for that date range and sources.")
+        return
+    print(f"Analyzed {rows} headlines ({analyze_sentiment.cache_info().currsize} distinct).")
     print("Creating visualizations...")
     visualize_data(aggregated_data)
     print(f"Saving data in {args.output_format} format...")
     save_data(aggregated_data, args.output_format)
     print("Analysis complete!")
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
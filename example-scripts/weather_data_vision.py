@@ -1,29 +1,110 @@
 import argparse
+import asyncio
+import json
+import os
+import re
+import threading
 import requests
+import aiohttp
 import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
+from pathlib import Path
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import schedule
 import time
 import logging
-from geopy.geocoders import Nominatim
 import folium
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 # OpenWeatherMap API endpoint
 API_ENDPOINT = "http://api.openweathermap.org/data/2.5/forecast"
+# OpenStreetMap's Nominatim geocoder, called directly so it can share the HTTP session and be pointed at a stand-in server
+GEOCODE_ENDPOINT = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "weather_data_vision"
+# Locations only need looking up once, their coordinates are kept here between runs
+GEOCODE_CACHE_PATH = Path.home() / ".cache" / "weather_data_vision" / "geocode.json"
+# Nominatim allows one request per second
+GEOCODE_INTERVAL = 1.0
+# Forecasts fetched at the same time in multi-location mode
+DEFAULT_CONCURRENCY = 10
+REQUEST_TIMEOUT = 30
+class GeocodeCache:
+    """Coordinates of every location looked up so far, saved to a JSON file so they survive restarts."""
+    def __init__(self, path=GEOCODE_CACHE_PATH):
+        self.path = Path(path)
+        self.lock = threading.Lock()
+        try:
+            self.entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+    @staticmethod
+    def key(location):
+        return " ".join(location.lower().split())
+    def get(self, location):
+        coordinates = self.entries.get(self.key(location))
+        return tuple(coordinates) if coordinates else None
+    def put(self, location, lat, lon):
+        with self.lock:
+            self.entries[self.key(location)] = [lat, lon]
+            # Written to a temporary file first, so a crash never leaves a half-written cache behind
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            temporary = self.path.with_suffix(".tmp")
+            temporary.write_text(json.dumps(self.entries, indent=1, sort_keys=True))
+            os.replace(temporary, self.path)
+# Where the script sends its requests, overridable from the command line to test against a local stand-in API
+settings = {'api_endpoint': API_ENDPOINT, 'geocode_endpoint': GEOCODE_ENDPOINT, 'concurrency': DEFAULT_CONCURRENCY}
+_session = None
+_geocode_cache = None
+_last_geocode = 0.0
+def get_session():
+    """Return the HTTP session every request goes through, so connections are kept open and reused."""
+    global _session
+    if _session is None:
+        _session = requests.Session()
+        _session.headers['User-Agent'] = USER_AGENT
+        # Rate limits and server hiccups are retried with backoff
+        retries = Retry(total=3, backoff_factor=1, status_forcelist=[429, 500, 502, 503, 504])
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=settings['concurrency'], max_retries=retries)
+        _session.mount("http://", adapter)
+        _session.mount("https://", adapter)
+    return _session
+def get_geocode_cache():
+    global _geocode_cache
+    if _geocode_cache is None:
+        _geocode_cache = GeocodeCache()
+    return _geocode_cache
+def parse_geocode_response(results):
+    # Nominatim returns a list of matches, best first, with coordinates as strings
+    if not results:
+        return None, None
+    return float(results[0]['lat']), float(results[0]['lon'])
 def get_coordinates(location):
     """Get latitude and longitude for a given location."""
-    geolocator = Nominatim(user_agent="weather_data_vision")
+    global _last_geocode
+    cache = get_geocode_cache()
+    cached = cache.get(location)
+    if cached:
+        return cached
     try:
-        location_data = geolocator.geocode(location)
-        return location_data.latitude, location_data.longitude
-    except:
+        # Space out lookups to respect the geocoder's rate limit
+        time.sleep(max(0.0, _last_geocode + GEOCODE_INTERVAL - time.monotonic()))
+        _last_geocode = time.monotonic()
+        response = get_session().get(settings['geocode_endpoint'], params={'q': location, 'format': 'json', 'limit': 1}, timeout=REQUEST_TIMEOUT)
+        response.raise_for_status()
+        lat, lon = parse_geocode_response(response.json())
+    except (requests.RequestException, ValueError, KeyError) as e:
+        logger.error(f"Unable to find coordinates for {location}: {e}")
+        return None, None
+    if lat is None:
         logger.error(f"Unable to find coordinates for {location}")
         return None, None
-def fetch_weather_data(api_key, location, units='metric'):
+    cache.put(location, lat, lon)
+    return lat, lon
+def fetch_weather_data(api_key, location, units='metric', coordinates=None):
     """Fetch weather data from OpenWeatherMap API."""
-    lat, lon = get_coordinates(location)
+    lat, lon = coordinates or get_coordinates(location)
     if lat is None or lon is None:
         return None
     params = {
@@ -33,12 +114,57 @@ def fetch_weather_data(api_key, location, units='metric'):
         'units': units
     }
     try:
-        response = requests.get(API_ENDPOINT, params=params)
+        response = get_session().get(settings['api_endpoint'], params=params, timeout=REQUEST_TIMEOUT)
         response.raise_for_status()
         return response.json()
     except requests.RequestException as e:
         logger.error(f"Error fetching weather data: {e}")
         return None
+async def get_coordinates_async(session, location, geocode_lock):
+    """Get latitude and longitude for a location from the cache, or from the geocoder one lookup at a time."""
+    global _last_geocode
+    cache = get_geocode_cache()
+    cached = cache.get(location)
+    if cached:
+        return cached
+    async with geocode_lock:
+        await asyncio.sleep(max(0.0, _last_geocode + GEOCODE_INTERVAL - time.monotonic()))
+        _last_geocode = time.monotonic()
+        try:
+            async with session.get(settings['geocode_endpoint'], params={'q': location, 'format': 'json', 'limit': 1}) as response:
+                response.raise_for_status()
+                lat, lon = parse_geocode_response(await response.json(content_type=None))
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError, KeyError) as e:
+            logger.error(f"Unable to find coordinates for {location}: {e}")
+            return None, None
+    if lat is None:
+        logger.error(f"Unable to find coordinates for {location}")
+        return None, None
+    cache.put(location, lat, lon)
+    return lat, lon
+async def fetch_location_async(session, api_key, location, units, semaphore, geocode_lock):
+    """Geocode one location and fetch its forecast. Returns (location, coordinates, raw data or None)."""
+    coordinates = await get_coordinates_async(session, location, geocode_lock)
+    if coordinates[0] is None:
+        return location, coordinates, None
+    params = {'lat': coordinates[0], 'lon': coordinates[1], 'appid': api_key, 'units': units}
+    async with semaphore:
+        try:
+            async with session.get(settings['api_endpoint'], params=params) as response:
+                response.raise_for_status()
+                return location, coordinates, await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+            logger.error(f"Error fetching weather data for {location}: {e}")
+            return location, coordinates, None
+async def fetch_all_weather_data(api_key, locations, units='metric', concurrency=None):
+    """Fetch forecasts for many locations at once over one pool of connections."""
+    concurrency = concurrency or settings['concurrency']
+    semaphore = asyncio.Semaphore(concurrency)
+    geocode_lock = asyncio.Lock()
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    timeout = aiohttp.ClientTimeout(total=REQUEST_TIMEOUT)
+    async with aiohttp.ClientSession(connector=connector, timeout=timeout, headers={'User-Agent': USER_AGENT}) as session:
+        return await asyncio.gather(*(fetch_location_async(session, api_key, location, units, semaphore, geocode_lock) for location in locations))
 def parse_weather_data(data):
     """Parse the raw weather data into a more usable format."""
     if not data or 'list' not in data:
@@ -53,7 +179,9 @@ def parse_weather_data(data):
             'description': item['weather'][0]['description']
         })
     return parsed_data
-def create_temperature_chart(data, location):
+def slugify(location):
+    return re.sub(r'[^a-z0-9]+', '_', location.lower()).strip('_') or 'location'
+def create_temperature_chart(data, location, filename='temperature_forecast.png'):
     """Create a temperature chart using matplotlib."""
     dates = [item['datetime'] for item in data]
     temps = [item['temperature'] for item in data]
@@ -64,13 +192,20 @@ def create_temperature_chart(data, location):
     plt.ylabel("Temperature (°C)")
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.savefig('temperature_forecast.png')
+    plt.savefig(filename)
     plt.close()
 def create_weather_map(location, lat, lon):
     """Create a folium map with the location marker."""
     m = folium.Map(location=[lat, lon], zoom_start=10)
     folium.Marker([lat, lon], popup=location).add_to(m)
     m.save("weather_location_map.html")
+def create_multi_location_map(markers):
+    """Create a folium map with a marker for every location, showing its current temperature."""
+    m = folium.Map(location=[sum(lat for _, lat, _, _ in markers) / len(markers), sum(lon for _, _, lon, _ in markers) / len(markers)], zoom_start=3)
+    for location, lat, lon, current in markers:
+        folium.Marker([lat, lon], popup=f"{location}: {current['temperature']}°C, {current['description']}").add_to(m)
+    m.fit_bounds([[lat, lon] for _, lat, lon, _ in markers])
+    m.save("weather_location_map.html")
 def display_current_weather(data, location):
     """Display current weather information in the console."""
     current = data[0]
@@ -81,8 +216,17 @@ def display_current_weather(data, location):
     print(f"Description: {current['description']}")
 def weather_data_vision(api_key, location, update_frequency):
     """Main function to fetch, process, and visualize weather data."""
+    if isinstance(location, (list, tuple)):
+        if len(location) > 1:
+            return weather_data_vision_multi(api_key, location)
+        location = location[0]
     logger.info(f"Fetching weather data for {location}")
-    data = fetch_weather_data(api_key, location)
+    # Geocoded once, the coordinates are used for both the forecast and the map
+    lat, lon = get_coordinates(location)
+    if lat is None or lon is None:
+        logger.error("Failed to fetch weather data")
+        return
+    data = fetch_weather_data(api_key, location, coordinates=(lat, lon))
     if not data:
         logger.error("Failed to fetch weather data")
         return
@@ -92,16 +236,38 @@ def weather_data_vision(api_key, location, update_frequency):
         return
     display_current_weather(parsed_data, location)
     create_temperature_chart(parsed_data, location)
-    lat, lon = get_coordinates(location)
-    if lat and lon:
-        create_weather_map(location, lat, lon)
+    create_weather_map(location, lat, lon)
     logger.info("Weather data processing complete")
+def weather_data_vision_multi(api_key, locations, concurrency=None):
+    """Fetch, process, and visualize weather data for many locations, fetching all the forecasts concurrently."""
+    logger.info(f"Fetching weather data for {len(locations)} locations")
+    start = time.perf_counter()
+    results = asyncio.run(fetch_all_weather_data(api_key, locations, concurrency=concurrency))
+    markers = []
+    for location, (lat, lon), data in results:
+        parsed_data = parse_weather_data(data)
+        if not parsed_data:
+            logger.error(f"Failed to fetch weather data for {location}")
+            continue
+        display_current_weather(parsed_data, location)
+        create_temperature_chart(parsed_data, location, f"temperature_forecast_{slugify(location)}.png")
+        markers.append((location, lat, lon, parsed_data[0]))
+    if markers:
+        create_multi_location_map(markers)
+    logger.info(f"Weather data processing complete: {len(markers)}/{len(locations)} locations in {time.perf_counter() - start:.1f}s")
 def schedule_updates(api_key, location, update_frequency):
     """Schedule periodic updates of weather data."""
     schedule.every(update_frequency).hours.do(weather_data_vision, api_key, location, update_frequency)
     while True:
         schedule.run_pending()
         time.sleep(1)
+def read_locations(args):
+    # Locations from the command line, then one per line from --locations_file
+    locations = list(args.location or [])
+    if args.locations_file:
+        with open(args.locations_file) as f:
+            locations += [line.strip() for line in f if line.strip() and not line.startswith('#')]
+    return list(dict.fromkeys(locations))
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="""
     Weather Data Vision: A script to fetch, process, and visualize weather data.
@@ -109,19 +275,38 @@ if __name__ == "__main__":
     1. Obtain an API key from OpenWeatherMap (https://openweathermap.org/api)
     2. Run the script with your API key, desired location, and update frequency
     3. View the generated charts and maps in the script's directory
+    4. Track many sites at once by passing several locations, or a file with one per line. Their forecasts are fetched concurrently.
+       Looked-up coordinates are cached in ~/.cache/weather_data_vision, so each place is only geocoded once.
     Example:
     python weather_data_vision.py --api_key YOUR_API_KEY --location "New York" --update_frequency 3
-    """)
+    python weather_data_vision.py --api_key YOUR_API_KEY --location "New York" "London" "Tokyo"
+    python weather_data_vision.py --api_key YOUR_API_KEY --locations_file sites.txt --api_endpoint http://localhost:8000/forecast --geocode_endpoint http://localhost:8000/search
+    """, formatter_class=argparse.RawDescriptionHelpFormatter)
     parser.add_argument('--api_key', required=True, help='Your OpenWeatherMap API key')
-    parser.add_argument('--location', required=True, help='Location for weather data (e.g., "New York")')
+    parser.add_argument('--location', nargs='+', help='Location(s) for weather data (e.g., "New York")')
+    parser.add_argument('--locations_file', help='File with one location per line')
     parser.add_argument('--update_frequency', type=int, default=1, help='Update frequency in hours (default: 1)')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help=f'Forecasts fetched at the same time with several locations (default: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--api_endpoint', default=API_ENDPOINT, help='Forecast API URL, e.g. a local stand-in server for testing')
+    parser.add_argument('--geocode_endpoint', default=GEOCODE_ENDPOINT, help='Nominatim-compatible geocoding URL')
+    parser.add_argument('--geocode_cache', default=str(GEOCODE_CACHE_PATH), help='File to keep looked-up coordinates in')
     args = parser.parse_args()
+    try:
+        locations = read_locations(args)
+    except OSError as e:
+        parser.error(f"Couldn't read --locations_file: {e}")
+    if not locations:
+        parser.error("Give at least one --location or a --locations_file")
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    settings.update(api_endpoint=args.api_endpoint, geocode_endpoint=args.geocode_endpoint, concurrency=args.concurrency)
+    _geocode_cache = GeocodeCache(args.geocode_cache)
     try:
         # Initial run
-        weather_data_vision(args.api_key, args.location, args.update_frequency)
+        weather_data_vision(args.api_key, locations, args.update_frequency)
         # Schedule updates
-        schedule_updates(args.api_key, args.location, args.update_frequency)
+        schedule_updates(args.api_key, locations, args.update_frequency)
     except KeyboardInterrupt:
         logger.info("Script terminated by user")
     except Exception as e:
-        logger.error(f"An unexpected error occurred: {e}")
\ No newline at end of file
+        logger.error(f"An unexpected error occurred: {e}")
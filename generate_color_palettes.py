@@ -1,6 +1,13 @@
 import argparse
+import json
 import random
 import colorsys
+import sys
+import numpy as np
+# Palettes are generated and written this many at a time, so memory stays flat for any number of palettes
+CHUNK_SIZE = 100_000
+# ASCII codes of the hex digits, for encoding whole arrays of colors at once
+HEX_DIGITS = np.frombuffer(b"0123456789abcdef", dtype=np.uint8)
 # Function to convert RGB to HEX
 def rgb_to_hex(r, g, b):
     """Converts RGB values to HEX format."""
@@ -33,36 +40,114 @@ def generate_triadic_palette(base_color):
         colorsys.hls_to_rgb((h + 2/3) % 1, l, s)
     ]
     return [rgb_to_hex(*base_color)] + [rgb_to_hex(*color) for color in triadic_colors]
+# Vectorized versions of the above, working on (N, 3) arrays of colors instead of one color at a time
+def rgb_to_hls_batch(rgb):
+    """Converts an (N, 3) array of RGB colors to hue, lightness and saturation arrays, exactly like colorsys.rgb_to_hls."""
+    r, g, b = rgb[:, 0], rgb[:, 1], rgb[:, 2]
+    maxc = rgb.max(axis=1)
+    minc = rgb.min(axis=1)
+    sumc = maxc + minc
+    rangec = maxc - minc
+    l = sumc / 2.0
+    grey = rangec == 0
+    # Avoid dividing by zero for greys, whose hue and saturation are 0 anyway
+    safe_range = np.where(grey, 1.0, rangec)
+    s = np.where(l <= 0.5, rangec / np.where(grey, 1.0, sumc), rangec / np.where(grey, 1.0, 2.0 - maxc - minc))
+    rc = (maxc - r) / safe_range
+    gc = (maxc - g) / safe_range
+    bc = (maxc - b) / safe_range
+    h = np.select([r == maxc, g == maxc], [bc - gc, 2.0 + rc - bc], 4.0 + gc - rc)
+    h = (h / 6.0) % 1.0
+    return np.where(grey, 0.0, h), l, np.where(grey, 0.0, s)
+def _hue_channel(m1, m2, hue):
+    hue = hue % 1.0
+    return np.select(
+        [hue < 1 / 6, hue < 0.5, hue < 2 / 3],
+        [m1 + (m2 - m1) * hue * 6.0, m2, m1 + (m2 - m1) * (2 / 3 - hue) * 6.0],
+        m1,
+    )
+def hls_to_rgb_batch(h, l, s):
+    """Converts hue, lightness and saturation arrays to an (N, 3) array of RGB colors, exactly like colorsys.hls_to_rgb."""
+    m2 = np.where(l <= 0.5, l * (1.0 + s), l + s - (l * s))
+    m1 = 2.0 * l - m2
+    rgb = np.stack([_hue_channel(m1, m2, h + 1 / 3), _hue_channel(m1, m2, h), _hue_channel(m1, m2, h - 1 / 3)], axis=1)
+    # Greys have no hue, every channel is the lightness
+    return np.where((s == 0.0)[:, None], l[:, None], rgb)
+def hex_encode_batch(rgb):
+    """Encodes an (N, 3) array of RGB colors as an array of '#rrggbb' strings, without a Python loop."""
+    values = (rgb * 255).astype(np.uint8)
+    encoded = np.empty((len(values), 7), dtype=np.uint8)
+    encoded[:, 0] = ord("#")
+    encoded[:, 1::2] = HEX_DIGITS[values >> 4]
+    encoded[:, 2::2] = HEX_DIGITS[values & 0x0F]
+    return encoded.view("S7").ravel().astype(str)
+def generate_palettes_batch(base_colors, color_scheme_type):
+    """Generates a palette for every base color in an (N, 3) array, returned as an (N, colors per palette) array of hex strings."""
+    if color_scheme_type == "complementary":
+        colors = [base_colors, 1 - base_colors]
+    elif color_scheme_type in ("analogous", "triadic"):
+        h, l, s = rgb_to_hls_batch(base_colors)
+        shifts = (0.1, -0.1) if color_scheme_type == "analogous" else (1 / 3, 2 / 3)
+        colors = [base_colors] + [hls_to_rgb_batch((h + shift) % 1, l, s) for shift in shifts]
+    else:
+        raise ValueError("Invalid color scheme type. Choose from 'complementary', 'analogous', or 'triadic'.")
+    return np.stack([hex_encode_batch(color) for color in colors], axis=1)
+def iter_palette_chunks(number_of_palettes, color_scheme_type, rng, chunk_size=CHUNK_SIZE):
+    """Yields the palettes a chunk at a time, as arrays of hex strings."""
+    for start in range(0, number_of_palettes, chunk_size):
+        count = min(chunk_size, number_of_palettes - start)
+        yield generate_palettes_batch(rng.random((count, 3)), color_scheme_type)
 # Main function to generate color palettes
-def generate_color_palettes(number_of_palettes, color_scheme_type):
+def generate_color_palettes(number_of_palettes, color_scheme_type, seed=None):
     """Generates the specified number of color palettes based on the chosen scheme."""
-    palettes = []
-    for _ in range(number_of_palettes):
-        base_color = generate_base_color()
-        if color_scheme_type == "complementary":
-            palette = generate_complementary_palette(base_color)
-        elif color_scheme_type == "analogous":
-            palette = generate_analogous_palette(base_color)
-        elif color_scheme_type == "triadic":
-            palette = generate_triadic_palette(base_color)
-        else:
-            raise ValueError("Invalid color scheme type. Choose from 'complementary', 'analogous', or 'triadic'.")
-        palettes.append(palette)
-    return palettes
+    rng = np.random.default_rng(seed)
+    return [list(palette) for chunk in iter_palette_chunks(number_of_palettes, color_scheme_type, rng) for palette in chunk]
+def format_chunk(chunk, first_number, output_format):
+    """Formats a chunk of palettes as lines of text, CSV or JSONL."""
+    numbers = range(first_number, first_number + len(chunk))
+    if output_format == "csv":
+        lines = [f"{number}," + ",".join(palette) for number, palette in zip(numbers, chunk.tolist())]
+    elif output_format == "jsonl":
+        lines = [json.dumps({"palette": number, "colors": palette}) for number, palette in zip(numbers, chunk.tolist())]
+    else:
+        lines = [f"Palette {number}: {', '.join(palette)}" for number, palette in zip(numbers, chunk.tolist())]
+    return "\n".join(lines) + "\n"
+def write_palettes(number_of_palettes, color_scheme_type, output, output_format, seed=None):
+    """Streams the palettes to an open file a chunk at a time."""
+    rng = np.random.default_rng(seed)
+    number = 1
+    for chunk in iter_palette_chunks(number_of_palettes, color_scheme_type, rng):
+        if output_format == "csv" and number == 1:
+            output.write("palette," + ",".join(f"color_{i}" for i in range(1, chunk.shape[1] + 1)) + "\n")
+        output.write(format_chunk(chunk, number, output_format))
+        number += len(chunk)
 # Main entry point of the script
 def main():
     # Setting up command-line argument parsing
-    parser = argparse.ArgumentParser(description="Generate artistic color palettes by blending complementary, analogous, or triadic colors. Use this script to create unique palettes for digital art.")
+    parser = argparse.ArgumentParser(description="Generate artistic color palettes by blending complementary, analogous, or triadic colors. Use this script to create unique palettes for digital art. "
+                                                 "Palettes are generated in vectorized batches and streamed out, so millions of them take seconds. "
+                                                 "Example: python generate_color_palettes.py 1000000 triadic --seed 42 --output palettes.csv")
     parser.add_argument("number_of_palettes", type=int, help="The number of color palettes to generate.")
     parser.add_argument("color_scheme_type", choices=["complementary", "analogous", "triadic"], help="The type of color scheme to use: 'complementary', 'analogous', or 'triadic'.")
+    parser.add_argument("--seed", type=int, help="Random seed, the same seed always gives the same palettes.")
+    parser.add_argument("--output", help="File to write the palettes to instead of printing them. The format comes from the extension (.csv, .jsonl) unless --format is given.")
+    parser.add_argument("--format", choices=["text", "csv", "jsonl"], help="Output format (default: from the --output extension, text otherwise).")
     # Parsing arguments
     args = parser.parse_args()
+    if args.number_of_palettes < 0:
+        parser.error("number_of_palettes can't be negative")
+    output_format = args.format
+    if output_format is None:
+        extension = args.output.rsplit(".", 1)[-1].lower() if args.output and "." in args.output else ""
+        output_format = extension if extension in ("csv", "jsonl") else "text"
     try:
-        # Generating the color palettes
-        palettes = generate_color_palettes(args.number_of_palettes, args.color_scheme_type)
-        # Displaying the generated palettes
-        for i, palette in enumerate(palettes, start=1):
-            print(f"Palette {i}: {', '.join(palette)}")
+        # Generating the color palettes and writing them out as they're made
+        if args.output:
+            with open(args.output, "w") as output:
+                write_palettes(args.number_of_palettes, args.color_scheme_type, output, output_format, args.seed)
+            print(f"Wrote {args.number_of_palettes} {args.color_scheme_type} palettes to {args.output}")
+        else:
+            write_palettes(args.number_of_palettes, args.color_scheme_type, sys.stdout, output_format, args.seed)
     except ValueError as e:
         # Handling invalid color scheme type
         print(f"Error: {e}")
@@ -71,4 +156,4 @@ def main():
         print(f"An unexpected error occurred: {e}")
 # Ensures the script runs only when executed directly
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,79 @@
+import time
+from typing import Optional
+from .lib import DEFAULT_OPENAI_MODEL
+
+# USD per million tokens as (prompt, completion). Models that aren't listed are priced like the default model
+MODEL_PRICING = {
+    "gpt-4o-2024-08-06": (2.50, 10.00),
+    "gpt-4o-2024-05-13": (5.00, 15.00),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o-mini-2024-07-18": (0.15, 0.60),
+}
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+def token_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    prompt_price, completion_price = MODEL_PRICING.get(model, MODEL_PRICING[DEFAULT_OPENAI_MODEL])
+    return (prompt_tokens * prompt_price + completion_tokens * completion_price) / 1_000_000
+
+
+class Budget:
+    # Limits on one script generation. Every LLM call and test run checks it first, None means unlimited
+    def __init__(self, max_iterations: Optional[int] = None, max_seconds: Optional[float] = None, max_tokens: Optional[int] = None, max_cost: Optional[float] = None):
+        self.max_iterations = max_iterations
+        self.max_seconds = max_seconds
+        self.max_tokens = max_tokens
+        self.max_cost = max_cost
+        self.started = time.monotonic()
+        self.iterations = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cost = 0.0
+
+    @property
+    def tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining_seconds(self) -> Optional[float]:
+        if self.max_seconds is None:
+            return None
+        return max(0.0, self.max_seconds - self.elapsed())
+
+    def record_usage(self, model: str, prompt_tokens: int, completion_tokens: int):
+        self.prompt_tokens += prompt_tokens
+        self.completion_tokens += completion_tokens
+        self.cost += token_cost(model, prompt_tokens, completion_tokens)
+
+    def exceeded(self) -> Optional[str]:
+        # Why the budget is spent, None while there's still some left
+        if self.max_seconds is not None and self.elapsed() >= self.max_seconds:
+            return f"Time budget of {self.max_seconds:g}s used up."
+        if self.max_tokens is not None and self.tokens >= self.max_tokens:
+            return f"Token budget of {self.max_tokens} used up ({self.tokens} tokens)."
+        if self.max_cost is not None and self.cost >= self.max_cost:
+            return f"Cost budget of ${self.max_cost:.2f} used up (${self.cost:.4f})."
+        return None
+
+    def check(self):
+        reason = self.exceeded()
+        if reason:
+            raise BudgetExceeded(reason)
+
+    def check_iterations(self):
+        if self.max_iterations is not None and self.iterations >= self.max_iterations:
+            raise BudgetExceeded(f"Reached the limit of {self.max_iterations} attempt(s).")
+
+    def start_iteration(self):
+        self.check()
+        self.check_iterations()
+        self.iterations += 1
+
+    def summary(self) -> str:
+        return f"{self.iterations} attempt(s), {self.elapsed():.1f}s, {self.tokens} tokens, ${self.cost:.4f}"
@@ -0,0 +1,72 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+from pydantic import BaseModel, ValidationError
+from .lib import SCRIPTOMATIC_HOME
+from .workspace import OutputFile
+
+RUN_CACHE_DIR = SCRIPTOMATIC_HOME / "cache" / "runs"
+
+
+class CachedRun(BaseModel):
+    stdout: str
+    stderr: str
+    returncode: int
+    output_files: List[OutputFile] = []
+    # Evaluation verdicts for this run, keyed by a hash of what the script was judged against
+    evaluations: Dict[str, bool] = {}
+
+
+def _digest(*parts) -> str:
+    return hashlib.sha256(json.dumps(parts).encode()).hexdigest()
+
+
+def run_key(script_content: str, run_command: str, packages: List[str]) -> str:
+    # The interpreter is part of the key, the same script can behave differently in another environment
+    return _digest(script_content, run_command, sorted(packages), sys.executable, sys.version)
+
+
+def evaluation_key(description: str, parameters: List[str], outputs: List[str]) -> str:
+    return _digest(description, list(parameters), list(outputs))
+
+
+class ResultCache:
+    def __init__(self, directory: Optional[Path] = RUN_CACHE_DIR):
+        # Runs are always memoized for the session, and also on disk when a directory is given
+        self.directory = Path(directory) if directory else None
+        self.runs: Dict[str, CachedRun] = {}
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> Optional[CachedRun]:
+        if key not in self.runs and self.directory and self._path(key).exists():
+            try:
+                self.runs[key] = CachedRun.model_validate_json(self._path(key).read_text())
+            except (OSError, ValidationError):
+                return None
+        return self.runs.get(key)
+
+    def put(self, key: str, run: CachedRun):
+        self.runs[key] = run
+        # Only clean runs and passing verdicts outlive the session. A failure can come from outside the script,
+        # a flaky network or a missing file, and shouldn't keep the script failing in later sessions
+        if not self.directory or run.returncode != 0:
+            return
+        kept = run.model_copy(update={"evaluations": {criteria: passed for criteria, passed in run.evaluations.items() if passed}})
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Write then rename, so a concurrent reader never sees half a file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(kept.model_dump_json())
+        os.replace(tmp_path, self._path(key))
+
+    def clear(self):
+        self.runs.clear()
+        if self.directory and self.directory.exists():
+            for path in self.directory.glob("*.json"):
+                path.unlink()
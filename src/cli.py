@@ -1,6 +1,6 @@
 import argparse
 from .scriptomatic import Scriptomatic
-from .lib import DEFAULT_OPENAI_MODEL, disply_intro
+from .lib import DEFAULT_OPENAI_MODEL, DEFAULT_PRELOAD_MODULES, disply_intro
 
 def cli():
     parser = argparse.ArgumentParser(description="Generate custom Python scripts.")
@@ -10,9 +10,27 @@ def cli():
     parser.add_argument("--autoloop", action="store_true", help="Run the script, see if it worked, if not, keep writing new scripts and running them until it works")
     parser.add_argument("--model", type=str, default=DEFAULT_OPENAI_MODEL, help="Specify the OpenAI model to use")
     parser.add_argument("--temperature", type=float, default=0.2, help="Set the temperature for the model's output")
+    parser.add_argument("--warm", action="store_true", help=f"Run scripts from a warm interpreter with heavy libraries already imported ({', '.join(DEFAULT_PRELOAD_MODULES)})")
+    parser.add_argument("--preload", action="append", metavar="MODULES", help="Comma-separated modules to keep imported in the warm interpreter, can be repeated, implies --warm")
+    parser.add_argument("--tmpfs", action="store_true", help="Run each script in a RAM-backed temp directory where available")
+    parser.add_argument("--keep-outputs", metavar="DIR", help="Copy the files each test run creates into this directory")
+    parser.add_argument("--no-cache", action="store_true", help="Always rerun and re-evaluate scripts, for scripts that aren't deterministic")
+    parser.add_argument("--optimize", action="store_true", help="Profile the finished script and keep asking for faster versions that produce the same output")
+    parser.add_argument("--workload", metavar="COMMAND", help="Command to profile the script with in --optimize mode, e.g. \"python script.py --size 100000\". The script name is swapped for the generated script's, and paths that exist are read from the current directory")
+    parser.add_argument("--lint-fix", action="store_true", help="Have the model fix the performance problems the linter finds before the script is saved")
+    parser.add_argument("--max-iterations", type=int, metavar="N", help="Stop --loop/--autoloop after this many attempts and keep the best one")
+    parser.add_argument("--max-seconds", type=float, metavar="SECONDS", help="Wall-clock budget for the whole generation, test runs included")
+    parser.add_argument("--max-tokens", type=int, metavar="N", help="Stop once this many LLM tokens have been used")
+    parser.add_argument("--max-cost", type=float, metavar="USD", help="Stop once the LLM calls have cost this many dollars")
+    parser.add_argument("--no-examples", action="store_true", help="Don't show the model similar known-good scripts as examples")
+    parser.add_argument("--template", action="store_true", help="Have the model write only the arguments and functions, and fill in the argparse and error handling boilerplate locally. Faster and cheaper")
+    parser.add_argument("--no-prefetch", action="store_true", help="Don't start installing the script's imports while it's still being written")
+    parser.add_argument("--test-suite", action="store_true", help="With --loop/--autoloop, judge each script by a set of generated test cases run in parallel, and save them as a pytest file")
     args = parser.parse_args()
 
-    scriptomatic = Scriptomatic(model=args.model, temperature=args.temperature)
+    # Each --preload is a comma-separated list, so it can't swallow the prompt that follows it
+    preload = [module.strip() for value in args.preload or [] for module in value.split(",") if module.strip()] or (DEFAULT_PRELOAD_MODULES if args.warm else None)
+    scriptomatic = Scriptomatic(model=args.model, temperature=args.temperature, preload=preload, tmpfs=args.tmpfs, keep_outputs=args.keep_outputs, cache=not args.no_cache, lint_fix=args.lint_fix, max_iterations=args.max_iterations, max_seconds=args.max_seconds, max_tokens=args.max_tokens, max_cost=args.max_cost, examples=not args.no_examples, template=args.template, prefetch=not args.no_prefetch, test_suite=args.test_suite)
     
     disply_intro()
     
@@ -22,7 +40,7 @@ def cli():
         prompt = args.prompt
 
     if prompt:
-        scriptomatic.generate_script(prompt, loop=args.loop, autoloop=args.autoloop)
+        scriptomatic.generate_script(prompt, loop=args.loop, autoloop=args.autoloop, optimize=args.optimize, workload=args.workload)
     else:
         print("Please provide a prompt or use --inspo for inspiration mode.")
 
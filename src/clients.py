@@ -0,0 +1,75 @@
+import importlib.util
+import os
+import threading
+from typing import Dict, Optional, Tuple
+import dspy
+import httpx
+import openai
+from openai import DEFAULT_TIMEOUT, OpenAI
+
+# Pool limits for the one HTTP client every LLM call in the process goes through
+POOL_SETTINGS = {
+    "max_connections": int(os.environ.get("SCRIPTOMATIC_MAX_CONNECTIONS", 20)),
+    "max_keepalive_connections": int(os.environ.get("SCRIPTOMATIC_MAX_KEEPALIVE", 10)),
+    "keepalive_expiry": float(os.environ.get("SCRIPTOMATIC_KEEPALIVE_EXPIRY", 60)),
+    "http2": os.environ.get("SCRIPTOMATIC_HTTP2", "1") != "0",
+}
+
+_lock = threading.Lock()
+_http_client: Optional[httpx.Client] = None
+_openai_client: Optional[OpenAI] = None
+_dspy_lms: Dict[Tuple[str, float], object] = {}
+
+
+def http2_available() -> bool:
+    # httpx only speaks HTTP/2 with the h2 package installed
+    return importlib.util.find_spec("h2") is not None
+
+
+def configure_http_pool(**settings):
+    # Change the pool settings for clients made from now on. The old pool isn't closed, since providers that
+    # already hold an OpenAI client keep using it, it's released once the last of them is gone
+    global _http_client, _openai_client
+    unknown = set(settings) - set(POOL_SETTINGS)
+    if unknown:
+        raise ValueError(f"Unknown HTTP pool settings: {', '.join(sorted(unknown))}")
+    with _lock:
+        POOL_SETTINGS.update(settings)
+        _http_client = None
+        _openai_client = None
+    # The openai module-level client behind the cached dspy LMs looks openai.http_client up on every request,
+    # so building the new pool right away moves them over too
+    get_http_client()
+
+
+def get_http_client() -> httpx.Client:
+    global _http_client
+    with _lock:
+        if _http_client is None:
+            limits = httpx.Limits(
+                max_connections=POOL_SETTINGS["max_connections"],
+                max_keepalive_connections=POOL_SETTINGS["max_keepalive_connections"],
+                keepalive_expiry=POOL_SETTINGS["keepalive_expiry"],
+            )
+            _http_client = httpx.Client(limits=limits, timeout=DEFAULT_TIMEOUT, http2=POOL_SETTINGS["http2"] and http2_available())
+            # dspy.OpenAI calls the openai module-level client, point that at the shared pool too
+            openai.http_client = _http_client
+        return _http_client
+
+
+def get_openai_client() -> OpenAI:
+    global _openai_client
+    http_client = get_http_client()
+    with _lock:
+        if _openai_client is None:
+            _openai_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"), http_client=http_client)
+        return _openai_client
+
+
+def get_dspy_lm(model: str, temperature: float):
+    get_http_client()
+    with _lock:
+        key = (model, temperature)
+        if key not in _dspy_lms:
+            _dspy_lms[key] = dspy.OpenAI(model=model, max_tokens=4096, temperature=temperature)
+        return _dspy_lms[key]
@@ -0,0 +1,119 @@
+import ast
+import json
+import re
+import shlex
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+from .lib import SCRIPTOMATIC_HOME
+
+# Bundled import name -> pip distribution table, only for the ones that don't match
+BUNDLED_IMPORT_MAP = Path(__file__).with_name("import_map.json")
+# User additions on top of the bundled table, these win over the bundled entries
+USER_IMPORT_MAP = SCRIPTOMATIC_HOME / "import_map.json"
+
+# pip messages that name the requirement it couldn't find
+MISSING_DISTRIBUTION_PATTERNS = [
+    re.compile(r"No matching distribution found for ([A-Za-z0-9_.\-]+)"),
+    re.compile(r"Could not find a version that satisfies the requirement ([A-Za-z0-9_.\-]+)"),
+    re.compile(r"Invalid requirement: '([^']+)'"),
+]
+
+
+@lru_cache(maxsize=1)
+def load_import_map() -> Dict[str, str]:
+    import_map = json.loads(BUNDLED_IMPORT_MAP.read_text())
+    if USER_IMPORT_MAP.exists():
+        try:
+            import_map.update(json.loads(USER_IMPORT_MAP.read_text()))
+        except (OSError, ValueError) as e:
+            print(f"\033[93mIgnoring unreadable import map {USER_IMPORT_MAP}: {e}\033[0m")
+    return import_map
+
+
+def update_import_map(entries: Dict[str, str]) -> None:
+    # Save new import -> distribution mappings so future installs resolve them offline
+    user_map = {}
+    if USER_IMPORT_MAP.exists():
+        user_map = json.loads(USER_IMPORT_MAP.read_text())
+    user_map.update(entries)
+    USER_IMPORT_MAP.parent.mkdir(parents=True, exist_ok=True)
+    USER_IMPORT_MAP.write_text(json.dumps(user_map, indent=4, sort_keys=True))
+    load_import_map.cache_clear()
+
+
+def is_stdlib(module: str) -> bool:
+    return module.split(".")[0] in sys.stdlib_module_names
+
+
+def find_imports(script_content: str) -> Optional[List[str]]:
+    # Top-level module names imported anywhere in the script, in the order they first appear
+    try:
+        tree = ast.parse(script_content)
+    except SyntaxError:
+        return None
+    modules = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module]
+        else:
+            continue
+        for name in names:
+            top_level = name.split(".")[0]
+            if top_level != "__future__" and top_level not in modules:
+                modules.append(top_level)
+    return modules
+
+
+def distribution_for(module: str) -> Optional[str]:
+    if is_stdlib(module):
+        return None
+    return load_import_map().get(module, module)
+
+
+def resolve_distributions(script_content: str, script_name: str = "") -> Optional[List[str]]:
+    # The pip distributions a script needs, or None when the script can't be parsed
+    modules = find_imports(script_content)
+    if modules is None:
+        return None
+    own_module = Path(script_name).stem
+    distributions = []
+    for module in modules:
+        distribution = distribution_for(module)
+        if distribution and module != own_module and distribution not in distributions:
+            distributions.append(distribution)
+    return distributions
+
+
+def parse_pip_command(pip_install_command: Union[str, List[str], None]) -> List[str]:
+    # Turn "pip install numpy pandas" (or an already split list) into just the package names
+    if not pip_install_command:
+        return []
+    if isinstance(pip_install_command, str):
+        pip_install_command = shlex.split(pip_install_command)
+    skip = {"pip", "pip3", "install", "python", "python3", "-m"}
+    return [part for part in pip_install_command if part not in skip and not part.startswith("-")]
+
+
+def classify_pip_error(packages: List[str], error_output: str) -> Optional[List[str]]:
+    # Fix the package list for the pip failures we recognise, None means ask the LLM
+    fixed_packages = list(packages)
+    for pattern in MISSING_DISTRIBUTION_PATTERNS:
+        for requirement in pattern.findall(error_output):
+            name = re.split(r"[<>=!~\[;]", requirement)[0]
+            if name not in fixed_packages:
+                continue
+            index = fixed_packages.index(name)
+            if is_stdlib(name):
+                # Standard library modules never need installing
+                fixed_packages.pop(index)
+            elif load_import_map().get(name, name) != name:
+                fixed_packages[index] = load_import_map()[name]
+            else:
+                return None
+    if fixed_packages == packages:
+        return None
+    return fixed_packages
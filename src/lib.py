@@ -1,17 +1,23 @@
+import os
 import random
 import time
+from pathlib import Path
 DEFAULT_OPENAI_MODEL = "gpt-4o-2024-08-06"
+# Libraries generated scripts tend to import, kept warm in the forkserver runner
+DEFAULT_PRELOAD_MODULES = ["numpy", "pandas", "matplotlib.pyplot", "PIL.Image", "requests"]
+# Where Script-O-Matic keeps user data between runs
+SCRIPTOMATIC_HOME = Path(os.environ.get("SCRIPTOMATIC_HOME", Path.home() / ".scriptomatic"))
 
 
 def rainbow_print(text):
     colors = ['\033[91m', '\033[93m', '\033[92m', '\033[96m', '\033[94m', '\033[95m']
-    rainbow_text = ''
+    rainbow_text = []
     for char in text:
         if char != '\n':
-            rainbow_text += random.choice(colors) + char
+            rainbow_text.append(random.choice(colors) + char)
         else:
-            rainbow_text += '\033[0m' + char
-    return rainbow_text + '\033[0m'
+            rainbow_text.append('\033[0m' + char)
+    return ''.join(rainbow_text) + '\033[0m'
 
 
 
@@ -0,0 +1,200 @@
+import ast
+from typing import Dict, List, Optional, Set
+from pydantic import BaseModel
+
+# Calls that block the loop they're in, so a `while True` around them isn't a busy spin
+BLOCKING_CALLS = {"sleep", "wait", "input", "select", "recv", "accept", "join", "getch"}
+# Attribute calls that hit the disk or the network, on top of the builtin open()
+IO_METHODS = {"read_text", "write_text", "read_bytes", "write_bytes", "urlopen", "read_csv", "read_json", "read_excel", "read_parquet", "to_csv"}
+HTTP_METHODS = {"get", "post", "put", "patch", "delete", "head", "request"}
+CACHE_DECORATORS = {"lru_cache", "cache", "cached_property"}
+
+
+class LintIssue(BaseModel):
+    rule: str
+    line: int
+    message: str
+
+
+def _call_name(call: ast.Call) -> Optional[str]:
+    if isinstance(call.func, ast.Name):
+        return call.func.id
+    if isinstance(call.func, ast.Attribute):
+        return call.func.attr
+    return None
+
+
+def _is_io_call(call: ast.Call) -> bool:
+    func = call.func
+    if isinstance(func, ast.Name):
+        return func.id == "open"
+    if not isinstance(func, ast.Attribute):
+        return False
+    if func.attr in IO_METHODS:
+        return True
+    receiver = func.value.id if isinstance(func.value, ast.Name) else None
+    # Image.open, gzip.open and friends, plus requests.get(...) / session.post(...)
+    if func.attr == "open" and receiver is not None:
+        return True
+    return func.attr in HTTP_METHODS and receiver in ("requests", "session", "httpx", "client")
+
+
+def _kind(value) -> Optional[str]:
+    # Whether an assigned value is a string or a list, the two types that get slow in loops
+    if isinstance(value, ast.JoinedStr) or (isinstance(value, ast.Constant) and isinstance(value.value, str)):
+        return "str"
+    if isinstance(value, (ast.List, ast.ListComp)):
+        return "list"
+    if isinstance(value, ast.Call) and isinstance(value.func, ast.Name) and value.func.id in ("str", "list"):
+        return value.func.id
+    return None
+
+
+def _constant_read_path(call: ast.Call) -> Optional[str]:
+    # The path of open("config.json") / open("config.json", "r") style reads, None for anything else
+    if not (isinstance(call.func, ast.Name) and call.func.id == "open" and call.args):
+        return None
+    path = call.args[0]
+    if not (isinstance(path, ast.Constant) and isinstance(path.value, str)):
+        return None
+    mode = call.args[1] if len(call.args) > 1 else next((k.value for k in call.keywords if k.arg == "mode"), None)
+    if mode is not None and not (isinstance(mode, ast.Constant) and set(str(mode.value)) <= set("rbt")):
+        return None
+    return path.value
+
+
+def _decorator_name(decorator) -> Optional[str]:
+    # "lru_cache" for @lru_cache, @functools.lru_cache and @lru_cache(maxsize=None)
+    if isinstance(decorator, ast.Call):
+        decorator = decorator.func
+    if isinstance(decorator, ast.Attribute):
+        return decorator.attr
+    return getattr(decorator, "id", None)
+
+
+def _walk_function(node):
+    # ast.walk, without descending into nested functions or classes
+    stack = list(ast.iter_child_nodes(node))
+    while stack:
+        child = stack.pop()
+        yield child
+        if not isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef, ast.Lambda)):
+            stack.extend(ast.iter_child_nodes(child))
+
+
+class _PerformanceVisitor(ast.NodeVisitor):
+    def __init__(self, io_functions: Set[str]):
+        self.io_functions = io_functions
+        self.issues: List[LintIssue] = []
+        self.loop_depth = 0
+        self.scopes: List[Dict[str, str]] = [{}]
+
+    def report(self, rule: str, node, message: str):
+        if not any(issue.rule == rule and issue.line == node.lineno for issue in self.issues):
+            self.issues.append(LintIssue(rule=rule, line=node.lineno, message=message))
+
+    def kind_of(self, name: str) -> Optional[str]:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return None
+
+    def visit_FunctionDef(self, node):
+        saved_depth, self.loop_depth = self.loop_depth, 0
+        self.scopes.append({})
+        self.generic_visit(node)
+        self.scopes.pop()
+        self.loop_depth = saved_depth
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_loop(self, node):
+        self.loop_depth += 1
+        self.generic_visit(node)
+        self.loop_depth -= 1
+
+    visit_For = visit_AsyncFor = visit_loop
+    visit_ListComp = visit_SetComp = visit_DictComp = visit_GeneratorExp = visit_loop
+
+    def visit_While(self, node):
+        if isinstance(node.test, ast.Constant) and node.test.value:
+            exits = any(isinstance(child, (ast.Break, ast.Return, ast.Raise)) for child in _walk_function(node))
+            blocks = any(isinstance(child, ast.Call) and _call_name(child) in BLOCKING_CALLS for child in _walk_function(node))
+            if not exits and not blocks:
+                self.report("while-true-without-sleep", node, "`while True` never sleeps, waits or exits, so it will pin a CPU core. Add a time.sleep() or an exit condition")
+        self.visit_loop(node)
+
+    def visit_Assign(self, node):
+        for target in node.targets:
+            if isinstance(target, ast.Name):
+                self.scopes[-1][target.id] = _kind(node.value)
+        self.generic_visit(node)
+
+    def visit_AugAssign(self, node):
+        if self.loop_depth and isinstance(node.op, ast.Add) and isinstance(node.target, ast.Name) and self.kind_of(node.target.id) == "str":
+            self.report("string-concat-in-loop", node, f"`{node.target.id} +=` builds a string inside a loop, which is quadratic. Collect the pieces in a list and ''.join() them")
+        self.generic_visit(node)
+
+    def visit_Compare(self, node):
+        if self.loop_depth:
+            for op, comparator in zip(node.ops, node.comparators):
+                if not isinstance(op, (ast.In, ast.NotIn)):
+                    continue
+                if isinstance(comparator, ast.List) or (isinstance(comparator, ast.Name) and self.kind_of(comparator.id) == "list"):
+                    self.report("list-membership-in-loop", node, "`in` on a list inside a loop scans the whole list every time. Use a set")
+        self.generic_visit(node)
+
+    def visit_Call(self, node):
+        if self.loop_depth:
+            name = _call_name(node)
+            if _is_io_call(node):
+                self.report("io-in-loop", node, "I/O inside a loop. Read or fetch once before the loop, or batch the writes")
+            elif isinstance(node.func, ast.Name) and name in self.io_functions:
+                self.report("io-in-loop", node, f"{name}() does I/O and is called inside a loop. Call it once before the loop")
+        self.generic_visit(node)
+
+
+def _repeated_reads(tree) -> List[LintIssue]:
+    # Functions that re-read the same file every time they're called from more than one place, or from a loop
+    call_counts: Dict[str, int] = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            call_counts[node.func.id] = call_counts.get(node.func.id, 0) + 1
+    looped_calls = set()
+    for loop in ast.walk(tree):
+        if isinstance(loop, (ast.For, ast.AsyncFor, ast.While)):
+            looped_calls.update(child.func.id for child in _walk_function(loop) if isinstance(child, ast.Call) and isinstance(child.func, ast.Name))
+
+    issues = []
+    for node in ast.walk(tree):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        if {_decorator_name(decorator) for decorator in node.decorator_list} & CACHE_DECORATORS:
+            continue
+        if call_counts.get(node.name, 0) < 2 and node.name not in looped_calls:
+            continue
+        for child in _walk_function(node):
+            path = isinstance(child, ast.Call) and _constant_read_path(child)
+            if path:
+                issues.append(LintIssue(rule="repeated-file-read", line=child.lineno, message=f"{node.name}() re-reads '{path}' every time it's called. Load it once and reuse it, or cache it with functools.lru_cache"))
+                break
+    return issues
+
+
+def lint_performance(code: str) -> List[LintIssue]:
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        return []
+    io_functions = set()
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if any(isinstance(child, ast.Call) and _is_io_call(child) for child in _walk_function(node)):
+                io_functions.add(node.name)
+    visitor = _PerformanceVisitor(io_functions)
+    visitor.visit(tree)
+    return sorted(visitor.issues + _repeated_reads(tree), key=lambda issue: issue.line)
+
+
+def format_issues(issues: List[LintIssue]) -> str:
+    return "\n".join(f"line {issue.line} [{issue.rule}]: {issue.message}" for issue in issues)
@@ -1,10 +1,19 @@
 
 import os
-from typing import  List, Tuple
+from typing import  Callable, List, Optional, Tuple
 from pydantic import BaseModel
-from openai import OpenAI
 import dspy
-from .lib import DEFAULT_OPENAI_MODEL
+from .lib import DEFAULT_OPENAI_MODEL, clean_up_code
+from .run_command import infer_run_command
+from .dependencies import classify_pip_error, resolve_distributions
+from .workspace import describe_outputs
+from .partial_json import StreamEvent, StreamingObjectParser
+from .budget import Budget
+from .retrieval import Example, format_examples
+from .templates import TEMPLATE_INSTRUCTIONS, ScriptTemplateParts
+from .script_tests import ScriptTestCase, ScriptTestSuite
+from .clients import get_dspy_lm, get_openai_client
+from .response_models import response_format, validate_response
 class Step(BaseModel):
     thought_process: str
     concise_step: str
@@ -20,30 +29,61 @@ class ScriptIdea(BaseModel):
     title: str
     description: str
     prompt: str
+
+class ScriptIdeasResult(BaseModel):
+    ideas: List[ScriptIdea]
     
 class RunCommand(BaseModel):
     run_command: str
     pip_install_command: str
+
+class UpdatedDescription(BaseModel):
+    description: str
+
+class EvaluationResponse(BaseModel):
+    success: bool
+    explanation: str
+
+class PipAnalysisResult(BaseModel):
+    fixed_packages: List[str]
+    explanation: str
     
 
 class LLMProvider:
     def __init__(self, model: str = DEFAULT_OPENAI_MODEL, temperature: float = 0.6):
-        self.openai_client = OpenAI(api_key=os.environ.get("OPENAI_API_KEY"))
+        # Clients are shared by every provider in the process, so they share one keep-alive connection pool
+        self.openai_client = get_openai_client()
         self.model = model
         self.temperature = temperature
         
-        self.dspy_lm = dspy.OpenAI(model=DEFAULT_OPENAI_MODEL, max_tokens=4096, temperature=temperature)
+        self.dspy_lm = get_dspy_lm(DEFAULT_OPENAI_MODEL, temperature)
         dspy.settings.configure(lm=self.dspy_lm)
         self.query_enhancer = QueryEnhancer()
+        # Set by Scriptomatic while generating a script, every call checks it first and records its token usage
+        self.budget: Optional[Budget] = None
+
+    def _check_budget(self):
+        if self.budget:
+            self.budget.check()
+
+    def _record_usage(self, model: str, usage):
+        if self.budget and usage:
+            self.budget.record_usage(model, usage.prompt_tokens, usage.completion_tokens)
 
     def enhance_query(self, query: str) -> str:
         print("\nEnhancing your prompt...\n")
+        self._check_budget()
         result = self.query_enhancer(query=query)
+        # dspy keeps the raw responses in the LM's history, that's the only place its usage shows up
+        history = getattr(self.dspy_lm, "history", None)
+        if self.budget and history and isinstance(history[-1].get("response"), dict):
+            usage = history[-1]["response"].get("usage") or {}
+            self.budget.record_usage(DEFAULT_OPENAI_MODEL, usage.get("prompt_tokens", 0), usage.get("completion_tokens", 0))
         print("Improved prompt:")
         print(result.enhanced_query)
         return result.enhanced_query
 
-    def generate_structured_script_components(self, enhanced_query: str) -> Tuple[str, List[str], List[str], str]:
+    def generate_structured_script_components(self, enhanced_query: str, stream: bool = True, on_component: Optional[Callable[[StreamEvent], None]] = None) -> Tuple[str, List[str], List[str], str]:
         print("Generating script components...\n")
         system_prompt = f"""
     You are a master Python CLI script writer tasked with creating an exceptional script based on a user's prompt. Your goal is to think deeply about the implementation, considering input parameters, outputs, and how to create a truly impressive script that will wow the user.
@@ -60,44 +100,72 @@ class LLMProvider:
 
     Remember to be creative, thorough, and focus on creating a script that will truly impress the user with its functionality and design. Aim to impress. Aim to make your mark. Aim to make users day, and their life better."""
 
-        completion = self.openai_client.beta.chat.completions.parse(
-            model=self.model,
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": enhanced_query},
-            ],
-            response_format=ScriptParts,
-            temperature=self.temperature
-        )
-
-        message = completion.choices[0].message
-        if message.parsed:
-            steps = message.parsed.steps
-            description = message.parsed.description
-            script_name = message.parsed.script_name
-            outputs = message.parsed.outputs
-            parameters = message.parsed.parameters
-            print(f'''\nStructured Output for script info:
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": enhanced_query},
+        ]
+        print(f'''\nStructured Output for script info:
             Steps:''')
-            for i, step in enumerate(steps, 1):
+        # Each step and field is shown (and handed to on_component) as soon as its JSON closes
+        parser = StreamingObjectParser()
+        self._check_budget()
+        # The same cached schema as every other structured call, validated here rather than by the SDK's parse helpers
+        if stream:
+            content, refusal, usage = "", "", None
+            for chunk in self.openai_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                response_format=response_format(ScriptParts),
+                temperature=self.temperature,
+                stream=True,
+                stream_options={"include_usage": True}
+            ):
+                # With include_usage the last chunk only carries the usage, and no choices
+                usage = chunk.usage or usage
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.content:
+                    content += delta.content
+                    self._handle_components(parser.feed(delta.content), on_component)
+                refusal += delta.refusal or ""
+        else:
+            completion = self.openai_client.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                response_format=response_format(ScriptParts),
+                temperature=self.temperature
+            )
+            message = completion.choices[0].message
+            content, refusal, usage = message.content or "", message.refusal or "", completion.usage
+            if content and not refusal:
+                self._handle_components(parser.feed(content), on_component)
+        self._record_usage(self.model, usage)
+
+        if refusal or not content:
+            print(refusal)
+            raise ValueError(f"The model refused to plan the script: {refusal}")
+        parsed = validate_response(ScriptParts, content)
+        return parsed.script_name, parsed.parameters, parsed.outputs, parsed.description
+
+    def _handle_components(self, components: List[StreamEvent], on_component: Optional[Callable[[StreamEvent], None]] = None):
+        for component in components:
+            if component.key == "steps" and component.index is not None:
                 print(f'''
-    Step {i}:
-    Thought Process: {step.thought_process}
-    Concise Step: {step.concise_step}
+    Step {component.index + 1}:
+    Thought Process: {component.value["thought_process"]}
+    Concise Step: {component.value["concise_step"]}
                 ''')
-            print(f'''
-    Description: {message.parsed.description}
-
-    Script Name: {message.parsed.script_name}
-
-    Outputs: {[f"{output}" for output in outputs]}
-
-    Parameters: {[f"{parameter}" for parameter in parameters]}
-    ''')
-        else:
-            print(message.refusal)
-        
-        return script_name, parameters, outputs, description
+            elif component.key == "description" and component.index is None:
+                print(f"\n    Description: {component.value}")
+            elif component.key == "script_name" and component.index is None:
+                print(f"\n    Script Name: {component.value}")
+            elif component.key == "outputs" and component.index is None:
+                print(f"\n    Outputs: {component.value}")
+            elif component.key == "parameters" and component.index is None:
+                print(f"\n    Parameters: {component.value}\n")
+            if on_component:
+                on_component(component)
     
     def generate_script_ideas(self, category: str) -> List[ScriptIdea]:
         system_prompt = """You are an AI assistant specialized in generating creative ideas for Python scripts. 
@@ -114,9 +182,6 @@ class LLMProvider:
         Be creative and think of scripts that could be both fun and useful!
         """
 
-        class ScriptIdeasResult(BaseModel):
-            ideas: List[ScriptIdea]
-
         result = self.openai_structured_output(system_prompt, user_prompt, ScriptIdeasResult)
         return result.ideas
     def update_description(self, old_description, failed_script, user_feedback=None):
@@ -138,32 +203,33 @@ class LLMProvider:
         Please provide an updated description that addresses potential issues in the failed script, incorporates user feedback (if provided), and suggests improvements.
         """
         
-        class UpdatedDescription(BaseModel):
-            description: str
-        
         result = self.openai_structured_output(system_prompt, user_prompt, UpdatedDescription)
         print("Improved description:")
         print(result.description)
         return result.description
     
     def openai_structured_output(self,system_prompt, user_prompt, data_model):
-        completion = self.openai_client.beta.chat.completions.parse(
-        model="gpt-4o-2024-08-06",
-        messages=[
+        messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
-        ],
-        response_format=data_model,
+        ]
+        self._check_budget()
+        # The schema and validator for each model are built once and reused for every call
+        completion = self.openai_client.chat.completions.create(
+        model="gpt-4o-2024-08-06",
+        messages=messages,
+        response_format=response_format(data_model),
         )
+        self._record_usage("gpt-4o-2024-08-06", completion.usage)
         message = completion.choices[0].message
-        if message.parsed:
+        if message.content and not message.refusal:
             # Return the parsed message
-            return message.parsed   
+            return validate_response(data_model, message.content)
         else:
             print(message.refusal)
             return message.refusal
     
-    def evaluate_script_output(self, stdout, stderr, description, parameters, outputs):
+    def evaluate_script_output(self, stdout, stderr, description, parameters, outputs, output_files=None):
         print(f"\n\033[94m\nEvaluating script output. GPT will let us know if the script worked as intended, one moment...\033[0m")
         # Use GPT to evaluate if the script worked as intended
         system_prompt = "Your job is to determine if the ran script worked as intended based on its output and the script's description."
@@ -173,14 +239,11 @@ class LLMProvider:
         outputs: {outputs}
         Actual stdout: {stdout}
         Actual stderr: {stderr}
+        Files created by the run: {describe_outputs(output_files or [])}
         
         Did the script work as intended? Provide a boolean response (True/False) and a brief explanation.
         """
         
-        class EvaluationResponse(BaseModel):
-            success: bool
-            explanation: str
-        
         result = self.openai_structured_output(system_prompt, user_prompt, EvaluationResponse)
         
         print(f"\n\033[94mEvaluation result: {'Success' if result.success else 'Failure'}\033[0m")
@@ -188,8 +251,39 @@ class LLMProvider:
         
         return result.success
     
+    def generate_test_cases(self, script_content, description, parameters, outputs) -> List[ScriptTestCase]:
+        print(f"\n\033[94mWriting test cases for the script...\033[0m")
+        system_prompt = """You are a QA engineer writing black-box tests for a Python command-line script. Each test case runs the script once, in an empty directory, and checks how it behaves.
+
+Write 3 to 6 small test cases that together show whether the script does what its description says: the main use, the important options, and one bad input that should fail cleanly. For each case give:
+- name: a short snake_case name.
+- arguments: the command-line arguments, one list item per argument, without "python" or the script name.
+- stdin: text to type into the script if it asks for input, otherwise an empty string.
+- input_files: any text files the script needs to read, with their name and content. Otherwise empty.
+- expected_exit_code: 0 for success, or the non-zero code a bad input should exit with (argparse errors exit with 2).
+- stdout_contains: short snippets that must appear in the output, matched case-insensitively. Only include text the script is certain to print, never random or time-dependent values.
+- expected_files: glob patterns of files the run must create, like "*.png". Otherwise empty.
+
+Tests must not need network access, API keys, a display or files that aren't in input_files, and each must finish within a few seconds."""
+        user_prompt = f"""
+        Script description: {description}
+        parameters: {parameters}
+        outputs: {outputs}
+        
+        Script:
+        {script_content}
+        """
+        result = self.openai_structured_output(system_prompt, user_prompt, ScriptTestSuite)
+        # A refusal comes back as a string, which means no tests
+        return result.cases if isinstance(result, ScriptTestSuite) else []
+
     def analyze_pip_error(self, packages, error_output):
         print("\nAnalyzing pip error, and suggesting fixes...\n")
+        # Common failures like `pip install PIL` are fixed from the import map without asking the LLM
+        fixed_packages = classify_pip_error(packages, error_output)
+        if fixed_packages is not None:
+            print(f"\033[94mFixed packages: {', '.join(fixed_packages)}\033[0m")
+            return fixed_packages
         system_prompt = """You are an AI assistant specialized in Python package management and pip errors. 
         Analyze the given list of packages and the error output, then suggest fixes or explain why they can't be fixed."""
 
@@ -201,10 +295,6 @@ class LLMProvider:
         Return the list of packages, either fixed or as they were if no fix is possible.
         """
 
-        class PipAnalysisResult(BaseModel):
-            fixed_packages: list[str]
-            explanation: str
-
         result = self.openai_structured_output(system_prompt, user_prompt, PipAnalysisResult)
         
         print(f"\033[94mAnalysis result: {result.explanation}\033[0m")
@@ -212,8 +302,15 @@ class LLMProvider:
         
         return result.fixed_packages
 
-    def generate_script_content(self, prompt: str, script_name: str, parameters: List[str], outputs: List[str], description: str) -> str:
+    def generate_script_content(self, prompt: str, script_name: str, parameters: List[str], outputs: List[str], description: str, examples: Optional[List[Example]] = None, on_chunk: Optional[Callable[[str], None]] = None) -> str:
         print("\nGenerating script content...\n")
+        # Working scripts on similar topics, shown as references for structure and libraries
+        example_prompt = f"""
+                Here are some scripts that are known to work and do similar things, use them as a reference if they help:
+                
+                {format_examples(examples)}
+                """ if examples else ""
+
         system_prompt = f"""You are a master Python script writer tasked with creating a script based on the given information. Your goal is to write a complete, functional Python script that meets the specified requirements and incorporates creative elements. ONLY output the code content of the script you create. Follow these instructions carefully:
 
 
@@ -236,6 +333,7 @@ It's CRUCIAL that you output the code in a markdown code block, like this:
 
 Remember, you have full creative freedom to design and implement the script as you see fit! :) Don't be afraid to think outside the box and create something unique and useful! """
 
+        self._check_budget()
         response = self.openai_client.chat.completions.create(
             model=self.model,
             messages=[
@@ -254,18 +352,120 @@ Remember, you have full creative freedom to design and implement the script as y
                 
                 Ideas for the script input parameters:
                 {', '.join(parameters)}
-                
+                {example_prompt}
                 """}
             ],
+            temperature=self.temperature,
+            # Streamed when someone wants the code as it arrives, e.g. to start installing its imports early
+            **({"stream": True, "stream_options": {"include_usage": True}} if on_chunk else {})
+        )
+        if not on_chunk:
+            self._record_usage(self.model, response.usage)
+            return response.choices[0].message.content
+        content = []
+        for chunk in response:
+            if chunk.usage:
+                self._record_usage(self.model, chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                content.append(chunk.choices[0].delta.content)
+                on_chunk(chunk.choices[0].delta.content)
+        return "".join(content)
+    
+    def generate_script_sections(self, prompt: str, script_name: str, parameters: List[str], outputs: List[str], description: str, examples: Optional[List[Example]] = None) -> Optional[ScriptTemplateParts]:
+        print("\nGenerating script sections...\n")
+        system_prompt = f"""You are a master Python script writer tasked with creating a CLI script based on the given information. Write a complete, functional implementation that meets the requirements, handles errors and edge cases gracefully, and is creative. Feel free to use any pip libraries that would help.
+
+{TEMPLATE_INSTRUCTIONS}"""
+        user_prompt = f"""{prompt}
+        
+        Script name: {script_name}
+        
+        Description: {description}
+        
+        Ideas for the outputs of the script:
+        {', '.join(outputs)}
+        
+        Ideas for the script input parameters:
+        {', '.join(parameters)}
+        """
+        if examples:
+            user_prompt += f"""
+        Here are some scripts that are known to work and do similar things, use them as a reference if they help:
+        
+        {format_examples(examples)}
+        """
+        result = self.openai_structured_output(system_prompt, user_prompt, ScriptTemplateParts)
+        # A refusal comes back as a string
+        return result if isinstance(result, ScriptTemplateParts) else None
+
+    def optimize_script_content(self, script_content: str, profile_report: str, description: str) -> str:
+        print("\nAsking for a faster version of the script...\n")
+        system_prompt = """You are a Python performance engineer. You will be given a working Python script, what it is meant to do, and a profile of it running a representative workload. Rewrite the script so it runs faster and uses less memory, focusing on the hotspots in the profile.
+
+The rewritten script MUST keep exactly the same command-line interface and produce exactly the same output, printed text and files alike. Only change how the work is done, not what it does. Prefer better algorithms and data structures, avoiding repeated work, and batching I/O over micro-optimizations.
+
+ONLY output the complete rewritten script in a markdown code block, like this:
+```python
+# Your code goes here
+```"""
+
+        self._check_budget()
+        response = self.openai_client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"""Script description: {description}
+
+Profile of the current script:
+{profile_report}
+
+Current script:
+{script_content}
+"""}
+            ],
             temperature=self.temperature
         )
+        self._record_usage(self.model, response.usage)
+        return response.choices[0].message.content
+
+    def fix_performance_issues(self, script_content: str, issues_report: str) -> str:
+        print("\nRewriting the slow parts of the script...\n")
+        system_prompt = """You are a Python performance engineer. You will be given a Python script and a list of performance problems a linter found in it, with line numbers. Fix exactly those problems and nothing else: keep the same command-line interface, behaviour, output, comments and structure.
+
+ONLY output the complete fixed script in a markdown code block, like this:
+```python
+# Your code goes here
+```"""
+
+        self._check_budget()
+        response = self.openai_client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": f"""Performance problems:
+{issues_report}
+
+Script:
+{script_content}
+"""}
+            ],
+            temperature=self.temperature
+        )
+        self._record_usage(self.model, response.usage)
         return response.choices[0].message.content
-    
 
     def get_run_command(self,script_name, script_content):
         if ".py" not in script_name:
             script_name += ".py"
         
+        # Work the command and packages out from the script's AST when we can, the LLM is only the fallback
+        code = clean_up_code(script_content) or script_content
+        local_run_command = infer_run_command(script_name, code)
+        local_packages = resolve_distributions(code, script_name)
+        if local_run_command and local_packages is not None:
+            pip_install_command = f"pip install {' '.join(local_packages)}" if local_packages else ""
+            return local_run_command, pip_install_command
+        
         system_prompt = f"""Your job is to create the command necessary to run the following script. Return the string of the one-line command necessary to run the script, in run_command. In addition, we need to know what pip libraries are needed, and return them in a one-line, CLI pip install command, like this:
         
         pip install matplotlib pandas numpy 
@@ -287,7 +487,7 @@ Remember, you have full creative freedom to design and implement the script as y
         
         result = self.openai_structured_output(system_prompt, script_content, RunCommand)
         pip_install_command = result.pip_install_command
-        run_command = result.run_command
+        run_command = local_run_command or result.run_command
         
         return run_command, pip_install_command
         
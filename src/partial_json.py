@@ -0,0 +1,110 @@
+import json
+from typing import Any, List, Optional
+from pydantic import BaseModel
+
+
+class StreamEvent(BaseModel):
+    # A top-level field of the streamed object, or one element of a top-level array (index set)
+    key: str
+    index: Optional[int] = None
+    value: Any
+
+
+class StreamingObjectParser:
+    # Incrementally scans a streamed JSON object and reports each top-level field, and each element of
+    # top-level arrays, as soon as its closing character arrives. Each character is only looked at once.
+    def __init__(self):
+        self.buffer = ""
+        self.position = 0
+        self.stack: List[str] = []
+        self.in_string = False
+        self.escape = False
+        self.expecting = "key"
+        self.key_start = None
+        self.key = None
+        self.value_start = None
+        self.item_start = None
+        self.item_index = 0
+
+    def feed(self, chunk: str) -> List[StreamEvent]:
+        self.buffer += chunk
+        events = []
+        while self.position < len(self.buffer):
+            self._step(self.buffer[self.position], self.position, events)
+            self.position += 1
+        return events
+
+    def _in_top_array(self) -> bool:
+        return len(self.stack) == 2 and self.stack[1] == "["
+
+    def _scalar_pending(self, start) -> bool:
+        return start is not None and self.buffer[start] not in '{["'
+
+    def _emit_value(self, end: int, events: List[StreamEvent]):
+        events.append(StreamEvent(key=self.key, value=json.loads(self.buffer[self.value_start:end])))
+        self.value_start = None
+
+    def _emit_item(self, end: int, events: List[StreamEvent]):
+        events.append(StreamEvent(key=self.key, index=self.item_index, value=json.loads(self.buffer[self.item_start:end])))
+        self.item_start = None
+        self.item_index += 1
+
+    def _step(self, char: str, i: int, events: List[StreamEvent]):
+        depth = len(self.stack)
+        if self.in_string:
+            if self.escape:
+                self.escape = False
+            elif char == "\\":
+                self.escape = True
+            elif char == '"':
+                self.in_string = False
+                if depth == 1 and self.expecting == "key":
+                    self.key = json.loads(self.buffer[self.key_start:i + 1])
+                    self.expecting = "colon"
+                elif depth == 1 and self.value_start is not None:
+                    self._emit_value(i + 1, events)
+                elif self._in_top_array() and self.item_start is not None and self.buffer[self.item_start] == '"':
+                    self._emit_item(i + 1, events)
+            return
+
+        if char.isspace():
+            return
+        if char == '"':
+            self.in_string = True
+            if depth == 1 and self.expecting == "key":
+                self.key_start = i
+            elif depth == 1 and self.value_start is None:
+                self.value_start = i
+            elif self._in_top_array() and self.item_start is None:
+                self.item_start = i
+        elif char in "{[":
+            if depth == 1 and self.value_start is None:
+                self.value_start = i
+                self.item_index = 0
+            elif self._in_top_array() and self.item_start is None:
+                self.item_start = i
+            self.stack.append(char)
+        elif char in "}]":
+            if depth == 1 and self._scalar_pending(self.value_start):
+                self._emit_value(i, events)
+            if self._in_top_array() and self._scalar_pending(self.item_start):
+                self._emit_item(i, events)
+            self.stack.pop()
+            if len(self.stack) == 1 and self.value_start is not None:
+                self._emit_value(i + 1, events)
+            elif self._in_top_array() and self.item_start is not None and len(self.stack) == 2:
+                self._emit_item(i + 1, events)
+        elif char == ",":
+            if depth == 1:
+                if self._scalar_pending(self.value_start):
+                    self._emit_value(i, events)
+                self.expecting = "key"
+            elif self._in_top_array() and self._scalar_pending(self.item_start):
+                self._emit_item(i, events)
+        elif char == ":":
+            if depth == 1:
+                self.expecting = "value"
+        elif depth == 1 and self.expecting == "value" and self.value_start is None:
+            self.value_start = i
+        elif self._in_top_array() and self.item_start is None:
+            self.item_start = i
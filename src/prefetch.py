@@ -0,0 +1,127 @@
+import importlib.util
+import re
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional, Set
+from .dependencies import distribution_for, is_stdlib, load_import_map
+
+# Well-known distributions installed under their import name. Prefetching only installs these and the
+# import map's entries, anything else waits for the regular install, so a typo in a half-written script
+# can't pull in a lookalike package from PyPI
+KNOWN_DISTRIBUTIONS = frozenset({
+    "aiohttp", "altair", "anthropic", "arrow", "boto3", "bokeh", "click", "colorama", "cryptography", "dash", "emoji",
+    "fastapi", "flask", "folium", "geopy", "gradio", "httpx", "imageio", "jinja2", "joblib", "keras", "lxml", "manim",
+    "markdown", "matplotlib", "networkx", "nltk", "numba", "numpy", "openai", "openpyxl", "pandas", "paramiko",
+    "pendulum", "plotly", "psutil", "pydantic", "pydub", "pygame", "pyperclip", "pytest", "pytz", "qrcode",
+    "requests", "rich", "schedule", "scipy", "seaborn", "selenium", "shapely", "spacy", "streamlit", "sympy",
+    "tabulate", "textblob", "tensorflow", "torch", "torchvision", "tqdm", "transformers", "typer", "tzdata",
+    "uvicorn", "websockets", "wordcloud", "xlsxwriter",
+})
+
+# `import a, b.c as d` and `from a.b import c`, at the start of a line
+IMPORT_LINE = re.compile(r"^\s*(?:import\s+([\w.]+(?:\s+as\s+\w+)?(?:\s*,\s*[\w.]+(?:\s+as\s+\w+)?)*)|from\s+([\w.]+)\s+import\b)")
+
+
+class ImportSniffer:
+    # Picks the top-level modules out of code as it streams in, a line at a time, reporting each one once
+    def __init__(self):
+        self.partial_line = ""
+        self.seen: Set[str] = set()
+
+    def _modules(self, line: str) -> List[str]:
+        match = IMPORT_LINE.match(line)
+        if not match:
+            return []
+        if match.group(2):
+            names = [match.group(2)]
+        else:
+            names = [name.split()[0] for name in match.group(1).split(",")]
+        # Relative imports are the script's own modules
+        return [name.split(".")[0] for name in names if name and not name.startswith(".")]
+
+    def feed(self, chunk: str) -> List[str]:
+        lines = (self.partial_line + chunk).split("\n")
+        self.partial_line = lines.pop()
+        new_modules = []
+        for line in lines:
+            for module in self._modules(line):
+                if module not in self.seen:
+                    self.seen.add(module)
+                    new_modules.append(module)
+        return new_modules
+
+
+def pip_install(packages: List[str], timeout: Optional[float] = None) -> bool:
+    try:
+        result = subprocess.run([sys.executable, "-m", "pip", "install", "--quiet"] + packages, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        # pip was killed, whatever it didn't get to is left to the regular install
+        return False
+    return result.returncode == 0
+
+
+class DependencyPrefetcher:
+    # Installs a script's third-party imports in the background while the rest of the script is still streaming in.
+    # Installs run one batch at a time on a single worker, since concurrent pip runs can clobber each other.
+    def __init__(self, install=pip_install):
+        self.install = install
+        self.sniffer = ImportSniffer()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+        self.lock = threading.Lock()
+        self.pending: List[str] = []
+        self.futures: List[Future] = []
+        # Distributions that are importable now, either already there or installed by us, and ones pip failed on
+        self.ready: Set[str] = set()
+        self.failed: Set[str] = set()
+
+    def feed(self, chunk: str):
+        for module in self.sniffer.feed(chunk):
+            self.prefetch(module)
+
+    def prefetch(self, module: str):
+        if is_stdlib(module):
+            return
+        distribution = distribution_for(module)
+        if importlib.util.find_spec(module) is not None:
+            self.ready.add(distribution)
+            return
+        if module not in load_import_map() and distribution not in KNOWN_DISTRIBUTIONS:
+            return
+        with self.lock:
+            if distribution in self.pending or distribution in self.ready or distribution in self.failed:
+                return
+            self.pending.append(distribution)
+            # Everything found while an install is running goes into the next batch together
+            if len(self.pending) == 1:
+                self.futures.append(self.executor.submit(self._install_pending))
+
+    def _install_pending(self):
+        with self.lock:
+            batch, self.pending = self.pending, []
+        if not batch:
+            return
+        print(f"\n\033[94mInstalling {', '.join(batch)} in the background...\033[0m")
+        if self.install(batch):
+            self.ready.update(batch)
+            return
+        if len(batch) == 1:
+            # Leave it to the regular install, which knows how to fix a bad package list
+            self.failed.update(batch)
+            return
+        # One bad name fails the whole pip run, so the rest each get their own try
+        for distribution in batch:
+            if self.install([distribution]):
+                self.ready.add(distribution)
+            else:
+                self.failed.add(distribution)
+
+    def wait(self, timeout: Optional[float] = None) -> Set[str]:
+        # Block until the background installs are done, and return what's ready
+        for future in list(self.futures):
+            future.result(timeout=timeout)
+        return self.ready
+
+    def close(self):
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,129 @@
+import io
+import json
+import os
+import pstats
+import shlex
+import statistics
+import subprocess
+import sys
+import time
+from typing import List, Optional
+from pydantic import BaseModel
+from .runner import script_argv
+from .workspace import RunWorkspace
+
+# Runs a script under cProfile, as in `python -c PROFILE_BOOTSTRAP stats_path script.py args...`
+PROFILE_BOOTSTRAP = """
+import cProfile, json, runpy, sys
+stats_path = sys.argv[1]
+sys.argv = sys.argv[2:]
+profiler = cProfile.Profile()
+try:
+    profiler.runcall(runpy.run_path, sys.argv[0], run_name="__main__")
+except SystemExit:
+    pass
+finally:
+    profiler.dump_stats(stats_path)
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux reports kilobytes, macOS reports bytes
+        peak_kb = peak // 1024 if sys.platform == "darwin" else peak
+    except ImportError:
+        peak_kb = None
+    with open(stats_path + ".json", "w") as f:
+        json.dump({"peak_memory_kb": peak_kb}, f)
+"""
+
+HOTSPOT_COUNT = 15
+# Longest a single run of the original script may take before optimization is skipped
+BASELINE_TIMEOUT = 300.0
+# An optimized script has to be at least this much faster to replace the current one
+MIN_SPEEDUP = 1.05
+
+
+class Measurement(BaseModel):
+    median_seconds: float
+    returncode: int
+    stdout: str
+    stderr: str
+    output_hashes: List[str]
+    deterministic: bool
+    peak_memory_kb: Optional[int] = None
+    hotspots: str = ""
+
+
+def _hotspots(stats_path: str) -> str:
+    report = io.StringIO()
+    stats = pstats.Stats(stats_path, stream=report)
+    stats.strip_dirs().sort_stats("tottime").print_stats(HOTSPOT_COUNT)
+    # Drop pstats' preamble, the table header onwards is what matters
+    text = report.getvalue()
+    start = text.find("ncalls")
+    return text[start:].strip() if start != -1 else text.strip()
+
+
+def measure_script(script_name: str, code: str, run_command: str, repeats: int = 3, timeout: Optional[float] = None, tmpfs: bool = False) -> Optional[Measurement]:
+    # Time a few plain runs, then profile one more for hotspots and peak memory. None if the command can't be profiled
+    argv = script_argv(run_command)
+    if argv is None:
+        return None
+    timings, stdouts, output_hashes = [], [], []
+    for _ in range(repeats):
+        with RunWorkspace(script_name, code, tmpfs) as workspace:
+            start = time.perf_counter()
+            result = subprocess.run([sys.executable] + argv, stdin=subprocess.DEVNULL, capture_output=True, text=True, cwd=workspace.path, timeout=timeout)
+            timings.append(time.perf_counter() - start)
+            stdouts.append(result.stdout)
+            output_hashes.append(sorted(output.sha256 for output in workspace.collect_outputs()))
+
+    measurement = Measurement(
+        median_seconds=statistics.median(timings),
+        returncode=result.returncode,
+        stdout=result.stdout,
+        stderr=result.stderr,
+        output_hashes=output_hashes[-1],
+        # Scripts that print timestamps or random art can't be compared output for output
+        deterministic=all(stdout == stdouts[0] for stdout in stdouts) and all(hashes == output_hashes[0] for hashes in output_hashes),
+    )
+    with RunWorkspace(script_name, code, tmpfs) as workspace:
+        stats_path = os.path.join(workspace.path, ".scriptomatic.prof")
+        subprocess.run([sys.executable, "-c", PROFILE_BOOTSTRAP, stats_path] + argv, stdin=subprocess.DEVNULL, capture_output=True, text=True, cwd=workspace.path, timeout=timeout)
+        if os.path.exists(stats_path):
+            measurement.hotspots = _hotspots(stats_path)
+            with open(stats_path + ".json") as f:
+                measurement.peak_memory_kb = json.load(f)["peak_memory_kb"]
+    return measurement
+
+
+def workload_command(workload: str, script_name: str, cwd: Optional[str] = None) -> Optional[str]:
+    # The user's --workload pointed at the generated script, whatever name they guessed for it. Runs happen in a
+    # temp directory, so arguments naming files or folders that exist where the user is are made absolute
+    argv = script_argv(workload)
+    if argv is None:
+        return None
+    cwd = cwd or os.getcwd()
+    script_name = script_name if script_name.endswith(".py") else f"{script_name}.py"
+    arguments = []
+    for argument in argv[1:]:
+        flag, equals, value = argument.partition("=") if argument.startswith("-") else ("", "", argument)
+        if value and not value.startswith("-") and os.path.exists(os.path.join(cwd, value)):
+            value = os.path.abspath(os.path.join(cwd, value))
+        arguments.append(f"{flag}{equals}{value}" if flag else value)
+    return shlex.join(["python", script_name] + arguments)
+
+
+def same_behaviour(baseline: Measurement, candidate: Measurement) -> bool:
+    if candidate.returncode != baseline.returncode:
+        return False
+    if not baseline.deterministic:
+        return True
+    return candidate.stdout == baseline.stdout and candidate.output_hashes == baseline.output_hashes
+
+
+def format_profile_report(measurement: Measurement) -> str:
+    peak_memory = f"{measurement.peak_memory_kb / 1024:.1f} MB" if measurement.peak_memory_kb else "unknown"
+    return f"""Median wall time: {measurement.median_seconds:.3f}s
+Peak memory: {peak_memory}
+Top functions by own time:
+{measurement.hotspots or "No profile available"}"""
@@ -0,0 +1,30 @@
+from functools import lru_cache
+from typing import Type, TypeVar
+from pydantic import BaseModel, TypeAdapter
+
+try:
+    # Tightens a pydantic schema the way strict structured outputs need (no extra keys, every field required)
+    from openai.lib._pydantic import to_strict_json_schema
+except ImportError:
+    to_strict_json_schema = None
+
+Model = TypeVar("Model", bound=BaseModel)
+
+
+@lru_cache(maxsize=None)
+def response_format(model: Type[BaseModel]) -> dict:
+    # Every structured call goes through here, so each model's schema is built once per process
+    if to_strict_json_schema is None:
+        # Older SDKs, send the plain schema and leave strict mode off
+        return {"type": "json_schema", "json_schema": {"name": model.__name__, "schema": model.model_json_schema(), "strict": False}}
+    return {"type": "json_schema", "json_schema": {"name": model.__name__, "schema": to_strict_json_schema(model), "strict": True}}
+
+
+@lru_cache(maxsize=None)
+def type_adapter(model: Type[Model]) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def validate_response(model: Type[Model], content: str) -> Model:
+    # Validate the raw JSON straight into the model, without going through json.loads and a dict first
+    return type_adapter(model).validate_json(content)
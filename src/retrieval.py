@@ -0,0 +1,177 @@
+import json
+import math
+import mmap
+import os
+import re
+import zlib
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+from .lib import SCRIPTOMATIC_HOME
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+# Known-good scripts that ship with the repo, plus the ones that passed evaluation on this machine.
+# The repo's scripts live outside the package, so they're only there when running from a checkout;
+# an installed copy starts from the good scripts alone.
+BUNDLED_EXAMPLES = [REPO_ROOT / "example-scripts", REPO_ROOT / "abstract_art_generator.py", REPO_ROOT / "generate_color_palettes.py"]
+GOOD_SCRIPTS_DIR = SCRIPTOMATIC_HOME / "good_scripts"
+INDEX_DIR = SCRIPTOMATIC_HOME / "index"
+
+# Words are hashed into this many buckets, so the index needs no vocabulary file
+VECTOR_SIZE = 2048
+MIN_SIMILARITY = 0.1
+# Long examples are cut down so a couple of them don't blow up the prompt
+MAX_EXAMPLE_CHARS = 6000
+# Words every script has, which say nothing about what a script does
+STOPWORDS = {
+    "and", "the", "for", "with", "that", "this", "from", "are", "you", "your", "will", "can", "not", "none", "true", "false",
+    "import", "def", "class", "return", "elif", "else", "try", "except", "finally", "while", "pass", "break", "continue",
+    "self", "print", "args", "argparse", "parser", "add", "argument", "help", "type", "str", "int", "float", "default",
+    "action", "store", "main", "name", "error", "exception", "description", "script", "python", "use", "using", "usage",
+}
+
+
+class Example(BaseModel):
+    name: str
+    path: str
+    score: float
+    code: str
+    truncated: bool = False
+
+
+def tokenize(text: str) -> List[str]:
+    # Split snake_case and CamelCase identifiers into words, so `draw_mandala` matches "mandala drawing"
+    words = re.findall(r"[A-Z]?[a-z]+|[A-Z]+(?![a-z])", text)
+    return [word.lower() for word in words if len(word) > 2 and word.lower() not in STOPWORDS]
+
+
+def _bucket(word: str) -> int:
+    # crc32 rather than hash(), which changes between interpreter runs
+    return zlib.crc32(word.encode()) % VECTOR_SIZE
+
+
+def _term_weights(text: str) -> Dict[int, float]:
+    counts = Counter(_bucket(word) for word in tokenize(text))
+    return {bucket: 1 + math.log(count) for bucket, count in counts.items()}
+
+
+def corpus_files(sources: List[Path]) -> List[Path]:
+    files = []
+    for source in sources:
+        if source.is_dir():
+            files.extend(sorted(source.glob("*.py")))
+        elif source.is_file():
+            files.append(source)
+    return files
+
+
+class ExampleIndex:
+    # A TF-IDF index over the example scripts, kept on disk as a flat float32 file and memory-mapped for lookups.
+    # Row 0 holds the IDF weights, row i the normalized vector of the i-th script in the manifest.
+    def __init__(self, sources: Optional[List[Path]] = None, directory: Path = INDEX_DIR, good_scripts: Path = GOOD_SCRIPTS_DIR):
+        self.good_scripts = Path(good_scripts)
+        self.sources = [Path(source) for source in sources] if sources is not None else BUNDLED_EXAMPLES + [self.good_scripts]
+        self.directory = Path(directory)
+        self.paths: List[str] = []
+        self.vectors = None
+        self._mmap = None
+
+    def _signature(self, files: List[Path]) -> list:
+        signature = []
+        for path in files:
+            stat = path.stat()
+            signature.append([str(path), stat.st_mtime_ns, stat.st_size])
+        return signature
+
+    def load(self):
+        # Map the index, rebuilding it first if any script was added, removed or changed since it was built
+        self.close()
+        files = corpus_files(self.sources)
+        signature = self._signature(files)
+        manifest_path = self.directory / "examples.json"
+        try:
+            manifest = json.loads(manifest_path.read_text())
+            up_to_date = manifest["signature"] == signature and manifest["vector_size"] == VECTOR_SIZE
+        except (OSError, ValueError, KeyError):
+            up_to_date = False
+        if not up_to_date:
+            manifest = self.build(files, signature)
+        self.paths = manifest["paths"]
+        if not self.paths:
+            return
+        with open(self.directory / "examples.bin", "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.vectors = memoryview(self._mmap).cast("f")
+
+    def build(self, files: List[Path], signature: list) -> dict:
+        term_weights = [_term_weights(path.read_text(errors="replace")) for path in files]
+        document_frequency = Counter(bucket for weights in term_weights for bucket in weights)
+        idf = array("f", [math.log((len(files) + 1) / (document_frequency[bucket] + 1)) + 1 for bucket in range(VECTOR_SIZE)])
+        vectors = array("f", idf)
+        for weights in term_weights:
+            row = array("f", bytes(4 * VECTOR_SIZE))
+            for bucket, weight in weights.items():
+                row[bucket] = weight * idf[bucket]
+            norm = math.sqrt(sum(value * value for value in row)) or 1.0
+            vectors.extend(value / norm for value in row)
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        manifest = {"vector_size": VECTOR_SIZE, "signature": signature, "paths": [str(path) for path in files]}
+        # Write to temp files and swap them in, so a crash mid-build can't leave a half-written index behind
+        for name, data in (("examples.bin", vectors.tobytes()), ("examples.json", json.dumps(manifest).encode())):
+            temp_path = self.directory / f".{name}.tmp"
+            temp_path.write_bytes(data)
+            os.replace(temp_path, self.directory / name)
+        return manifest
+
+    def close(self):
+        if self.vectors is not None:
+            self.vectors.release()
+            self.vectors = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def search(self, query: str, k: int = 2) -> List[Example]:
+        if self.vectors is None:
+            self.load()
+        if self.vectors is None:
+            return []
+        query_vector = {bucket: weight * self.vectors[bucket] for bucket, weight in _term_weights(query).items()}
+        norm = math.sqrt(sum(value * value for value in query_vector.values()))
+        if not norm:
+            return []
+        # The query only touches a handful of buckets, so each score is a short sparse dot product
+        scores = []
+        for row, path in enumerate(self.paths, 1):
+            offset = row * VECTOR_SIZE
+            score = sum(value * self.vectors[offset + bucket] for bucket, value in query_vector.items()) / norm
+            if score >= MIN_SIMILARITY:
+                scores.append((score, path))
+        scores.sort(reverse=True)
+        # Whole scripts make better examples than cut-off ones, so long scripts only fill in when too few short ones match
+        whole, truncated = [], []
+        for score, path in scores:
+            code = Path(path).read_text(errors="replace")
+            if len(code) <= MAX_EXAMPLE_CHARS:
+                whole.append(Example(name=Path(path).stem, path=path, score=score, code=code))
+                if len(whole) == k:
+                    break
+            elif len(truncated) < k:
+                code = code[:MAX_EXAMPLE_CHARS].rsplit("\n", 1)[0]
+                truncated.append(Example(name=Path(path).stem, path=path, score=score, code=code, truncated=True))
+        return sorted(whole + truncated[:k - len(whole)], key=lambda example: example.score, reverse=True)
+
+    def add_good_script(self, script_name: str, code: str):
+        # Scripts that passed evaluation become examples for the next generation
+        self.good_scripts.mkdir(parents=True, exist_ok=True)
+        script_name = script_name if script_name.endswith(".py") else f"{script_name}.py"
+        (self.good_scripts / script_name).write_text(code)
+        self.close()
+
+
+def format_examples(examples: List[Example]) -> str:
+    # Cut-off examples are labelled, so the model doesn't take a partial script as a complete working one
+    return "\n\n".join(f"{example.name}.py{' (only the beginning, the rest is cut off)' if example.truncated else ''}:\n```python\n{example.code}\n```" for example in examples)
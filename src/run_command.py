@@ -0,0 +1,231 @@
+import ast
+import shlex
+from typing import Dict, List, Optional
+from pydantic import BaseModel
+
+
+class ArgumentSpec(BaseModel):
+    flags: List[str]
+    required: bool = False
+    choices: Optional[List[str]] = None
+    type: Optional[str] = None
+    default: Optional[str] = None
+    nargs: Optional[str] = None
+    action: Optional[str] = None
+    help: Optional[str] = None
+    subcommand: Optional[str] = None
+
+    @property
+    def positional(self) -> bool:
+        return not self.flags[0].startswith("-")
+
+
+# Example values picked by looking at the argument name, checked in order
+NAME_HINTS = [
+    (("url", "link", "website", "endpoint"), "https://example.com"),
+    (("email",), "user@example.com"),
+    (("city", "location", "place", "country"), "London"),
+    (("date", "day"), "2024-01-01"),
+    (("time",), "12:00"),
+    (("color", "colour"), "blue"),
+    (("dir", "directory", "folder"), "."),
+    (("text", "message", "prompt", "query", "sentence", "phrase"), "Hello, world!"),
+    (("name", "title", "theme", "topic", "mood", "word", "category"), "example"),
+]
+
+# Arguments we can't invent a value for, since the run would need a real file or credential
+FILE_HINTS = ("file", "path", "image", "img", "input", "csv", "json", "audio", "video", "pdf", "config")
+SECRET_HINTS = ("key", "token", "secret", "password")
+
+# Command line libraries whose arguments aren't declared through argparse, so they can't be read from the script
+OTHER_CLI_LIBRARIES = ("click", "typer", "fire", "docopt")
+
+FLAG_ACTIONS = ("store_true", "store_false", "store_const", "count", "help", "version")
+
+
+class _Unsupported(Exception):
+    pass
+
+
+def _literal(node) -> Optional[str]:
+    try:
+        value = ast.literal_eval(node)
+    except (ValueError, SyntaxError, TypeError):
+        raise _Unsupported(ast.dump(node))
+    return None if value is None else str(value)
+
+
+def _type_name(node) -> Optional[str]:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    raise _Unsupported(ast.dump(node))
+
+
+def _receiver(call: ast.Call) -> Optional[str]:
+    # The variable a method was called on, e.g. "parser" in parser.add_argument(...)
+    if isinstance(call.func, ast.Attribute) and isinstance(call.func.value, ast.Name):
+        return call.func.value.id
+    return None
+
+
+def _parse_argument(call: ast.Call, subcommand: Optional[str]) -> ArgumentSpec:
+    flags = [_literal(arg) for arg in call.args]
+    if not flags or any(flag is None for flag in flags):
+        raise _Unsupported("add_argument without literal flags")
+    spec = ArgumentSpec(flags=flags, subcommand=subcommand)
+    for keyword in call.keywords:
+        if keyword.arg == "required":
+            spec.required = bool(ast.literal_eval(keyword.value))
+        elif keyword.arg == "choices":
+            spec.choices = [str(choice) for choice in ast.literal_eval(keyword.value)]
+        elif keyword.arg == "type":
+            spec.type = _type_name(keyword.value)
+        elif keyword.arg == "default":
+            try:
+                spec.default = _literal(keyword.value)
+            except _Unsupported:
+                spec.default = None
+        elif keyword.arg == "help":
+            # Help text doesn't change how the script is called, so an f-string there is no reason to give up
+            try:
+                spec.help = _literal(keyword.value)
+            except _Unsupported:
+                spec.help = None
+        elif keyword.arg in ("nargs", "action"):
+            setattr(spec, keyword.arg, _literal(keyword.value))
+    return spec
+
+
+def extract_arguments(script_content: str) -> Optional[List[ArgumentSpec]]:
+    # Walk the script for argparse.add_argument calls, returning None when the parser is too dynamic to follow
+    try:
+        tree = ast.parse(script_content)
+    except SyntaxError:
+        return None
+
+    # A script built on another CLI library declares its arguments some other way, leave those to the LLM
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            modules = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom):
+            modules = [node.module or ""]
+        else:
+            continue
+        if any(module.split(".")[0] in OTHER_CLI_LIBRARIES for module in modules):
+            return None
+
+    # Map each parser variable to the subcommand it belongs to (None for the main parser)
+    parsers: Dict[str, Optional[str]] = {}
+    subparser_groups = set()
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Assign) and isinstance(node.value, ast.Call)):
+            continue
+        if len(node.targets) != 1 or not isinstance(node.targets[0], ast.Name):
+            continue
+        target = node.targets[0].id
+        func = node.value.func
+        method = func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", None)
+        if method == "ArgumentParser":
+            parsers[target] = None
+        elif method == "add_subparsers":
+            subparser_groups.add(target)
+        elif method == "add_parser" and _receiver(node.value) in subparser_groups:
+            try:
+                parsers[target] = _literal(node.value.args[0])
+            except (IndexError, _Unsupported):
+                return None
+        elif method in ("add_argument_group", "add_mutually_exclusive_group"):
+            parent = _receiver(node.value)
+            if parent in parsers:
+                parsers[target] = parsers[parent]
+
+    arguments = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute)):
+            continue
+        if node.func.attr != "add_argument":
+            continue
+        receiver = _receiver(node)
+        if receiver not in parsers:
+            return None
+        try:
+            arguments.append(_parse_argument(node, parsers[receiver]))
+        except (_Unsupported, ValueError, SyntaxError, TypeError):
+            return None
+
+    if not parsers and not arguments:
+        # Scripts reading sys.argv by hand need the LLM to work out the invocation
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Attribute) and node.attr == "argv":
+                return None
+    return arguments
+
+
+def _example_value(spec: ArgumentSpec) -> Optional[str]:
+    if spec.choices:
+        return spec.choices[0]
+    if spec.default is not None:
+        return spec.default
+    name = spec.flags[-1].lstrip("-").lower()
+    if any(hint in name for hint in SECRET_HINTS):
+        return None
+    if spec.type == "int":
+        return "3"
+    if spec.type == "float":
+        return "1.5"
+    if spec.type not in (None, "str"):
+        return None
+    if any(hint in (spec.help or "").lower() for hint in ("path to", "file")):
+        return None
+    for hints, value in NAME_HINTS:
+        if any(hint in name for hint in hints):
+            return value
+    if any(hint in name for hint in FILE_HINTS):
+        return None
+    return "example"
+
+
+def _needed(spec: ArgumentSpec) -> bool:
+    if spec.positional:
+        return spec.nargs not in ("?", "*")
+    return spec.required
+
+
+def infer_run_command(script_name: str, script_content: str) -> Optional[str]:
+    arguments = extract_arguments(script_content)
+    if arguments is None:
+        return None
+    if not script_name.endswith(".py"):
+        script_name += ".py"
+
+    # Use the first subcommand declared, the same way you'd try a new CLI for the first time
+    subcommands = []
+    for spec in arguments:
+        if spec.subcommand is not None and spec.subcommand not in subcommands:
+            subcommands.append(spec.subcommand)
+    subcommand = subcommands[0] if subcommands else None
+
+    command = ["python", script_name]
+    tail = []
+    for spec in arguments:
+        if spec.subcommand is not None and spec.subcommand != subcommand:
+            continue
+        if not _needed(spec):
+            continue
+        if spec.action in FLAG_ACTIONS:
+            values = []
+        else:
+            value = _example_value(spec)
+            if value is None:
+                return None
+            repeat = int(spec.nargs) if spec.nargs and spec.nargs.isdigit() else 1
+            values = [value] * repeat
+        args = values if spec.positional else [spec.flags[0]] + values
+        # Main parser arguments go before the subcommand, its own arguments after it
+        (command if spec.subcommand is None else tail).extend(args)
+    if subcommand is not None:
+        command.append(subcommand)
+    return " ".join(shlex.quote(part) for part in command + tail)
+
@@ -0,0 +1,80 @@
+import importlib
+import multiprocessing
+import os
+import runpy
+import shlex
+import subprocess
+import sys
+import tempfile
+import traceback
+from typing import List, Optional
+from .lib import DEFAULT_PRELOAD_MODULES
+
+# Anything a shell would interpret means the command has to go through a real shell
+SHELL_TOKENS = ("|", "||", "&", "&&", ";", ">", ">>", "<", "2>", "2>&1")
+
+
+def script_argv(run_command: str) -> Optional[List[str]]:
+    # ["script.py", "--arg", "value"] for plain `python script.py ...` commands, None for anything fancier
+    try:
+        parts = shlex.split(run_command)
+    except ValueError:
+        return None
+    if len(parts) < 2 or any(part in SHELL_TOKENS or "$(" in part or "`" in part for part in parts):
+        return None
+    interpreter = os.path.basename(parts[0])
+    if parts[0] != sys.executable and interpreter not in ("python", "python3"):
+        return None
+    if not parts[1].endswith(".py"):
+        return None
+    return parts[1:]
+
+
+def _run_script(argv: List[str], cwd: Optional[str], stdout_path: str, stderr_path: str):
+    # Runs inside the forked child, set it up to look like `python script.py ...` was run from cwd
+    if cwd:
+        os.chdir(cwd)
+    for fd, path in ((1, stdout_path), (2, stderr_path)):
+        os.dup2(os.open(path, os.O_WRONLY | os.O_TRUNC), fd)
+    os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+    script_path = os.path.abspath(argv[0])
+    sys.argv = list(argv)
+    sys.path[0] = os.path.dirname(script_path)
+    # Packages may have been installed since the server started, so drop its cached directory listings
+    importlib.invalidate_caches()
+    try:
+        runpy.run_path(script_path, run_name="__main__")
+    except SystemExit:
+        raise
+    except BaseException:
+        traceback.print_exc()
+        sys.exit(1)
+
+
+class ForkServerRunner:
+    def __init__(self, preload: Optional[List[str]] = None):
+        self.preload = list(DEFAULT_PRELOAD_MODULES if preload is None else preload)
+        self.context = None
+        if "forkserver" in multiprocessing.get_all_start_methods():
+            # Heavy modules are imported once in the server, every run is forked from that warm interpreter
+            self.context = multiprocessing.get_context("forkserver")
+            self.context.set_forkserver_preload([__name__] + self.preload)
+        else:
+            print("\033[93mForkserver isn't available on this platform, running scripts normally.\033[0m")
+
+    def run(self, run_command: str, cwd: Optional[str] = None, timeout: Optional[float] = None) -> subprocess.CompletedProcess:
+        argv = script_argv(run_command)
+        if self.context is None or argv is None:
+            return subprocess.run(run_command, shell=True, capture_output=True, text=True, cwd=cwd, timeout=timeout)
+
+        with tempfile.NamedTemporaryFile() as stdout_file, tempfile.NamedTemporaryFile() as stderr_file:
+            process = self.context.Process(target=_run_script, args=(argv, cwd, stdout_file.name, stderr_file.name))
+            process.start()
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+                process.join()
+                raise subprocess.TimeoutExpired(run_command, timeout)
+            stdout = stdout_file.read().decode(errors="replace")
+            stderr = stderr_file.read().decode(errors="replace")
+        return subprocess.CompletedProcess(run_command, process.exitcode, stdout, stderr)
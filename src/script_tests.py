@@ -0,0 +1,127 @@
+import os
+import pprint
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List, Optional
+from pydantic import BaseModel
+from .workspace import RunWorkspace
+
+DEFAULT_TEST_TIMEOUT = 30.0
+# How much of a failing case's output goes into the report
+OUTPUT_EXCERPT_CHARS = 500
+
+
+class InputFile(BaseModel):
+    name: str
+    content: str
+
+
+class ScriptTestCase(BaseModel):
+    name: str
+    arguments: List[str]
+    stdin: str
+    input_files: List[InputFile]
+    expected_exit_code: int
+    stdout_contains: List[str]
+    expected_files: List[str]
+
+
+class ScriptTestSuite(BaseModel):
+    cases: List[ScriptTestCase]
+
+
+class CaseResult(BaseModel):
+    name: str
+    passed: bool
+    reason: str = ""
+    seconds: float = 0.0
+
+
+def _excerpt(text: str) -> str:
+    text = text.strip()
+    return text if len(text) <= OUTPUT_EXCERPT_CHARS else "..." + text[-OUTPUT_EXCERPT_CHARS:]
+
+
+def _input_path(directory: str, name: str) -> Optional[Path]:
+    # Where a case's input file goes, or None when its name would put it outside the case's directory
+    if not name or os.path.isabs(name) or ".." in Path(name).parts:
+        return None
+    root = Path(directory).resolve()
+    path = (root / name).resolve()
+    return path if path.is_relative_to(root) and path != root else None
+
+
+def run_test_case(script_name: str, code: str, case: ScriptTestCase, timeout: float = DEFAULT_TEST_TIMEOUT, tmpfs: bool = False) -> CaseResult:
+    # Each case gets its own workspace with its input files, and its own interpreter process
+    with RunWorkspace(script_name, code, tmpfs) as workspace:
+        for input_file in case.input_files:
+            path = _input_path(workspace.path, input_file.name)
+            if path is None:
+                return CaseResult(name=case.name, passed=False, reason=f"input file {input_file.name!r} is outside the working directory")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(input_file.content)
+        start = time.perf_counter()
+        try:
+            result = subprocess.run([sys.executable, workspace.script_name] + case.arguments, input=case.stdin, capture_output=True, text=True, cwd=workspace.path, timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return CaseResult(name=case.name, passed=False, reason=f"timed out after {timeout:g}s", seconds=timeout)
+        seconds = time.perf_counter() - start
+        if result.returncode != case.expected_exit_code:
+            return CaseResult(name=case.name, passed=False, reason=f"exit code {result.returncode}, expected {case.expected_exit_code}\n{_excerpt(result.stderr or result.stdout)}", seconds=seconds)
+        for text in case.stdout_contains:
+            if text.lower() not in result.stdout.lower():
+                return CaseResult(name=case.name, passed=False, reason=f"stdout doesn't contain {text!r}\n{_excerpt(result.stdout)}", seconds=seconds)
+        for pattern in case.expected_files:
+            if not list(Path(workspace.path).glob(pattern)):
+                return CaseResult(name=case.name, passed=False, reason=f"no file matching {pattern!r} was created", seconds=seconds)
+        return CaseResult(name=case.name, passed=True, seconds=seconds)
+
+
+def run_test_suite(script_name: str, code: str, cases: List[ScriptTestCase], timeout: float = DEFAULT_TEST_TIMEOUT, workers: Optional[int] = None, tmpfs: bool = False) -> List[CaseResult]:
+    # The cases run side by side. Each one is a separate subprocess, so threads are enough to keep them all busy
+    workers = workers or min(len(cases), os.cpu_count() or 1) or 1
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lambda case: run_test_case(script_name, code, case, timeout, tmpfs), cases))
+
+
+def format_test_results(results: List[CaseResult]) -> str:
+    lines = []
+    for result in results:
+        if result.passed:
+            lines.append(f"\033[92m✅ {result.name} ({result.seconds:.2f}s)\033[0m")
+        else:
+            lines.append(f"\033[91m❌ {result.name}: {result.reason}\033[0m")
+    return "\n".join(lines)
+
+
+def render_pytest_suite(script_name: str, cases: List[ScriptTestCase], timeout: float = DEFAULT_TEST_TIMEOUT) -> str:
+    # A standalone pytest file with the same checks, to keep next to the script
+    script_name = script_name if script_name.endswith(".py") else f"{script_name}.py"
+    # Cases that would write outside pytest's tmp_path are left out
+    cases = [case for case in cases if all(_input_path(".", input_file.name) for input_file in case.input_files)]
+    cases_source = pprint.pformat([case.model_dump() for case in cases], sort_dicts=False, width=120)
+    return f'''import subprocess
+import sys
+from pathlib import Path
+import pytest
+SCRIPT = Path(__file__).with_name({script_name!r})
+TIMEOUT = {timeout!r}
+CASES = {cases_source}
+@pytest.mark.parametrize("case", CASES, ids=[case["name"] for case in CASES])
+def test_script(case, tmp_path):
+    # Write the case's input files, then run the script on them in a fresh directory
+    for input_file in case["input_files"]:
+        path = (tmp_path / input_file["name"]).resolve()
+        assert path.is_relative_to(tmp_path.resolve()), f"input file {{input_file['name']}} is outside tmp_path"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(input_file["content"])
+    result = subprocess.run([sys.executable, str(SCRIPT)] + case["arguments"], input=case["stdin"], capture_output=True, text=True, cwd=tmp_path, timeout=TIMEOUT)
+    assert result.returncode == case["expected_exit_code"], result.stderr
+    for text in case["stdout_contains"]:
+        assert text.lower() in result.stdout.lower()
+    for pattern in case["expected_files"]:
+        assert list(tmp_path.glob(pattern)), f"no file matching {{pattern}} was created"
+'''
@@ -1,48 +1,270 @@
+import ast
 import sys
 import subprocess
 import re
-from typing import List
-from .lib import clean_up_code, DEFAULT_OPENAI_MODEL
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Callable, List, Optional
+from .lib import clean_up_code, get_user_feedback, DEFAULT_OPENAI_MODEL
 from .llm import LLMProvider
+from .dependencies import parse_pip_command
+from .runner import ForkServerRunner
+from .workspace import RunWorkspace, describe_outputs
+from .cache import CachedRun, ResultCache, evaluation_key, run_key
+from .profiling import BASELINE_TIMEOUT, MIN_SPEEDUP, format_profile_report, measure_script, same_behaviour, workload_command
+from .lint import format_issues, lint_performance
+from .budget import Budget, BudgetExceeded
+from .retrieval import ExampleIndex
+from .templates import render_script
+from .prefetch import DependencyPrefetcher, pip_install
+from .script_tests import DEFAULT_TEST_TIMEOUT, format_test_results, render_pytest_suite, run_test_suite
 from prompt_toolkit import prompt
 from prompt_toolkit.completion import WordCompleter
 
+
+def _has_code(tree: ast.Module) -> bool:
+    # Anything besides docstrings and bare constants
+    return any(not (isinstance(node, ast.Expr) and isinstance(node.value, ast.Constant)) for node in tree.body)
+
+
 class Scriptomatic:
-    def __init__(self,  model: str = DEFAULT_OPENAI_MODEL, temperature: float = 0.6):
+    def __init__(self,  model: str = DEFAULT_OPENAI_MODEL, temperature: float = 0.6, preload: Optional[List[str]] = None, tmpfs: bool = False, keep_outputs: Optional[str] = None, cache: bool = True, lint_fix: bool = False, max_iterations: Optional[int] = None, max_seconds: Optional[float] = None, max_tokens: Optional[int] = None, max_cost: Optional[float] = None, examples: bool = True, template: bool = False, prefetch: bool = True, test_suite: bool = False):
         self.model = model
         self.temperature = temperature
         self.llm = LLMProvider()
+        # With preload set, scripts are forked from a warm interpreter that already imported those modules
+        self.runner = ForkServerRunner(preload) if preload is not None else None
+        # Every run gets its own temp directory, optionally in RAM, with its files copied to keep_outputs afterwards
+        self.tmpfs = tmpfs
+        self.keep_outputs = keep_outputs
+        # Identical runs are memoized, turn this off for scripts whose output is meant to change between runs
+        self.cache = ResultCache() if cache else None
+        # Performance lint findings are always reported, with lint_fix the LLM is asked to fix them before saving
+        self.lint_fix = lint_fix
+        # Limits for each generate_script call, across every LLM call and test run it makes
+        self.budget_limits = dict(max_iterations=max_iterations, max_seconds=max_seconds, max_tokens=max_tokens, max_cost=max_cost)
+        self.budget = Budget()
+        # Known-good scripts similar to the request are given to the model as examples
+        self.example_index = ExampleIndex() if examples else None
+        self.examples = []
+        # With template set the model only writes the arguments and functions, the boilerplate is filled in locally
+        self.template = template
+        # Imports are installed in the background as the script streams in, when the script is going to be run
+        self.prefetch = prefetch
+        self.prefetcher = None
+        # With test_suite set, scripts are judged by generated test cases instead of one run read by the LLM
+        self.test_suite = test_suite
+        self.test_cases = []
+        # Description the kept attempt passed against, so a lint rewrite can be held to the same check
+        self.passed_description = None
+        # Exit code of the latest test run, so a crash can be told apart from a run that just missed the brief
+        self.last_returncode = None
 
-    def generate_script(self, prompt: str, loop: bool = False, autoloop: bool = False) -> str:
-        enhanced_prompt = self.llm.enhance_query(prompt)
-        
-        script_name, parameters, outputs, description = self.llm.generate_structured_script_components(enhanced_prompt)
-        script_content = self.llm.generate_script_content(prompt, script_name, parameters, outputs, description)
-        
-        if loop or autoloop:
-            script_content = self._iterate_script(script_content, description, parameters, outputs, autoloop)
+    def generate_script(self, prompt: str, loop: bool = False, autoloop: bool = False, optimize: bool = False, workload: Optional[str] = None) -> Optional[str]:
+        # Returns the saved script's file name, or None when the budget ran out before a script was written
+        self.budget = Budget(**self.budget_limits)
+        self.llm.budget = self.budget
+        self.test_cases = []
+        self.passed_description = None
+        # Background installs are cut off when the time budget runs out, like the regular ones
+        self.prefetcher = DependencyPrefetcher(install=lambda packages: pip_install(packages, timeout=self.budget.remaining_seconds())) if self.prefetch and (loop or autoloop or optimize) else None
+        try:
+            try:
+                enhanced_prompt = self.llm.enhance_query(prompt)
+                
+                with ThreadPoolExecutor(max_workers=1, thread_name_prefix="examples") as executor:
+                    on_component, search = self._early_example_search(prompt, executor) if self.example_index else (None, [])
+                    script_name, parameters, outputs, description = self.llm.generate_structured_script_components(enhanced_prompt, on_component=on_component)
+                    self.examples = search[0].result() if search else self._find_examples(f"{prompt} {script_name} {description}")
+                script_content = self._write_script(prompt, script_name, parameters, outputs, description)
+            except BudgetExceeded as e:
+                print(f"\n\033[91m{e} Stopped before a script was written.\033[0m")
+                return None
+            
+            if loop or autoloop:
+                script_content = self._iterate_script(script_name, script_content, description, parameters, outputs, autoloop)
+            
+            if optimize:
+                try:
+                    script_content = self.optimize_script(script_name, script_content, description, workload=workload)
+                except BudgetExceeded as e:
+                    print(f"\n\033[93m{e} Skipping optimization.\033[0m")
+        finally:
+            if self.prefetcher:
+                self.prefetcher.close()
+                self.prefetcher = None
         
-        return self._save_script(script_name, script_content)
+        verify = None
+        if self.passed_description is not None:
+            verify = lambda code: self._passes_again(script_name, code, parameters, outputs)
+        saved_name = self._save_script(script_name, script_content, verify)
+        if self.test_cases:
+            self._save_tests(saved_name)
+        return saved_name
 
 
-    def _iterate_script(self, script_content: str, description: str, parameters: List[str], outputs: List[str], autoloop: bool) -> str:
-        while True:
-            success = self.run_and_evaluate_script(script_content, description, parameters, outputs)
-            if success:
-                break
-            if autoloop:
-                print("\nScript failed. Regenerating...")
-                description = self._update_description(description, script_content)
-                script_content = self.llm.generate_script_content(description, "updated_script", parameters, outputs, description)
-            else:
-                choice = input("\nDo you want to try again? [y/n]: ").lower()
-                if choice != 'y':
+    def _iterate_script(self, script_name: str, script_content: str, description: str, parameters: List[str], outputs: List[str], autoloop: bool) -> str:
+        # The best attempt so far: one that passed, else one that at least ran cleanly, else the latest
+        best_content, best_rank, best_cases = script_content, -1, []
+        try:
+            while True:
+                self.budget.start_iteration()
+                self.test_cases = []
+                if self.test_suite:
+                    success = self.run_and_test_script(script_name, script_content, description, parameters, outputs)
+                else:
+                    success = self.run_and_evaluate_script(script_name, script_content, description, parameters, outputs)
+                rank = 2 if success else int(self.last_returncode == 0)
+                if rank >= best_rank:
+                    # Each attempt's test cases are written for its own arguments, so they stay with it
+                    best_content, best_rank, best_cases = script_content, rank, self.test_cases
+                if success:
+                    self.passed_description = description
+                    if self.example_index:
+                        try:
+                            self.example_index.add_good_script(script_name, clean_up_code(script_content) or script_content)
+                        except OSError as e:
+                            # Losing an example is no reason to lose the script that just passed
+                            print(f"\033[93mCouldn't save the script as an example: {e}\033[0m")
                     break
-                user_feedback = self._get_user_feedback()
-                description = self._update_description(description, script_content, user_feedback)
-                script_content = self.llm.generate_script_content(description, "updated_script", parameters, outputs, description)
-        return script_content
+                # Don't pay for a rewrite there's no attempt left to run
+                self.budget.check_iterations()
+                if autoloop:
+                    print("\nScript failed. Regenerating...")
+                    description = self.llm.update_description(description, script_content)
+                    script_content = self._write_script(description, script_name, parameters, outputs, description)
+                else:
+                    choice = input("\nDo you want to try again? [y/n]: ").lower()
+                    if choice != 'y':
+                        break
+                    user_feedback = get_user_feedback()
+                    description = self.llm.update_description(description, script_content, user_feedback)
+                    script_content = self._write_script(description, script_name, parameters, outputs, description)
+        except BudgetExceeded as e:
+            print(f"\n\033[93m{e} Keeping the best attempt so far.\033[0m")
+        print(f"\n\033[94mUsed {self.budget.summary()}\033[0m")
+        self.test_cases = best_cases
+        return best_content
+
+
+    def _passes_again(self, script_name: str, code: str, parameters: List[str], outputs: List[str]) -> bool:
+        # Run a rewrite of the kept attempt through the same test cases or evaluation it passed
+        try:
+            if self.test_cases:
+                return self.run_and_test_script(script_name, code, self.passed_description, parameters, outputs, cases=self.test_cases)
+            return self.run_and_evaluate_script(script_name, code, self.passed_description, parameters, outputs)
+        except BudgetExceeded as e:
+            print(f"\033[93m{e}\033[0m")
+            return False
 
+    def _write_script(self, prompt: str, script_name: str, parameters: List[str], outputs: List[str], description: str) -> str:
+        if self.template:
+            sections = self.llm.generate_script_sections(prompt, script_name, parameters, outputs, description, self.examples)
+            script_content = render_script(sections) if sections else None
+            if script_content:
+                if self.prefetcher:
+                    self.prefetcher.feed(script_content)
+                return script_content
+            print(f"\033[93mThe script sections didn't fit the template, writing the whole script instead.\033[0m")
+        if self.prefetcher:
+            return self.llm.generate_script_content(prompt, script_name, parameters, outputs, description, self.examples, on_chunk=self.prefetcher.feed)
+        return self.llm.generate_script_content(prompt, script_name, parameters, outputs, description, self.examples)
+
+    def _packages_to_install(self, pip_packages: List[str]) -> List[str]:
+        # Leave out whatever the prefetcher already has installed, waiting for any install still running
+        if not self.prefetcher:
+            return pip_packages
+        try:
+            ready = self.prefetcher.wait(timeout=self.budget.remaining_seconds())
+        except FutureTimeoutError:
+            raise BudgetExceeded(f"Time budget of {self.budget.max_seconds:g}s ran out while waiting for the background installs.")
+        return [package for package in pip_packages if package not in ready]
+
+    def _early_example_search(self, prompt: str, executor: ThreadPoolExecutor):
+        # The plan streams its description and script name before the parameters and outputs, so the example
+        # search starts on those in the background while the rest of the plan arrives
+        fields, search = {}, []
+        def on_component(component):
+            if component.key in ("description", "script_name") and component.index is None:
+                fields[component.key] = component.value
+                if len(fields) == 2 and not search:
+                    search.append(executor.submit(self._find_examples, f"{prompt} {fields['script_name']} {fields['description']}"))
+        return on_component, search
+
+    def _find_examples(self, query: str) -> list:
+        if not self.example_index:
+            return []
+        try:
+            examples = self.example_index.search(query)
+        except OSError as e:
+            # A broken or unwritable index shouldn't stop the script from being generated
+            print(f"\033[93mCouldn't search the example scripts: {e}\033[0m")
+            return []
+        if examples:
+            print(f"\n\033[94mUsing similar scripts as examples: {', '.join(example.name for example in examples)}\033[0m")
+        return examples
+
+    def optimize_script(self, script_name: str, script_content: str, description: str, rounds: int = 3, workload: Optional[str] = None) -> str:
+        code = clean_up_code(script_content) or script_content
+        run_command, pip_install_command = self.llm.get_run_command(script_name, script_content)
+        # The workload is the command to profile, e.g. `python script.py --size 5000`, the inferred command otherwise
+        if workload:
+            workload_run_command = workload_command(workload, script_name)
+            if workload_run_command:
+                run_command = workload_run_command
+            else:
+                print(f"\033[93mThe workload {workload} isn't a plain python command, profiling with {run_command} instead.\033[0m")
+        pip_packages = self._packages_to_install(parse_pip_command(pip_install_command))
+        if pip_packages:
+            self.install_packages(pip_packages)
+
+        print(f"\n\033[94mProfiling {script_name} with: {run_command}\033[0m")
+        # Each run of the original is capped too, a script that waits for input or never finishes can't hang --optimize
+        remaining = self.budget.remaining_seconds()
+        try:
+            baseline = measure_script(script_name, code, run_command, timeout=BASELINE_TIMEOUT if remaining is None else min(BASELINE_TIMEOUT, remaining), tmpfs=self.tmpfs)
+        except subprocess.TimeoutExpired as e:
+            print(f"\033[93mThe script didn't finish within {e.timeout:g}s, skipping optimization.\033[0m")
+            return script_content
+        if baseline is None:
+            print(f"\033[93mCan't profile the command {run_command}, skipping optimization.\033[0m")
+            return script_content
+        if baseline.returncode != 0:
+            print(f"\033[93mThe script doesn't run cleanly, skipping optimization.\033[0m\n{baseline.stderr}")
+            return script_content
+        if not baseline.deterministic:
+            print(f"\033[93mThe script's output changes from run to run, so optimized versions will only be checked for a clean exit.\033[0m")
+
+        best_code, best = code, baseline
+        # Give candidates plenty of room, but don't let a broken rewrite hang the loop
+        timeout = max(30.0, baseline.median_seconds * 10)
+        for attempt in range(1, rounds + 1):
+            print(f"\n\033[94mOptimization round {attempt} of {rounds}\033[0m")
+            print(format_profile_report(best))
+            try:
+                candidate_content = self.llm.optimize_script_content(best_code, format_profile_report(best), description)
+            except BudgetExceeded as e:
+                print(f"\033[93m{e} Stopping optimization.\033[0m")
+                break
+            candidate_code = clean_up_code(candidate_content) or candidate_content
+            remaining = self.budget.remaining_seconds()
+            try:
+                candidate = measure_script(script_name, candidate_code, run_command, timeout=timeout if remaining is None else min(timeout, remaining), tmpfs=self.tmpfs)
+            except subprocess.TimeoutExpired:
+                print(f"\033[91mThe optimized script timed out, keeping the current version.\033[0m")
+                continue
+            if candidate is None or not same_behaviour(baseline, candidate):
+                print(f"\033[91mThe optimized script behaves differently, keeping the current version.\033[0m")
+                continue
+            if candidate.median_seconds * MIN_SPEEDUP > best.median_seconds:
+                print(f"\033[93mNo measurable speedup ({candidate.median_seconds:.3f}s vs {best.median_seconds:.3f}s), keeping the current version.\033[0m")
+                continue
+            print(f"\033[92m{best.median_seconds / candidate.median_seconds:.2f}x faster ({best.median_seconds:.3f}s -> {candidate.median_seconds:.3f}s)\033[0m")
+            best_code, best = candidate_code, candidate
+
+        if best is baseline:
+            return script_content
+        print(f"\n\033[92m⚡ Optimized from {baseline.median_seconds:.3f}s to {best.median_seconds:.3f}s\033[0m")
+        return f"```python\n{best_code}\n```"
 
     def get_inspiration(self):
         category = input("Enter a category or general request for script ideas: ")
@@ -76,32 +298,95 @@ class Scriptomatic:
         
         return selected_idea.prompt
 
-    def _save_script(self, script_name: str, script_content: str) -> str:
+    def _lint_script(self, code: str, verify: Optional[Callable[[str], bool]] = None) -> str:
+        issues = lint_performance(code)
+        if not issues:
+            return code
+        print(f"\n\033[93mPerformance lint found {len(issues)} issue(s):\033[0m")
+        print(format_issues(issues))
+        if not self.lint_fix:
+            return code
+        try:
+            fixed_content = self.llm.fix_performance_issues(code, format_issues(issues))
+        except BudgetExceeded as e:
+            print(f"\033[93m{e} Saving the script without the fixes.\033[0m")
+            return code
+        fixed_code = clean_up_code(fixed_content) or fixed_content
+        try:
+            tree = ast.parse(fixed_code)
+            compile(tree, "<fixed script>", "exec")
+        except SyntaxError as e:
+            print(f"\033[91mThe rewrite doesn't compile ({e}), keeping the original.\033[0m")
+            return code
+        if not _has_code(tree):
+            print(f"\033[91mThe rewrite came back empty, keeping the original.\033[0m")
+            return code
+        remaining = lint_performance(fixed_code)
+        if len(remaining) >= len(issues):
+            print(f"\033[93mThe rewrite didn't fix anything, keeping the original.\033[0m")
+            return code
+        # A script that already passed its run is only swapped for a rewrite that passes it too
+        if verify:
+            print(f"\n\033[94mChecking the rewrite still passes...\033[0m")
+            if not verify(fixed_code):
+                print(f"\033[91mThe rewrite doesn't pass, keeping the original.\033[0m")
+                return code
+        print(f"\033[92mFixed {len(issues) - len(remaining)} of {len(issues)} performance issue(s).\033[0m")
+        return fixed_code
+
+    def _save_script(self, script_name: str, script_content: str, verify: Optional[Callable[[str], bool]] = None) -> str:
         script_name = f"{script_name}.py" if not script_name.endswith('.py') else script_name
+        code = self._lint_script(clean_up_code(script_content) or script_content, verify)
         with open(script_name, "w") as f:
-            f.write(clean_up_code(script_content))
+            f.write(code)
         print(f"\n🏁 Script generated and saved as {script_name}")
         return script_name
     def run_and_evaluate_script(self, script_name, script_content, description, parameters, outputs):
-        run_command, pip_packages = self.llm.get_run_command(script_name, script_content)
-        
-        # Install required packages
-        if pip_packages:
-            print(f"\n\033[94mInstalling required packages:\n\033[0m")
-            print(f"\033[1;94m{', '.join(pip_packages)}\n\033[0m")
-            success, error_message = self.install_packages(pip_packages)
-            if not success:
-                print(f"\033[91mFailed to install packages. Error: {error_message}\033[0m")
-                return False
-        else:
-            print(f"\n\033[94mNo additional packages required.\033[0m")
-
+        # Cleared first, so a run that stops before the script starts doesn't inherit the last attempt's exit code
+        self.last_returncode = None
+        run_command, pip_install_command = self.llm.get_run_command(script_name, script_content)
+        pip_packages = parse_pip_command(pip_install_command)
+        code = clean_up_code(script_content) or script_content
         # Modify run_command to use the current Python interpreter
         run_command = re.sub(r'^(python3?|python)', sys.executable, run_command)
-        # Run the script
-        print(f"\n\033[94mRunning {script_name}, with command: \033[0m")
-        print(f"\n\033[94m{run_command} \033[0m")
-        result = subprocess.run(run_command, shell=True, capture_output=True, text=True)
+
+        # The same script, command and packages have already been run, reuse that result instead
+        cache_key = run_key(code, run_command, pip_packages) if self.cache else None
+        cached = self.cache.get(cache_key) if self.cache else None
+        if cached:
+            print(f"\n\033[94mThis exact script has already been run, using the cached result.\033[0m")
+            result = subprocess.CompletedProcess(run_command, cached.returncode, cached.stdout, cached.stderr)
+            output_files = cached.output_files
+        else:
+            # Install required packages
+            pip_packages = self._packages_to_install(pip_packages)
+            if pip_packages:
+                print(f"\n\033[94mInstalling required packages:\n\033[0m")
+                print(f"\033[1;94m{', '.join(pip_packages)}\n\033[0m")
+                success, error_message = self.install_packages(pip_packages)
+                if not success:
+                    print(f"\033[91mFailed to install packages. Error: {error_message}\033[0m")
+                    return False
+            else:
+                print(f"\n\033[94mNo additional packages required.\033[0m")
+
+            # Run the script in its own directory, so its output files can't clash with another run's
+            print(f"\n\033[94mRunning {script_name}, with command: \033[0m")
+            print(f"\n\033[94m{run_command} \033[0m")
+            # A run can't outlast the time budget
+            timeout = self.budget.remaining_seconds()
+            with RunWorkspace(script_name, code, self.tmpfs, self.keep_outputs) as workspace:
+                try:
+                    if self.runner:
+                        result = self.runner.run(run_command, cwd=workspace.path, timeout=timeout)
+                    else:
+                        # No terminal input, same as the warm runner's children
+                        result = subprocess.run(run_command, shell=True, capture_output=True, text=True, cwd=workspace.path, timeout=timeout, stdin=subprocess.DEVNULL)
+                except subprocess.TimeoutExpired:
+                    raise BudgetExceeded(f"Time budget of {self.budget.max_seconds:g}s ran out while the script was running.")
+                output_files = workspace.collect_outputs()
+            cached = CachedRun(stdout=result.stdout, stderr=result.stderr, returncode=result.returncode, output_files=output_files)
+        self.last_returncode = result.returncode
         
         if result.stderr or result.stdout:
             print(f"\n\033[94mScript output:\033[0m")
@@ -111,8 +396,19 @@ class Scriptomatic:
             if result.stderr:
                 print(f"\n\033[91mStderr:\033[0m")
                 print(f"\n\033[91m{result.stderr}\033[0m")
-        # Evaluate the result
-        success = self.evaluate_script_output(result.stdout, result.stderr, description, parameters, outputs)
+        if output_files:
+            print(f"\n\033[94mFiles created:\033[0m")
+            print(describe_outputs(output_files))
+        # Evaluate the result, unless this run was already judged against the same description
+        criteria_key = evaluation_key(description, parameters, outputs)
+        if criteria_key in cached.evaluations:
+            success = cached.evaluations[criteria_key]
+            print(f"\n\033[94mCached evaluation result: {'Success' if success else 'Failure'}\033[0m")
+        else:
+            success = self.evaluate_script_output(result.stdout, result.stderr, description, parameters, outputs, output_files)
+            cached.evaluations[criteria_key] = success
+        if self.cache:
+            self.cache.put(cache_key, cached)
         
         if success:
             print(f"\033[92m\n\n\n🎉 Script ran successfully!\033[0m")
@@ -123,6 +419,52 @@ class Scriptomatic:
         
         return success
     
+    def run_and_test_script(self, script_name, script_content, description, parameters, outputs, cases=None):
+        self.last_returncode = None
+        _, pip_install_command = self.llm.get_run_command(script_name, script_content)
+        code = clean_up_code(script_content) or script_content
+        # The cases are written against this version of the script, its arguments may have changed since the last one
+        if cases is None:
+            cases = self.llm.generate_test_cases(script_content, description, parameters, outputs)
+        if not cases:
+            print(f"\n\033[93mNo test cases were written, evaluating a single run instead.\033[0m")
+            return self.run_and_evaluate_script(script_name, script_content, description, parameters, outputs)
+
+        pip_packages = self._packages_to_install(parse_pip_command(pip_install_command))
+        if pip_packages:
+            print(f"\n\033[94mInstalling required packages:\n\033[0m")
+            print(f"\033[1;94m{', '.join(pip_packages)}\n\033[0m")
+            success, error_message = self.install_packages(pip_packages)
+            if not success:
+                print(f"\033[91mFailed to install packages. Error: {error_message}\033[0m")
+                return False
+
+        remaining = self.budget.remaining_seconds()
+        timeout = DEFAULT_TEST_TIMEOUT if remaining is None else max(1.0, min(DEFAULT_TEST_TIMEOUT, remaining))
+        print(f"\n\033[94mRunning {len(cases)} test cases against {script_name}...\033[0m\n")
+        results = run_test_suite(script_name, code, cases, timeout=timeout, tmpfs=self.tmpfs)
+        print(format_test_results(results))
+        passed = sum(result.passed for result in results)
+        # A script that passes some of its tests is a better fallback than one that passes none
+        self.last_returncode = 0 if passed else 1
+        self.test_cases = cases
+
+        if passed == len(results):
+            print(f"\033[92m\n\n\n🎉 All {passed} tests passed!\033[0m")
+            return True
+        print(f"\033[91m❌ {len(results) - passed} of {len(results)} tests failed.\033[0m")
+        return False
+
+    def _save_tests(self, script_name: str) -> str:
+        test_name = f"test_{script_name}"
+        with open(test_name, "w") as f:
+            f.write(render_pytest_suite(script_name, self.test_cases))
+        print(f"🧪 Tests saved as {test_name}, run them with: pytest {test_name}")
+        return test_name
+
+    def evaluate_script_output(self, stdout, stderr, description, parameters, outputs, output_files=None):
+        return self.llm.evaluate_script_output(stdout, stderr, description, parameters, outputs, output_files)
+
     def install_packages(self, packages):
         if not packages:
             print("\033[94mNo additional packages required.\033[0m")
@@ -135,7 +477,8 @@ class Scriptomatic:
                 
                 # First, ensure pip is installed
                 ensurepip_command = f"{sys.executable} -m ensurepip --upgrade"
-                ensurepip_result = subprocess.run(ensurepip_command, shell=True, check=True, capture_output=True, text=True)
+                # Installs count against the time budget like everything else
+                ensurepip_result = subprocess.run(ensurepip_command, shell=True, check=True, capture_output=True, text=True, timeout=self.budget.remaining_seconds())
                 if ensurepip_result.returncode != 0:            
                     print(f"\033[91mFailed to ensure pip is installed. Error: {ensurepip_result.stderr}\033[0m")
                     print(f"\033[91mLets try to pip install anyway I guess? idk 🤷🏻\033[0m")
@@ -144,11 +487,16 @@ class Scriptomatic:
                 # pip_install_command = f"{sys.executable} -m pip install --upgrade pip && {sys.executable} -m pip install {' '.join(packages)}"
 
                 
-                subprocess.run(pip_install_command, shell=True, check=True, capture_output=True, text=True)
+                subprocess.run(pip_install_command, shell=True, check=True, capture_output=True, text=True, timeout=self.budget.remaining_seconds())
                 print("\033[92mPackages installed successfully.\033[0m")
                 return True, ""
+            except subprocess.TimeoutExpired:
+                raise BudgetExceeded(f"Time budget of {self.budget.max_seconds:g}s ran out while installing {', '.join(packages)}.")
             except Exception as e:
                 error_message = f"Error: {str(e)}"
+                if isinstance(e, subprocess.CalledProcessError) and e.stderr:
+                    # pip explains what went wrong on stderr, which is what the error analysis needs
+                    error_message += f"\n{e.stderr}"
                 print(f"\033[93mAttempt {attempt + 1} failed. {error_message}\033[0m")
                 
                 fixed_packages = self.llm.analyze_pip_error(packages, error_message)
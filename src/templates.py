@@ -0,0 +1,128 @@
+import ast
+from typing import List, Optional
+from pydantic import BaseModel
+
+# The argparse types the model can pick from, "bool" becomes a store_true flag
+ARGUMENT_TYPES = ("str", "int", "float", "bool")
+
+
+class TemplateArgument(BaseModel):
+    flags: List[str]
+    type: str
+    default: str
+    required: bool
+    choices: List[str]
+    help: str
+
+
+class ScriptTemplateParts(BaseModel):
+    imports: List[str]
+    usage: str
+    arguments: List[TemplateArgument]
+    functions: str
+
+
+# Everything the model doesn't have to write, {placeholders} are filled in by render_script
+SCRIPT_SKELETON = '''import argparse
+import sys
+{imports}
+{functions}
+def parse_args():
+    # Command-line arguments, with a how-to section in the help text
+    parser = argparse.ArgumentParser(
+        description={description},
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+{arguments}
+    return parser.parse_args()
+def main():
+    args = parse_args()
+    try:
+        run(args)
+    except KeyboardInterrupt:
+        # Exit quietly on Ctrl+C
+        print("\\nInterrupted.")
+        sys.exit(130)
+    except Exception as e:
+        # Report any unexpected error without a traceback
+        print(f"Error: {{e}}", file=sys.stderr)
+        sys.exit(1)
+if __name__ == "__main__":
+    main()'''
+
+# What the model is told about the skeleton, so it only writes the parts that differ between scripts
+TEMPLATE_INSTRUCTIONS = """The script is assembled from a fixed skeleton. The skeleton already contains `import argparse` and `import sys`, builds the argparse parser from your argument specs, calls `run(args)` with the parsed arguments, and catches and reports any exception run raises. Do NOT write any of that yourself. Only provide:
+
+- imports: every other import line the script needs, e.g. "import random" or "from pathlib import Path".
+- usage: a short description of the script followed by a how-to section with example commands. It is shown by --help.
+- arguments: the command-line arguments. flags is ["--name", "-n"] for options or ["name"] for positionals. type is one of str, int, float or bool (bool makes an on/off flag). default is a Python literal like 10, 'blue' or None. choices is a list of allowed values, or empty for any value.
+- functions: the rest of the script's code. It must define `def run(args):`, which does the script's work using the parsed arguments (args.name for --name). Put comments on every step. No argparse and no `if __name__ == "__main__"` block."""
+
+
+def _literal(text: str, type_name: str) -> str:
+    # The model's default/choice as Python source of the argument's type. Raises ValueError if it isn't one
+    try:
+        value = ast.literal_eval(text)
+    except (ValueError, SyntaxError):
+        value = text
+    if type_name == "int":
+        return repr(int(str(value)))
+    if type_name == "float":
+        return repr(float(str(value)))
+    # Strings stay strings, so choices=["1", "2"] don't turn into numbers the parsed str never equals
+    return repr(value if isinstance(value, str) else text)
+
+
+def _render_argument(argument: TemplateArgument) -> str:
+    options = [repr(flag) for flag in argument.flags]
+    positional = not argument.flags[0].startswith("-")
+    # Types the skeleton doesn't know are read as plain strings, the way argparse would without a type
+    type_name = argument.type if argument.type in ARGUMENT_TYPES else "str"
+    if type_name == "bool" and not positional:
+        options.append('action="store_true"')
+    else:
+        if type_name != "bool":
+            options.append(f"type={type_name}")
+        if argument.choices:
+            options.append(f"choices=[{', '.join(_literal(choice, type_name) for choice in argument.choices)}]")
+        if argument.required and not positional:
+            options.append("required=True")
+        elif argument.default.strip() and argument.default.strip() != "None":
+            if positional:
+                options.append('nargs="?"')
+            options.append(f"default={_literal(argument.default.strip(), type_name)}")
+    options.append(f"help={argument.help!r}")
+    return f"    parser.add_argument({', '.join(options)})"
+
+
+def _defines_run(functions: str) -> bool:
+    try:
+        tree = ast.parse(functions)
+    except SyntaxError:
+        return False
+    return any(isinstance(node, ast.FunctionDef) and node.name == "run" for node in tree.body)
+
+
+def render_script(parts: ScriptTemplateParts) -> Optional[str]:
+    # The finished script in a markdown code block, like generate_script_content returns. None if the parts don't fit
+    if not _defines_run(parts.functions) or any(not argument.flags for argument in parts.arguments):
+        return None
+    imports = [line.strip() for line in parts.imports if line.strip() and line.strip() not in ("import argparse", "import sys")]
+    try:
+        arguments = [_render_argument(argument) for argument in parts.arguments]
+    except ValueError:
+        # A default or choice that doesn't fit its argument's type
+        return None
+    code = SCRIPT_SKELETON.format(
+        imports="\n".join(imports),
+        functions=parts.functions.strip("\n"),
+        description=repr(parts.usage),
+        arguments="\n".join(arguments),
+    )
+    # Drop blank lines, like clean_up_code does for generated scripts
+    code = "\n".join(line for line in code.split("\n") if line.strip())
+    try:
+        compile(code, "<template>", "exec")
+    except SyntaxError:
+        return None
+    return f"```python\n{code}\n```"
@@ -0,0 +1,69 @@
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import List, Optional
+from pydantic import BaseModel
+
+# RAM-backed temp directory, used when runs ask for tmpfs and the platform has one
+TMPFS_DIR = "/dev/shm"
+
+
+class OutputFile(BaseModel):
+    path: str
+    size: int
+    sha256: str
+
+
+class RunWorkspace:
+    # A throwaway directory holding one copy of the script, so runs never see each other's output files
+    def __init__(self, script_name: str, script_content: str, tmpfs: bool = False, keep_outputs: Optional[str] = None):
+        self.script_name = script_name if script_name.endswith(".py") else f"{script_name}.py"
+        self.script_content = script_content
+        self.tmpfs = tmpfs
+        self.keep_outputs = keep_outputs
+        self.path = None
+
+    def __enter__(self):
+        base_dir = TMPFS_DIR if self.tmpfs and os.path.isdir(TMPFS_DIR) else None
+        self.path = tempfile.mkdtemp(prefix="scriptomatic-run-", dir=base_dir)
+        Path(self.path, self.script_name).write_text(self.script_content)
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self.keep_outputs:
+            self._copy_outputs()
+        shutil.rmtree(self.path, ignore_errors=True)
+        return False
+
+    def _output_paths(self) -> List[Path]:
+        paths = []
+        for root, dirs, files in os.walk(self.path):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            for name in sorted(files):
+                path = Path(root, name)
+                if path.relative_to(self.path).as_posix() != self.script_name:
+                    paths.append(path)
+        return paths
+
+    def collect_outputs(self) -> List[OutputFile]:
+        outputs = []
+        for path in self._output_paths():
+            with open(path, "rb") as f:
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
+            outputs.append(OutputFile(path=path.relative_to(self.path).as_posix(), size=path.stat().st_size, sha256=digest))
+        return outputs
+
+    def _copy_outputs(self):
+        destination = Path(self.keep_outputs)
+        for path in self._output_paths():
+            target = destination / path.relative_to(self.path)
+            target.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(path, target)
+
+
+def describe_outputs(output_files: List[OutputFile]) -> str:
+    if not output_files:
+        return "No files were created."
+    return "\n".join(f"{output.path} ({output.size} bytes, sha256 {output.sha256[:12]})" for output in output_files)
@@ -0,0 +1,35 @@
+import math
+
+import numpy as np
+
+from abstract_art_generator import SEED_CELL, generate_color_palette, render_bands, tile_rows
+
+
+def make_settings(width, height, seed=7, shape_count=800):
+    cells = math.ceil(width / SEED_CELL) * math.ceil(height / SEED_CELL)
+    return {
+        'width': width,
+        'height': height,
+        'seed': seed,
+        'shapes': ['circle', 'square', 'triangle'],
+        'palette': generate_color_palette('vibrant'),
+        'shapes_per_cell': shape_count / cells,
+        'shape_size': (10, 100),
+    }
+
+
+def render(settings, tile_size, workers):
+    return np.vstack(list(render_bands(settings, tile_rows(settings['width'], settings['height'], tile_size), workers)))
+
+
+def test_artwork_is_the_same_at_any_tile_size():
+    settings = make_settings(1500, 900)
+    whole = render(settings, 4096, 1)
+    tiled = render(settings, 97, 1)
+    assert whole.shape == (900, 1500, 3)
+    assert np.array_equal(whole, tiled)
+
+
+def test_artwork_is_the_same_with_several_workers():
+    settings = make_settings(600, 400, seed=3)
+    assert np.array_equal(render(settings, 128, 1), render(settings, 61, 2))
@@ -0,0 +1,72 @@
+import pytest
+from unittest.mock import patch
+from src.budget import Budget, BudgetExceeded, token_cost
+from src.scriptomatic import Scriptomatic
+
+
+def test_unlimited_budget_never_runs_out():
+    budget = Budget()
+    budget.record_usage("gpt-4o", 10**6, 10**6)
+    for _ in range(100):
+        budget.start_iteration()
+    assert budget.exceeded() is None
+    assert budget.remaining_seconds() is None
+
+
+def test_iteration_limit():
+    budget = Budget(max_iterations=2)
+    budget.start_iteration()
+    budget.start_iteration()
+    with pytest.raises(BudgetExceeded, match="2 attempt"):
+        budget.start_iteration()
+
+
+def test_token_and_cost_limits():
+    budget = Budget(max_tokens=1000)
+    budget.record_usage("gpt-4o", 600, 300)
+    budget.check()
+    budget.record_usage("gpt-4o", 100, 0)
+    with pytest.raises(BudgetExceeded, match="Token budget"):
+        budget.check()
+
+    budget = Budget(max_cost=0.01)
+    budget.record_usage("gpt-4o-mini", 10000, 1000)
+    budget.check()
+    budget.record_usage("gpt-4o", 1000, 1000)
+    with pytest.raises(BudgetExceeded, match="Cost budget"):
+        budget.check()
+
+
+def test_unknown_models_are_priced_like_the_default():
+    assert token_cost("some-new-model", 1000, 1000) == token_cost("gpt-4o-2024-08-06", 1000, 1000)
+
+
+def test_time_limit():
+    budget = Budget(max_seconds=10)
+    assert 9 < budget.remaining_seconds() <= 10
+    budget.started -= 11
+    assert budget.remaining_seconds() == 0
+    with pytest.raises(BudgetExceeded, match="Time budget"):
+        budget.check()
+
+
+@patch('src.scriptomatic.LLMProvider')
+def test_autoloop_stops_at_the_budget_and_keeps_the_best_attempt(mock_llm):
+    scriptomatic = Scriptomatic(cache=False, max_iterations=3)
+    mock_llm.return_value.update_description.return_value = "better description"
+    mock_llm.return_value.generate_script_content.side_effect = ["second", "third"]
+    # The first attempt runs cleanly but misses the brief, the other two crash
+    returncodes = iter([0, 1, 1])
+
+    def run_and_evaluate(script_name, script_content, description, parameters, outputs):
+        scriptomatic.last_returncode = next(returncodes)
+        return False
+
+    scriptomatic.run_and_evaluate_script = run_and_evaluate
+    scriptomatic.budget = Budget(**scriptomatic.budget_limits)
+
+    result = scriptomatic._iterate_script("test_script", "first", "description", [], [], autoloop=True)
+
+    assert result == "first"
+    assert scriptomatic.budget.iterations == 3
+    assert mock_llm.return_value.generate_script_content.call_count == 2
@@ -0,0 +1,77 @@
+from src.cache import CachedRun, ResultCache, evaluation_key, run_key
+from src.workspace import OutputFile
+
+
+def make_run():
+    return CachedRun(
+        stdout="done\n",
+        stderr="",
+        returncode=0,
+        output_files=[OutputFile(path="out.txt", size=2, sha256="ab" * 32)],
+        evaluations={evaluation_key("description", ["param"], ["output"]): True},
+    )
+
+
+def test_run_key_depends_on_script_command_and_packages():
+    key = run_key("print(1)", "python a.py", ["numpy", "pandas"])
+
+    assert key == run_key("print(1)", "python a.py", ["pandas", "numpy"])
+    assert key != run_key("print(2)", "python a.py", ["numpy", "pandas"])
+    assert key != run_key("print(1)", "python a.py --fast", ["numpy", "pandas"])
+    assert key != run_key("print(1)", "python a.py", ["numpy"])
+
+
+def test_evaluation_key_depends_on_criteria():
+    assert evaluation_key("a", ["p"], ["o"]) == evaluation_key("a", ["p"], ["o"])
+    assert evaluation_key("a", ["p"], ["o"]) != evaluation_key("b", ["p"], ["o"])
+
+
+def test_memory_only_cache():
+    cache = ResultCache(directory=None)
+    assert cache.get("missing") is None
+
+    cache.put("key", make_run())
+
+    assert cache.get("key") == make_run()
+
+
+def test_disk_cache_survives_new_instances(tmp_path):
+    ResultCache(tmp_path).put("key", make_run())
+
+    assert ResultCache(tmp_path).get("key") == make_run()
+    assert list(tmp_path.glob("*.tmp")) == []
+
+
+def test_failed_runs_are_only_cached_for_the_session(tmp_path):
+    cache = ResultCache(tmp_path)
+    failed = make_run().model_copy(update={"returncode": 1})
+    cache.put("key", failed)
+
+    assert cache.get("key") == failed
+    assert ResultCache(tmp_path).get("key") is None
+
+
+def test_failed_evaluations_are_only_cached_for_the_session(tmp_path):
+    cache = ResultCache(tmp_path)
+    run = make_run()
+    rejected = evaluation_key("another description", [], [])
+    run.evaluations[rejected] = False
+    cache.put("key", run)
+
+    assert cache.get("key").evaluations[rejected] is False
+    assert ResultCache(tmp_path).get("key") == make_run()
+
+
+def test_corrupt_entries_are_ignored(tmp_path):
+    (tmp_path / "key.json").write_text("{not json")
+
+    assert ResultCache(tmp_path).get("key") is None
+
+
+def test_clear(tmp_path):
+    cache = ResultCache(tmp_path)
+    cache.put("key", make_run())
+
+    cache.clear()
+
+    assert cache.get("key") is None
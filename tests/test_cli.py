@@ -2,8 +2,20 @@ import pytest
 from unittest.mock import patch, MagicMock
 from src.cli import cli
 from src.scriptomatic import Scriptomatic
+from src.lib import DEFAULT_OPENAI_MODEL, DEFAULT_PRELOAD_MODULES
 
 MODEL = "gpt-4o-mini"
+
+def make_args(**overrides):
+    args = dict(prompt="Test prompt", loop=False, inspo=False, autoloop=False, model=MODEL, temperature=0.2, warm=False, preload=None, tmpfs=False, keep_outputs=None, no_cache=False, optimize=False, workload=None, lint_fix=False, max_iterations=None, max_seconds=None, max_tokens=None, max_cost=None, no_examples=False, template=False, no_prefetch=False, test_suite=False)
+    args.update(overrides)
+    return MagicMock(**args)
+
+def scriptomatic_kwargs(**overrides):
+    kwargs = dict(model=MODEL, temperature=0.2, preload=None, tmpfs=False, keep_outputs=None, cache=True, lint_fix=False, max_iterations=None, max_seconds=None, max_tokens=None, max_cost=None, examples=True, template=False, prefetch=True, test_suite=False)
+    kwargs.update(overrides)
+    return kwargs
+
 @pytest.fixture
 def mock_scriptomatic():
     with patch('src.cli.Scriptomatic') as mock:
@@ -15,41 +27,86 @@ def mock_argparse():
         yield mock
 
 def test_cli_with_prompt(mock_scriptomatic, mock_argparse):
-    mock_args = MagicMock(prompt="Test prompt", loop=False, inspo=False, autoloop=False, model=MODEL, temperature=0.2)
+    mock_args = make_args()
     mock_argparse.return_value.parse_args.return_value = mock_args
 
     cli()
 
-    mock_scriptomatic.assert_called_once_with(model=MODEL, temperature=0.2)
-    mock_scriptomatic.return_value.generate_script.assert_called_once_with("Test prompt", loop=False, autoloop=False)
+    mock_scriptomatic.assert_called_once_with(**scriptomatic_kwargs())
+    mock_scriptomatic.return_value.generate_script.assert_called_once_with("Test prompt", loop=False, autoloop=False, optimize=False, workload=None)
 
 def test_cli_with_inspo(mock_scriptomatic, mock_argparse):
-    mock_args = MagicMock(prompt=None, loop=False, inspo=True, autoloop=False, model=MODEL, temperature=0.2)
+    mock_args = make_args(prompt=None, inspo=True)
     mock_argparse.return_value.parse_args.return_value = mock_args
     mock_scriptomatic.return_value.get_inspiration.return_value = "Inspired prompt"
 
     cli()
 
-    mock_scriptomatic.assert_called_once_with(model=MODEL, temperature=0.2)
+    mock_scriptomatic.assert_called_once_with(**scriptomatic_kwargs())
     mock_scriptomatic.return_value.get_inspiration.assert_called_once()
-    mock_scriptomatic.return_value.generate_script.assert_called_once_with("Inspired prompt", loop=False, autoloop=False)
+    mock_scriptomatic.return_value.generate_script.assert_called_once_with("Inspired prompt", loop=False, autoloop=False, optimize=False, workload=None)
 
 def test_cli_with_loop(mock_scriptomatic, mock_argparse):
-    mock_args = MagicMock(prompt="Test prompt", loop=True, inspo=False, autoloop=False, model=MODEL, temperature=0.2)
+    mock_args = make_args(loop=True)
     mock_argparse.return_value.parse_args.return_value = mock_args
 
     cli()
 
-    mock_scriptomatic.assert_called_once_with(model=MODEL, temperature=0.2)
-    mock_scriptomatic.return_value.generate_script.assert_called_once_with("Test prompt", loop=True, autoloop=False)
+    mock_scriptomatic.assert_called_once_with(**scriptomatic_kwargs())
+    mock_scriptomatic.return_value.generate_script.assert_called_once_with("Test prompt", loop=True, autoloop=False, optimize=False, workload=None)
 
 
 def test_cli_without_prompt_or_inspo(mock_scriptomatic, mock_argparse, capsys):
-    mock_args = MagicMock(prompt=None, loop=False, inspo=False, autoloop=False, model=MODEL, temperature=0.2)
+    mock_args = make_args(prompt=None)
     mock_argparse.return_value.parse_args.return_value = mock_args
 
     cli()
 
     captured = capsys.readouterr()
     assert "Please provide a prompt or use --inspo for inspiration mode." in captured.out
-    mock_scriptomatic.return_value.generate_script.assert_not_called()
\ No newline at end of file
+    mock_scriptomatic.return_value.generate_script.assert_not_called()
+
+def test_cli_with_warm_runner(mock_scriptomatic, mock_argparse):
+    mock_argparse.return_value.parse_args.return_value = make_args(warm=True)
+
+    cli()
+
+    mock_scriptomatic.assert_called_once_with(**scriptomatic_kwargs(preload=DEFAULT_PRELOAD_MODULES))
+
+    mock_scriptomatic.reset_mock()
+    mock_argparse.return_value.parse_args.return_value = make_args(preload=["numpy"])
+
+    cli()
+
+    mock_scriptomatic.assert_called_once_with(**scriptomatic_kwargs(preload=["numpy"]))
+
+    mock_scriptomatic.reset_mock()
+    mock_argparse.return_value.parse_args.return_value = make_args(preload=["PIL.Image, numpy", "pandas"])
+
+    cli()
+
+    mock_scriptomatic.assert_called_once_with(**scriptomatic_kwargs(preload=["PIL.Image", "numpy", "pandas"]))
+
+
+def test_cli_preload_leaves_the_prompt_alone(mock_scriptomatic):
+    with patch('sys.argv', ["scriptomatic", "--preload", "PIL.Image,numpy", "Resize every image in a folder"]):
+        cli()
+
+    mock_scriptomatic.assert_called_once_with(**scriptomatic_kwargs(model=DEFAULT_OPENAI_MODEL, preload=["PIL.Image", "numpy"]))
+    mock_scriptomatic.return_value.generate_script.assert_called_once_with("Resize every image in a folder", loop=False, autoloop=False, optimize=False, workload=None)
+
+
+def test_cli_with_optimize(mock_scriptomatic, mock_argparse):
+    mock_argparse.return_value.parse_args.return_value = make_args(optimize=True, workload="python test_script.py --size 1000")
+
+    cli()
+
+    mock_scriptomatic.return_value.generate_script.assert_called_once_with("Test prompt", loop=False, autoloop=False, optimize=True, workload="python test_script.py --size 1000")
+
+def test_cli_with_budget(mock_scriptomatic, mock_argparse):
+    mock_argparse.return_value.parse_args.return_value = make_args(autoloop=True, max_iterations=5, max_seconds=300.0, max_tokens=50000, max_cost=0.5)
+
+    cli()
+
+    mock_scriptomatic.assert_called_once_with(**scriptomatic_kwargs(max_iterations=5, max_seconds=300.0, max_tokens=50000, max_cost=0.5))
+    mock_scriptomatic.return_value.generate_script.assert_called_once_with("Test prompt", loop=False, autoloop=True, optimize=False, workload=None)
@@ -0,0 +1,45 @@
+import openai
+import pytest
+from src import clients
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    clients.configure_http_pool()
+    yield
+    clients.configure_http_pool()
+
+
+def test_http_client_is_shared():
+    assert clients.get_http_client() is clients.get_http_client()
+    # The openai module-level client that dspy uses goes through the same pool
+    assert openai.http_client is clients.get_http_client()
+
+
+def test_openai_client_is_shared_and_uses_the_pool(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    client = clients.get_openai_client()
+    assert client is clients.get_openai_client()
+    assert client._client is clients.get_http_client()
+
+
+def test_configure_http_pool_rebuilds_clients(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    http_client = clients.get_http_client()
+    openai_client = clients.get_openai_client()
+    settings = dict(clients.POOL_SETTINGS)
+    try:
+        clients.configure_http_pool(max_connections=5)
+        assert clients.get_http_client() is not http_client
+        assert clients.get_openai_client() is not openai_client
+        assert openai.http_client is clients.get_http_client()
+        # Providers created before the change keep a working client on the old pool
+        assert not http_client.is_closed
+        assert openai_client._client is http_client
+    finally:
+        clients.POOL_SETTINGS.update(settings)
+
+
+def test_configure_http_pool_rejects_unknown_settings():
+    with pytest.raises(ValueError):
+        clients.configure_http_pool(pool_size=5)
@@ -0,0 +1,61 @@
+import pytest
+from src import dependencies
+from src.dependencies import classify_pip_error, find_imports, parse_pip_command, resolve_distributions, update_import_map
+
+SCRIPT = """
+import os
+import argparse
+import numpy as np
+from PIL import Image, ImageDraw
+import cv2
+from sklearn.linear_model import LinearRegression
+from . import helpers
+from __future__ import annotations
+import my_script
+"""
+
+
+@pytest.fixture(autouse=True)
+def user_import_map(tmp_path, monkeypatch):
+    monkeypatch.setattr(dependencies, "USER_IMPORT_MAP", tmp_path / "import_map.json")
+    dependencies.load_import_map.cache_clear()
+    yield
+    dependencies.load_import_map.cache_clear()
+
+
+def test_find_imports_top_level_modules_in_order():
+    assert find_imports(SCRIPT) == ["os", "argparse", "numpy", "PIL", "cv2", "sklearn", "my_script"]
+
+
+def test_resolve_distributions_skips_stdlib_and_the_script_itself():
+    assert resolve_distributions(SCRIPT, "my_script.py") == ["numpy", "pillow", "opencv-python", "scikit-learn"]
+
+
+def test_resolve_distributions_unparsable_script():
+    assert resolve_distributions("import (", "broken.py") is None
+
+
+def test_update_import_map_overrides_bundled_entries():
+    update_import_map({"cv2": "opencv-python-headless", "yfin": "yfinance"})
+
+    assert resolve_distributions("import cv2\nimport yfin\n") == ["opencv-python-headless", "yfinance"]
+
+
+def test_parse_pip_command():
+    assert parse_pip_command("pip install --upgrade numpy pandas") == ["numpy", "pandas"]
+    assert parse_pip_command(["numpy"]) == ["numpy"]
+    assert parse_pip_command("") == []
+
+
+def test_classify_pip_error_maps_import_names_and_drops_stdlib():
+    error_output = """
+ERROR: Could not find a version that satisfies the requirement PIL (from versions: none)
+ERROR: No matching distribution found for PIL
+ERROR: No matching distribution found for json
+"""
+    assert classify_pip_error(["numpy", "PIL", "json"], error_output) == ["numpy", "pillow"]
+
+
+def test_classify_pip_error_unknown_failures_are_left_to_the_llm():
+    assert classify_pip_error(["nonexistent-pkg"], "ERROR: No matching distribution found for nonexistent-pkg") is None
+    assert classify_pip_error(["numpy"], "error: externally-managed-environment") is None
@@ -0,0 +1,76 @@
+from pathlib import Path
+from src.lint import format_issues, lint_performance
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def rules(code):
+    return [(issue.rule, issue.line) for issue in lint_performance(code)]
+
+
+def test_string_concatenation_in_loop():
+    issues = lint_performance((ROOT / "example-scripts" / "emoji_art_generator.py").read_text())
+
+    assert {issue.rule for issue in issues} == {"string-concat-in-loop"}
+    assert "emoji_art +=" in issues[0].message
+
+
+def test_string_concatenation_outside_loops_is_fine():
+    assert rules("text = ''\ntext += 'a'\ntotal = 0\nfor i in range(3):\n    total += i\n") == []
+
+
+def test_repeated_file_read():
+    issues = lint_performance((ROOT / "example-scripts" / "emoji_mood_art_generator.py").read_text())
+
+    assert ("repeated-file-read", 20) in [(issue.rule, issue.line) for issue in issues]
+    assert "custom_emojis.json" in format_issues(issues)
+
+
+def test_cached_file_reads_are_fine():
+    code = """
+from functools import lru_cache
+@lru_cache(maxsize=None)
+def load():
+    with open("data.json") as f:
+        return f.read()
+load()
+load()
+"""
+    assert rules(code) == []
+
+
+def test_io_in_loop():
+    code = """
+import requests
+def fetch(url):
+    return requests.get(url).json()
+for url in ["a", "b"]:
+    with open("log.txt", "a") as f:
+        f.write(url)
+    fetch(url)
+"""
+    assert rules(code) == [("io-in-loop", 6), ("io-in-loop", 8)]
+
+
+def test_list_membership_in_loop():
+    code = """
+seen = []
+for word in ["a", "b"]:
+    if word not in seen:
+        seen.append(word)
+    if word in ["x", "y"]:
+        pass
+allowed = set(seen)
+print([w for w in seen if w in allowed])
+"""
+    assert rules(code) == [("list-membership-in-loop", 4), ("list-membership-in-loop", 6)]
+
+
+def test_while_true_without_sleep():
+    assert rules("while True:\n    print('spin')\n") == [("while-true-without-sleep", 1)]
+    assert rules("import time\nwhile True:\n    time.sleep(1)\n") == []
+    assert rules("while True:\n    if input() == 'q':\n        break\n") == []
+
+
+def test_unparsable_code_has_no_issues():
+    assert lint_performance("def (") == []
@@ -17,20 +17,31 @@ def test_enhance_query(llm_provider):
     assert "count" in enhanced_query.lower()
     assert "words" in enhanced_query.lower()
 
-@patch('src.llm.OpenAI')
-def test_generate_structured_script_components(mock_openai, llm_provider):
-    # Mock the OpenAI client response
-    mock_message = Mock()
-    mock_message.parsed = ScriptParts(
-        steps=[Step(thought_process="Step 1", concise_step="Do something")],
-        description="A test script",
-        script_name="test_script",
-        outputs=["output1", "output2"],
-        parameters=["param1", "param2"]
-    )
-    mock_openai.return_value.beta.chat.completions.parse.return_value.choices = [Mock(message=mock_message)]
+def stream_chunks(content, refusal=None, size=7):
+    # The pieces a streamed completion arrives in, followed by the usage-only chunk
+    pieces = [content[i:i + size] for i in range(0, len(content), size)]
+    chunks = [Mock(usage=None, choices=[Mock(delta=Mock(content=piece, refusal=None))]) for piece in pieces]
+    if refusal:
+        chunks.append(Mock(usage=None, choices=[Mock(delta=Mock(content=None, refusal=refusal))]))
+    chunks.append(Mock(usage=Mock(prompt_tokens=10, completion_tokens=20), choices=[]))
+    return iter(chunks)
+
+SCRIPT_PARTS = ScriptParts(
+    steps=[Step(thought_process="Step 1", concise_step="Do something")],
+    description="A test script",
+    script_name="test_script",
+    outputs=["output1", "output2"],
+    parameters=["param1", "param2"]
+)
+
+@patch('src.llm.get_openai_client')
+def test_generate_structured_script_components(mock_get_openai_client):
+    llm_provider = LLMProvider()
+    # Mock the streamed OpenAI response
+    mock_get_openai_client.return_value.chat.completions.create.return_value = stream_chunks(SCRIPT_PARTS.model_dump_json())
+    components = []
 
-    result = llm_provider.generate_structured_script_components("Test query")
+    result = llm_provider.generate_structured_script_components("Test query", on_component=components.append)
     
     assert isinstance(result, tuple)
     assert len(result) == 4
@@ -38,6 +49,28 @@ def test_generate_structured_script_components(mock_openai, llm_provider):
     assert result[1] == ["param1", "param2"]
     assert result[2] == ["output1", "output2"]
     assert result[3] == "A test script"
+    assert mock_get_openai_client.return_value.chat.completions.create.call_args.kwargs["stream"] is True
+    # Each step and field was handed over on its own as the stream went by
+    assert [(component.key, component.index) for component in components][:2] == [("steps", 0), ("steps", None)]
+
+@patch('src.llm.get_openai_client')
+def test_generate_structured_script_components_without_streaming(mock_get_openai_client):
+    llm_provider = LLMProvider()
+    mock_get_openai_client.return_value.chat.completions.create.return_value = Mock(
+        choices=[Mock(message=Mock(content=SCRIPT_PARTS.model_dump_json(), refusal=None))], usage=None
+    )
+
+    result = llm_provider.generate_structured_script_components("Test query", stream=False)
+
+    assert result == ("test_script", ["param1", "param2"], ["output1", "output2"], "A test script")
+
+@patch('src.llm.get_openai_client')
+def test_generate_structured_script_components_refusal(mock_get_openai_client):
+    llm_provider = LLMProvider()
+    mock_get_openai_client.return_value.chat.completions.create.return_value = stream_chunks("", refusal="I can't help with that.")
+
+    with pytest.raises(ValueError, match="I can't help with that."):
+        llm_provider.generate_structured_script_components("Test query")
 
 def test_generate_script_ideas(llm_provider):
     # Test the generate_script_ideas method
@@ -52,10 +85,11 @@ def test_generate_script_ideas(llm_provider):
         assert idea.description
         assert idea.prompt
 
-@patch('src.llm.OpenAI')
-def test_generate_script_content(mock_openai, llm_provider):
+@patch('src.llm.get_openai_client')
+def test_generate_script_content(mock_get_openai_client):
+    llm_provider = LLMProvider()
     # Mock the OpenAI client response
-    mock_openai.return_value.chat.completions.create.return_value.choices = [
+    mock_get_openai_client.return_value.chat.completions.create.return_value.choices = [
         Mock(message=Mock(content="```python\n# Test script content\n```"))
     ]
 
@@ -0,0 +1,61 @@
+import json
+import random
+from src.partial_json import StreamingObjectParser
+
+DOCUMENT = {
+    "steps": [
+        {"thought_process": "Parse {args} and \"quotes\"", "concise_step": "Use argparse, [carefully]"},
+        {"thought_process": "Nested", "concise_step": "Loop", "extra": [1, {"a": [2, 3]}]},
+    ],
+    "description": "Counts words, even ones like \\u00e9t\u00e9",
+    "script_name": "word_counter",
+    "outputs": ["A count", "A chart"],
+    "parameters": [],
+    "retries": 3,
+    "enabled": True,
+    "limits": [1, 2.5, None],
+}
+
+
+def collect(chunks):
+    parser = StreamingObjectParser()
+    events = []
+    for chunk in chunks:
+        events.extend((event.key, event.index, event.value) for event in parser.feed(chunk))
+    return events
+
+
+def test_events_for_fields_and_array_elements():
+    events = collect([json.dumps(DOCUMENT, indent=2)])
+
+    assert events[:3] == [
+        ("steps", 0, DOCUMENT["steps"][0]),
+        ("steps", 1, DOCUMENT["steps"][1]),
+        ("steps", None, DOCUMENT["steps"]),
+    ]
+    assert ("description", None, DOCUMENT["description"]) in events
+    assert ("outputs", 1, "A chart") in events
+    assert ("parameters", None, []) in events
+    assert ("retries", None, 3) in events
+    assert ("enabled", None, True) in events
+    assert [value for key, index, value in events if key == "limits"] == [1, 2.5, None, [1, 2.5, None]]
+
+
+def test_events_arrive_as_soon_as_values_close():
+    text = json.dumps(DOCUMENT)
+    first_step_end = text.index("[carefully]\"}") + len("[carefully]\"}")
+    parser = StreamingObjectParser()
+
+    assert parser.feed(text[:first_step_end - 1]) == []
+    assert [event.index for event in parser.feed(text[first_step_end - 1:first_step_end])] == [0]
+
+
+def test_any_chunking_gives_the_same_events():
+    text = json.dumps(DOCUMENT)
+    expected = collect([text])
+    rng = random.Random(7)
+    for _ in range(20):
+        cuts = sorted(rng.sample(range(1, len(text)), 30))
+        chunks = [text[start:end] for start, end in zip([0] + cuts, cuts + [len(text)])]
+        assert collect(chunks) == expected
+    assert collect(list(text)) == expected
@@ -0,0 +1,89 @@
+import subprocess
+import threading
+import pytest
+from src.prefetch import DependencyPrefetcher, ImportSniffer, pip_install
+
+
+@pytest.fixture
+def known(monkeypatch):
+    # Made-up distributions that count as well known, so nothing real gets installed
+    monkeypatch.setattr("src.prefetch.KNOWN_DISTRIBUTIONS", frozenset({"no_such_module_a", "no_such_module_b", "no_such_module_c", "no_such_module_xyz"}))
+
+
+def test_sniffer_reports_each_module_once_as_lines_complete():
+    sniffer = ImportSniffer()
+    assert sniffer.feed("```python\nimport os, numpy as np\nfrom PIL imp") == ["os", "numpy"]
+    assert sniffer.feed("ort Image\n") == ["PIL"]
+    assert sniffer.feed("import numpy.linalg\nfrom . import helpers\nprint('import requests')\n") == []
+    assert sniffer.feed("    import yaml") == []
+    assert sniffer.feed("\n") == ["yaml"]
+
+
+def test_prefetcher_installs_missing_imports_in_the_background(known):
+    installed = []
+    release = threading.Event()
+
+    def install(packages):
+        release.wait(5)
+        installed.append(packages)
+        return True
+
+    prefetcher = DependencyPrefetcher(install=install)
+    # json is stdlib and pytest is already installed, neither needs installing
+    prefetcher.feed("import json\nimport pytest\nimport no_such_module_a\n")
+    prefetcher.feed("import no_such_module_b\nfrom no_such_module_c import thing\n")
+    release.set()
+    ready = prefetcher.wait(timeout=5)
+    prefetcher.close()
+
+    # Everything found while the first install was running goes in one more batch
+    assert len(installed) <= 2
+    assert sorted(sum(installed, [])) == ["no_such_module_a", "no_such_module_b", "no_such_module_c"]
+    assert {"pytest", "no_such_module_a", "no_such_module_b", "no_such_module_c"} <= ready
+
+
+def test_failed_installs_are_left_to_the_regular_install(known):
+    prefetcher = DependencyPrefetcher(install=lambda packages: False)
+    prefetcher.feed("import no_such_module_xyz\n")
+    ready = prefetcher.wait(timeout=5)
+    prefetcher.close()
+
+    assert "no_such_module_xyz" not in ready
+    assert prefetcher.failed == {"no_such_module_xyz"}
+
+
+def test_unknown_imports_are_left_to_the_regular_install(known):
+    installed = []
+    prefetcher = DependencyPrefetcher(install=lambda packages: installed.append(packages) or True)
+    # A typo, or a name that isn't on PyPI under that spelling
+    prefetcher.feed("import nmupy\nimport no_such_module_a\n")
+    prefetcher.wait(timeout=5)
+    prefetcher.close()
+
+    assert installed == [["no_such_module_a"]]
+
+
+def test_a_bad_name_doesnt_fail_the_rest_of_its_batch(known):
+    release = threading.Event()
+
+    def install(packages):
+        release.wait(5)
+        return "no_such_module_b" not in packages
+
+    prefetcher = DependencyPrefetcher(install=install)
+    prefetcher.feed("import no_such_module_a\n")
+    prefetcher.feed("import no_such_module_b\nimport no_such_module_c\n")
+    release.set()
+    ready = prefetcher.wait(timeout=5)
+    prefetcher.close()
+
+    assert {"no_such_module_a", "no_such_module_c"} <= ready
+    assert prefetcher.failed == {"no_such_module_b"}
+
+
+def test_pip_install_gives_up_at_its_timeout(monkeypatch):
+    def run(*args, **kwargs):
+        raise subprocess.TimeoutExpired(args[0], kwargs["timeout"])
+    monkeypatch.setattr("src.prefetch.subprocess.run", run)
+
+    assert pip_install(["slow-package"], timeout=0.1) is False
@@ -0,0 +1,69 @@
+from src.profiling import Measurement, format_profile_report, measure_script, same_behaviour, workload_command
+
+SLOW_SCRIPT = """
+import argparse
+def build(n):
+    text = ""
+    for i in range(n):
+        text += str(i)
+    return text
+parser = argparse.ArgumentParser()
+parser.add_argument("--n", type=int, default=1000)
+args = parser.parse_args()
+print(len(build(args.n)))
+"""
+
+
+def make_measurement(**overrides):
+    fields = dict(median_seconds=1.0, returncode=0, stdout="42\n", stderr="", output_hashes=["abc"], deterministic=True)
+    fields.update(overrides)
+    return Measurement(**fields)
+
+
+def test_measure_script_times_and_profiles():
+    measurement = measure_script("slow.py", SLOW_SCRIPT, "python slow.py --n 2000", repeats=2)
+
+    assert measurement.returncode == 0
+    assert measurement.stdout == "6890\n"
+    assert measurement.deterministic
+    assert measurement.median_seconds > 0
+    assert "build" in measurement.hotspots
+    assert "Median wall time" in format_profile_report(measurement)
+
+
+def test_measure_script_needs_a_plain_python_command():
+    assert measure_script("slow.py", SLOW_SCRIPT, "python slow.py | head") is None
+
+
+def test_measured_scripts_dont_wait_for_input():
+    measurement = measure_script("ask.py", "name = input('Name? ')\nprint(name)\n", "python ask.py", repeats=1, timeout=10)
+
+    # stdin is empty rather than the terminal, so input() fails straight away instead of blocking
+    assert measurement.returncode == 1
+    assert "EOFError" in measurement.stderr
+
+
+def test_same_behaviour_compares_output_of_deterministic_scripts():
+    baseline = make_measurement()
+
+    assert same_behaviour(baseline, make_measurement(median_seconds=0.1))
+    assert not same_behaviour(baseline, make_measurement(stdout="41\n"))
+    assert not same_behaviour(baseline, make_measurement(output_hashes=["def"]))
+    assert not same_behaviour(baseline, make_measurement(returncode=1))
+
+
+def test_same_behaviour_only_checks_exit_code_for_nondeterministic_scripts():
+    baseline = make_measurement(deterministic=False)
+
+    assert same_behaviour(baseline, make_measurement(stdout="random\n"))
+    assert not same_behaviour(baseline, make_measurement(returncode=1))
+
+
+def test_workload_runs_the_generated_script_on_the_users_files(tmp_path):
+    (tmp_path / "logs").mkdir()
+    (tmp_path / "words.txt").write_text("a b c\n")
+
+    command = workload_command("python guessed_name.py logs --words=words.txt --size 100 missing.txt", "find_duplicates", cwd=str(tmp_path))
+
+    assert command == f"python find_duplicates.py {tmp_path / 'logs'} --words={tmp_path / 'words.txt'} --size 100 missing.txt"
+    assert workload_command("python script.py | head", "find_duplicates", cwd=str(tmp_path)) is None
@@ -0,0 +1,30 @@
+import pytest
+from pydantic import ValidationError
+from src.llm import EvaluationResponse, PipAnalysisResult, ScriptParts
+from src.response_models import response_format, type_adapter, validate_response
+
+
+def test_nested_models_are_strict_too():
+    schema = response_format(ScriptParts)["json_schema"]["schema"]
+
+    assert schema["additionalProperties"] is False
+    assert schema["$defs"]["Step"]["additionalProperties"] is False
+    assert set(schema["required"]) == set(ScriptParts.model_fields)
+
+
+def test_response_format_is_strict_and_built_once():
+    first = response_format(EvaluationResponse)
+
+    assert first is response_format(EvaluationResponse)
+    assert first["type"] == "json_schema"
+    assert first["json_schema"]["strict"] is True
+    assert first["json_schema"]["schema"]["additionalProperties"] is False
+    assert type_adapter(EvaluationResponse) is type_adapter(EvaluationResponse)
+
+
+def test_validate_response():
+    result = validate_response(PipAnalysisResult, '{"fixed_packages": ["pillow"], "explanation": "PIL is pillow"}')
+
+    assert result == PipAnalysisResult(fixed_packages=["pillow"], explanation="PIL is pillow")
+    with pytest.raises(ValidationError):
+        validate_response(EvaluationResponse, '{"success": "maybe"}')
@@ -0,0 +1,70 @@
+from src.retrieval import ExampleIndex, format_examples, tokenize
+
+
+def make_index(tmp_path):
+    corpus = tmp_path / "examples"
+    corpus.mkdir()
+    (corpus / "weather_report.py").write_text("# Fetch the weather forecast for a city\nimport requests\ndef get_forecast(city):\n    return requests.get(f'https://wttr.in/{city}').text\n")
+    (corpus / "password_maker.py").write_text("# Generate strong random passwords\nimport secrets\ndef make_password(length):\n    return secrets.token_urlsafe(length)\n")
+    return ExampleIndex(sources=[corpus], directory=tmp_path / "index", good_scripts=tmp_path / "good")
+
+
+def test_tokenize_splits_identifiers_and_drops_boilerplate():
+    assert tokenize("def draw_mandala(args): parser.add_argument('--size')") == ["draw", "mandala", "size"]
+    assert tokenize("WeatherAPIClient") == ["weather", "api", "client"]
+
+
+def test_search_finds_the_most_similar_script(tmp_path):
+    index = make_index(tmp_path)
+    results = index.search("Show me the weather forecast for Paris")
+    assert [example.name for example in results] == ["weather_report"]
+    assert "get_forecast" in results[0].code
+    assert index.search("completely unrelated astronomy") == []
+
+
+def test_index_is_built_once_and_rebuilt_when_the_corpus_changes(tmp_path):
+    index = make_index(tmp_path)
+    index.search("password")
+    built = (tmp_path / "index" / "examples.bin").stat().st_mtime_ns
+
+    reopened = ExampleIndex(sources=index.sources, directory=tmp_path / "index", good_scripts=tmp_path / "good")
+    assert reopened.search("strong password")[0].name == "password_maker"
+    assert (tmp_path / "index" / "examples.bin").stat().st_mtime_ns == built
+
+    (tmp_path / "examples" / "tide_times.py").write_text("# Print tide times for a harbour\n")
+    reopened.load()
+    assert reopened.search("tide times for the harbour")[0].name == "tide_times"
+
+
+def test_good_scripts_become_examples(tmp_path):
+    index = make_index(tmp_path)
+    index.sources.append(tmp_path / "good")
+    assert index.search("convert currency exchange rates") == []
+    index.add_good_script("currency_converter", "# Convert between currencies using live exchange rates\n")
+    assert index.search("convert currency exchange rates")[0].name == "currency_converter"
+
+
+def test_missing_bundled_examples_are_skipped(tmp_path):
+    # An installed copy has no example-scripts folder, only the good scripts
+    index = ExampleIndex(sources=[tmp_path / "example-scripts", tmp_path / "good"], directory=tmp_path / "index", good_scripts=tmp_path / "good")
+    assert index.search("convert currency exchange rates") == []
+    index.add_good_script("currency_converter", "# Convert between currencies using live exchange rates\n")
+    assert index.search("convert currency exchange rates")[0].name == "currency_converter"
+
+
+def test_format_examples(tmp_path):
+    examples = make_index(tmp_path).search("weather forecast")
+    assert format_examples(examples).startswith("weather_report.py:\n```python\n# Fetch the weather")
+
+
+def test_whole_scripts_are_preferred_over_truncated_ones(tmp_path, monkeypatch):
+    monkeypatch.setattr("src.retrieval.MAX_EXAMPLE_CHARS", 200)
+    index = make_index(tmp_path)
+    (tmp_path / "examples" / "weather_station.py").write_text("# Weather forecast dashboard for a city\n" + "print('weather forecast')\n" * 20)
+
+    assert [example.name for example in index.search("weather forecast city", k=1)] == ["weather_report"]
+    results = index.search("weather forecast city")
+    by_name = {example.name: example for example in results}
+    assert not by_name["weather_report"].truncated and by_name["weather_station"].truncated
+    assert len(by_name["weather_station"].code) <= 200 and by_name["weather_station"].code.endswith("print('weather forecast')")
+    assert "weather_station.py (only the beginning, the rest is cut off):" in format_examples(results)
@@ -0,0 +1,97 @@
+import pytest
+from src.run_command import extract_arguments, infer_run_command
+
+
+def test_infer_positional_arguments_and_choices():
+    script = """
+import argparse
+def main():
+    parser = argparse.ArgumentParser(description="Generate color palettes.")
+    parser.add_argument("number_of_palettes", type=int, help="The number of color palettes to generate.")
+    parser.add_argument("color_scheme_type", choices=["complementary", "analogous", "triadic"], help="The type of color scheme to use.")
+    args = parser.parse_args()
+"""
+    command = infer_run_command("generate_color_palettes", script)
+
+    assert command == "python generate_color_palettes.py 3 complementary"
+
+
+def test_infer_optional_arguments_are_left_to_defaults():
+    script = """
+import argparse
+from pathlib import Path
+parser = argparse.ArgumentParser(description="Count the files in a directory.")
+parser.add_argument("--path", type=str, default=str(Path.home() / "Desktop"), help="The directory to count files in.")
+parser.add_argument("--extension", type=str, help="The file extension to filter by.")
+args = parser.parse_args()
+"""
+    assert infer_run_command("file_counter.py", script) == "python file_counter.py"
+
+
+def test_infer_subcommand_arguments():
+    script = """
+import argparse
+parser = argparse.ArgumentParser()
+subparsers = parser.add_subparsers(dest="command", help="Available commands")
+generate_parser = subparsers.add_parser("generate", help="Generate emoji art")
+generate_parser.add_argument("theme", help="Theme or mood for the art")
+generate_parser.add_argument("rows", type=int, help="Number of rows in the art")
+generate_parser.add_argument("cols", type=int, help="Number of columns in the art")
+add_emoji_parser = subparsers.add_parser("add_emoji", help="Add custom emojis")
+add_emoji_parser.add_argument("theme", help="Theme or mood for the custom emojis")
+add_emoji_parser.add_argument("emojis", nargs="+", help="Custom emojis to add")
+"""
+    command = infer_run_command("emoji_mood_art_generator.py", script)
+
+    assert command == "python emoji_mood_art_generator.py generate example 3 3"
+
+
+def test_infer_required_options_are_quoted():
+    script = """
+import argparse
+parser = argparse.ArgumentParser()
+parser.add_argument("--text", required=True, help="Text to print")
+parser.add_argument("--verbose", action="store_true")
+args = parser.parse_args()
+"""
+    assert infer_run_command("echo", script) == "python echo.py --text 'Hello, world!'"
+
+
+def test_infer_ignores_computed_help_text():
+    script = """
+import argparse
+WORKERS = 4
+parser = argparse.ArgumentParser()
+parser.add_argument("count", type=int)
+parser.add_argument("--workers", type=int, default=WORKERS, help=f"Workers (default: {WORKERS})")
+"""
+    assert infer_run_command("run.py", script) == "python run.py 3"
+
+
+def test_infer_falls_back_when_a_real_file_is_needed():
+    script = """
+import argparse
+parser = argparse.ArgumentParser()
+parser.add_argument("input_file")
+"""
+    assert infer_run_command("convert.py", script) is None
+
+
+def test_infer_falls_back_for_manual_argv_parsing():
+    script = "import sys\nprint(sys.argv[1])\n"
+
+    assert extract_arguments(script) is None
+    assert infer_run_command("manual.py", script) is None
+
+
+@pytest.mark.parametrize("imports", ["import click", "from typer import Typer", "import fire", "from docopt import docopt", "import click.testing"])
+def test_infer_falls_back_for_other_cli_libraries(imports):
+    script = f"{imports}\nprint('hello')\n"
+
+    assert extract_arguments(script) is None
+    assert infer_run_command("cli.py", script) is None
+
+
+def test_infer_falls_back_on_syntax_errors():
+    assert infer_run_command("broken.py", "def broken(:\n") is None
+
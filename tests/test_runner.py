@@ -0,0 +1,65 @@
+import subprocess
+import sys
+import pytest
+from src.runner import ForkServerRunner, script_argv
+
+SCRIPT = """
+import os
+import sys
+print("args:", sys.argv[1:])
+print("cwd:", os.path.basename(os.getcwd()))
+print("oops", file=sys.stderr)
+sys.exit(int(sys.argv[2]) if len(sys.argv) > 2 else 0)
+"""
+
+
+@pytest.fixture(scope="module")
+def runner():
+    return ForkServerRunner(preload=["json"])
+
+
+@pytest.fixture
+def script(tmp_path):
+    path = tmp_path / "echo_args.py"
+    path.write_text(SCRIPT)
+    return path
+
+
+def test_script_argv():
+    assert script_argv("python my_script.py --text 'Hello, world!'") == ["my_script.py", "--text", "Hello, world!"]
+    assert script_argv(f"{sys.executable} my_script.py") == ["my_script.py"]
+    assert script_argv("python my_script.py > out.txt") is None
+    assert script_argv("python -m http.server") is None
+    assert script_argv("node script.js") is None
+
+
+def test_forked_run_captures_output_and_exit_code(runner, script, tmp_path):
+    result = runner.run(f"python {script.name} hello 3", cwd=str(tmp_path))
+
+    assert result.returncode == 3
+    assert "args: ['hello', '3']" in result.stdout
+    assert f"cwd: {tmp_path.name}" in result.stdout
+    assert result.stderr.strip() == "oops"
+
+
+def test_forked_run_reports_uncaught_exceptions(runner, tmp_path):
+    (tmp_path / "crash.py").write_text("raise ValueError('boom')\n")
+
+    result = runner.run("python crash.py", cwd=str(tmp_path))
+
+    assert result.returncode == 1
+    assert "ValueError: boom" in result.stderr
+
+
+def test_shell_commands_fall_back_to_subprocess(runner, script, tmp_path):
+    result = runner.run(f"python {script.name} piped | cat", cwd=str(tmp_path))
+
+    assert result.returncode == 0
+    assert "args: ['piped']" in result.stdout
+
+
+def test_forked_run_timeout(runner, tmp_path):
+    (tmp_path / "sleepy.py").write_text("import time\ntime.sleep(10)\n")
+
+    with pytest.raises(subprocess.TimeoutExpired):
+        runner.run("python sleepy.py", cwd=str(tmp_path), timeout=0.5)
@@ -0,0 +1,87 @@
+import subprocess
+import sys
+import time
+from src.script_tests import InputFile, ScriptTestCase, format_test_results, render_pytest_suite, run_test_suite
+
+SCRIPT = """import argparse
+import sys
+import time
+parser = argparse.ArgumentParser()
+parser.add_argument("word")
+parser.add_argument("--save", action="store_true")
+parser.add_argument("--sleep", type=float, default=0)
+args = parser.parse_args()
+time.sleep(args.sleep)
+if args.word == "file":
+    args.word = open("input.txt").read().strip()
+print(args.word.upper())
+if args.save:
+    open("word.txt", "w").write(args.word)"""
+
+
+def make_case(name, arguments, **overrides):
+    case = dict(name=name, arguments=arguments, stdin="", input_files=[], expected_exit_code=0, stdout_contains=[], expected_files=[])
+    case.update(overrides)
+    return ScriptTestCase(**case)
+
+
+CASES = [
+    make_case("shouts", ["hello"], stdout_contains=["HELLO"]),
+    make_case("reads_input_file", ["file"], input_files=[InputFile(name="input.txt", content="from disk\n")], stdout_contains=["from disk"]),
+    make_case("saves", ["hi", "--save"], expected_files=["*.txt"]),
+    make_case("missing_word", [], expected_exit_code=2),
+]
+
+
+def test_run_test_suite_passes_good_cases():
+    results = run_test_suite("shout.py", SCRIPT, CASES)
+
+    assert [result.name for result in results] == ["shouts", "reads_input_file", "saves", "missing_word"]
+    assert all(result.passed for result in results), format_test_results(results)
+
+
+def test_run_test_suite_reports_failures():
+    cases = [
+        make_case("wrong_output", ["hello"], stdout_contains=["GOODBYE"]),
+        make_case("no_file", ["hello"], expected_files=["*.png"]),
+        make_case("crashes", ["file"]),
+        make_case("too_slow", ["hello", "--sleep", "5"]),
+    ]
+    results = run_test_suite("shout.py", SCRIPT, cases, timeout=1)
+
+    assert not any(result.passed for result in results)
+    assert "GOODBYE" in results[0].reason
+    assert "*.png" in results[1].reason
+    assert results[2].reason.startswith("exit code 1, expected 0") and "FileNotFoundError" in results[2].reason
+    assert results[3].reason == "timed out after 1s"
+
+
+def test_cases_run_in_parallel():
+    cases = [make_case(f"slow_{i}", ["hello", "--sleep", "1"]) for i in range(4)]
+    start = time.perf_counter()
+    results = run_test_suite("shout.py", SCRIPT, cases, workers=4)
+    assert all(result.passed for result in results)
+    # Four one-second cases, side by side
+    assert time.perf_counter() - start < 3
+
+
+def test_rendered_pytest_suite_runs(tmp_path):
+    (tmp_path / "shout.py").write_text(SCRIPT)
+    (tmp_path / "test_shout.py").write_text(render_pytest_suite("shout", CASES))
+
+    result = subprocess.run([sys.executable, "-m", "pytest", "-q", "-p", "no:cacheprovider", "test_shout.py"], capture_output=True, text=True, cwd=tmp_path)
+
+    assert result.returncode == 0, result.stdout
+    assert "4 passed" in result.stdout
+
+
+def test_input_files_outside_the_workspace_are_rejected(tmp_path):
+    cases = [
+        make_case("parent", ["file"], input_files=[InputFile(name="../input.txt", content="escaped\n")]),
+        make_case("absolute", ["file"], input_files=[InputFile(name=str(tmp_path / "input.txt"), content="escaped\n")]),
+    ]
+    results = run_test_suite("shout.py", SCRIPT, cases)
+
+    assert [result.reason for result in results] == ["input file '../input.txt' is outside the working directory", f"input file '{tmp_path / 'input.txt'}' is outside the working directory"]
+    assert not (tmp_path / "input.txt").exists()
+    assert "escaped" not in render_pytest_suite("shout", cases + CASES)
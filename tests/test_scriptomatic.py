@@ -1,11 +1,17 @@
+import subprocess
+import time
 import unittest
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from unittest.mock import patch, MagicMock
 from src.scriptomatic import Scriptomatic
+from src.budget import Budget, BudgetExceeded
+from src.partial_json import StreamEvent
 
 class TestScriptomatic(unittest.TestCase):
 
     def setUp(self):
-        self.scriptomatic = Scriptomatic()
+        # Keep the on-disk run cache and example index out of the tests
+        self.scriptomatic = Scriptomatic(cache=False, examples=False)
 
     @patch('src.scriptomatic.LLMProvider')
     def test_generate_script(self, mock_llm):
@@ -21,10 +27,34 @@ class TestScriptomatic(unittest.TestCase):
 
         self.assertEqual(result, "test_script.py")
         mock_llm.return_value.enhance_query.assert_called_once_with("Test prompt")
-        mock_llm.return_value.generate_structured_script_components.assert_called_once_with("enhanced prompt")
+        mock_llm.return_value.generate_structured_script_components.assert_called_once_with("enhanced prompt", on_component=None)
         mock_llm.return_value.generate_script_content.assert_called_once()
         self.scriptomatic._save_script.assert_called_once()
 
+    def test_example_search_starts_while_the_plan_streams(self):
+        self.scriptomatic.llm = MagicMock()
+        self.scriptomatic.example_index = MagicMock()
+        self.scriptomatic.example_index.search.return_value = []
+        self.scriptomatic._write_script = MagicMock(return_value="print('Hello, World!')")
+        self.scriptomatic._save_script = MagicMock(return_value="test_script.py")
+
+        def stream_plan(enhanced_prompt, on_component=None):
+            on_component(StreamEvent(key="description", value="Prints a greeting"))
+            on_component(StreamEvent(key="script_name", value="greeter"))
+            # The search is under way before the parameters and outputs have arrived
+            for _ in range(100):
+                if self.scriptomatic.example_index.search.called:
+                    break
+                time.sleep(0.01)
+            self.scriptomatic.example_index.search.assert_called_once_with("Test prompt greeter Prints a greeting")
+            return "greeter", ["name"], ["greeting"], "Prints a greeting"
+        self.scriptomatic.llm.generate_structured_script_components.side_effect = stream_plan
+
+        self.scriptomatic.generate_script("Test prompt")
+
+        self.scriptomatic.example_index.search.assert_called_once()
+        self.assertEqual(self.scriptomatic.examples, [])
+
     @patch('builtins.open', new_callable=unittest.mock.mock_open)
     @patch('src.scriptomatic.clean_up_code')
     def test_save_script(self, mock_clean_up_code, mock_open):
@@ -55,6 +85,91 @@ class TestScriptomatic(unittest.TestCase):
         mock_llm.return_value.get_run_command.assert_called_once()
         mock_subprocess_run.assert_called_once()
         self.scriptomatic.evaluate_script_output.assert_called_once()
+    @patch('src.scriptomatic.LLMProvider')
+    def test_iterate_script_keeps_the_best_attempts_test_cases(self, mock_llm):
+        scriptomatic = Scriptomatic(cache=False, examples=False, test_suite=True)
+        scriptomatic.budget = Budget(max_iterations=2)
+        mock_llm.return_value.update_description.return_value = "description"
+        mock_llm.return_value.generate_script_content.return_value = "second attempt"
+        attempts = iter([(["first case"], 0), (["second case"], 1)])
+
+        def run_and_test_script(*args):
+            # The first attempt passes some of its tests, the second passes none
+            scriptomatic.test_cases, scriptomatic.last_returncode = next(attempts)
+            return False
+        scriptomatic.run_and_test_script = MagicMock(side_effect=run_and_test_script)
+
+        result = scriptomatic._iterate_script("test_script", "first attempt", "description", ["param1"], ["output1"], autoloop=True)
+
+        self.assertEqual(result, "first attempt")
+        self.assertEqual(scriptomatic.test_cases, ["first case"])
+    def test_failed_install_clears_the_last_exit_code(self):
+        self.scriptomatic.llm = MagicMock()
+        self.scriptomatic.llm.get_run_command.return_value = ("python test_script.py", "pip install missing-package")
+        self.scriptomatic.install_packages = MagicMock(return_value=(False, "No matching distribution"))
+        self.scriptomatic.last_returncode = 0
+
+        result = self.scriptomatic.run_and_evaluate_script("test_script.py", "print('Hello, World!')", "description", ["param1"], ["output1"])
+
+        self.assertFalse(result)
+        self.assertIsNone(self.scriptomatic.last_returncode)
+
+    @patch('src.scriptomatic.subprocess.run')
+    def test_installs_are_bounded_by_the_time_budget(self, mock_subprocess_run):
+        self.scriptomatic.budget = Budget(max_seconds=30)
+        mock_subprocess_run.side_effect = subprocess.TimeoutExpired("pip install slow-package", 30)
+
+        with self.assertRaises(BudgetExceeded):
+            self.scriptomatic.install_packages(["slow-package"])
+        self.assertLessEqual(mock_subprocess_run.call_args.kwargs["timeout"], 30)
+
+    def test_waiting_for_background_installs_is_bounded_by_the_time_budget(self):
+        self.scriptomatic.budget = Budget(max_seconds=30)
+        self.scriptomatic.prefetcher = MagicMock()
+        self.scriptomatic.prefetcher.wait.side_effect = FutureTimeoutError()
+
+        with self.assertRaises(BudgetExceeded):
+            self.scriptomatic._packages_to_install(["numpy"])
+        self.assertLessEqual(self.scriptomatic.prefetcher.wait.call_args.kwargs["timeout"], 30)
+
+    @patch('src.scriptomatic.measure_script')
+    def test_optimize_skips_scripts_whose_baseline_times_out(self, mock_measure_script):
+        self.scriptomatic.llm = MagicMock()
+        self.scriptomatic.llm.get_run_command.return_value = ("python test_script.py", "")
+        mock_measure_script.side_effect = subprocess.TimeoutExpired("python test_script.py", 300)
+
+        result = self.scriptomatic.optimize_script("test_script.py", "input()", "description")
+
+        self.assertEqual(result, "input()")
+        self.assertEqual(mock_measure_script.call_args.kwargs["timeout"], 300)
+        self.scriptomatic.llm.optimize_script_content.assert_not_called()
+
+    def make_lint_fixer(self, fixed_content):
+        scriptomatic = Scriptomatic(cache=False, examples=False, lint_fix=True)
+        scriptomatic.llm = MagicMock()
+        scriptomatic.llm.fix_performance_issues.return_value = fixed_content
+        return scriptomatic
+
+    SLOW_CODE = "text = ''\nfor word in ['a', 'b']:\n    text += word\nprint(text)\n"
+    FAST_CODE = "print(''.join(['a', 'b']))\n"
+
+    def test_lint_fix_accepts_an_unfenced_rewrite(self):
+        scriptomatic = self.make_lint_fixer(self.FAST_CODE)
+
+        self.assertEqual(scriptomatic._lint_script(self.SLOW_CODE), self.FAST_CODE)
+
+    def test_lint_fix_keeps_the_original_when_the_rewrite_is_empty(self):
+        for fixed_content in ["", "```python\n```", '"""Nothing here."""\n']:
+            scriptomatic = self.make_lint_fixer(fixed_content)
+
+            self.assertEqual(scriptomatic._lint_script(self.SLOW_CODE), self.SLOW_CODE)
+
+    def test_lint_fix_keeps_the_original_when_the_rewrite_fails_its_check(self):
+        scriptomatic = self.make_lint_fixer(f"```python\n{self.FAST_CODE}```")
+        verify = MagicMock(return_value=False)
+
+        self.assertEqual(scriptomatic._lint_script(self.SLOW_CODE, verify), self.SLOW_CODE)
+        verify.assert_called_once_with(self.FAST_CODE.strip())
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,80 @@
+import subprocess
+import sys
+from src.lib import clean_up_code
+from src.run_command import infer_run_command
+from src.templates import ScriptTemplateParts, TemplateArgument, render_script
+
+FUNCTIONS = """def shout(text, times):
+    # Repeat the text in capitals
+    return " ".join([text.upper()] * times)
+def run(args):
+    # Print the shouted text, or a quiet version
+    if args.quiet:
+        print(args.text.lower())
+    else:
+        print(shout(args.text, args.times))"""
+
+
+def make_parts(**overrides):
+    parts = dict(
+        imports=["import argparse", "import os"],
+        usage="Shout some text.\n\nHow to use:\n  python shout.py hello --times 3",
+        arguments=[
+            TemplateArgument(flags=["text"], type="str", default="", required=True, choices=[], help="Text to shout"),
+            TemplateArgument(flags=["--times", "-t"], type="int", default="2", required=False, choices=["1", "2", "3"], help="How many times"),
+            TemplateArgument(flags=["--quiet"], type="bool", default="False", required=False, choices=[], help="Whisper instead"),
+        ],
+        functions=FUNCTIONS,
+    )
+    parts.update(overrides)
+    return ScriptTemplateParts(**parts)
+
+
+def test_render_script_assembles_a_working_script(tmp_path):
+    content = render_script(make_parts())
+    code = clean_up_code(content)
+
+    assert code.count("import argparse") == 1
+    assert "parser.add_argument('--times', '-t', type=int, choices=[1, 2, 3], default=2, help='How many times')" in code
+    assert "parser.add_argument('--quiet', action=\"store_true\", help='Whisper instead')" in code
+    script = tmp_path / "shout.py"
+    script.write_text(code)
+    result = subprocess.run([sys.executable, str(script), "hey", "--times", "3"], capture_output=True, text=True)
+    assert result.stdout == "HEY HEY HEY\n"
+    assert "How to use" in subprocess.run([sys.executable, str(script), "--help"], capture_output=True, text=True).stdout
+
+
+def test_rendered_scripts_get_a_local_run_command():
+    code = clean_up_code(render_script(make_parts()))
+    assert infer_run_command("shout.py", code) == "python shout.py 'Hello, world!'"
+
+
+def test_errors_are_reported_by_the_skeleton(tmp_path):
+    script = tmp_path / "broken.py"
+    script.write_text(clean_up_code(render_script(make_parts(functions="def run(args):\n    raise ValueError('no luck')"))))
+    result = subprocess.run([sys.executable, str(script), "hey"], capture_output=True, text=True)
+    assert result.returncode == 1
+    assert result.stderr == "Error: no luck\n"
+
+
+def test_parts_that_dont_fit_the_template_are_rejected():
+    assert render_script(make_parts(functions="def main():\n    pass")) is None
+    assert render_script(make_parts(functions="def run(args):\n    print(")) is None
+
+
+def test_choices_and_defaults_follow_the_argument_type():
+    arguments = [
+        TemplateArgument(flags=["--level"], type="str", default="1", required=False, choices=["1", "2"], help="Level"),
+        TemplateArgument(flags=["--ratio"], type="float", default="1", required=False, choices=[], help="Ratio"),
+        TemplateArgument(flags=["--mode"], type="path", default="'fast'", required=False, choices=["fast", "slow"], help="Mode"),
+    ]
+    code = clean_up_code(render_script(make_parts(arguments=arguments)))
+
+    assert "parser.add_argument('--level', type=str, choices=['1', '2'], default='1', help='Level')" in code
+    assert "parser.add_argument('--ratio', type=float, default=1.0, help='Ratio')" in code
+    assert "parser.add_argument('--mode', type=str, choices=['fast', 'slow'], default='fast', help='Mode')" in code
+
+
+def test_values_that_dont_fit_the_type_are_rejected():
+    argument = TemplateArgument(flags=["--times"], type="int", default="two", required=False, choices=[], help="How many times")
+    assert render_script(make_parts(arguments=[argument])) is None
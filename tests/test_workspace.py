@@ -0,0 +1,46 @@
+import hashlib
+import os
+from src.workspace import RunWorkspace, describe_outputs
+
+
+def test_workspace_holds_the_script_and_is_removed_afterwards():
+    with RunWorkspace("my_script", "print('hi')") as workspace:
+        path = workspace.path
+        assert open(os.path.join(path, "my_script.py")).read() == "print('hi')"
+        assert workspace.collect_outputs() == []
+    assert not os.path.exists(path)
+
+
+def test_workspaces_are_isolated():
+    with RunWorkspace("a.py", "") as first, RunWorkspace("a.py", "") as second:
+        assert first.path != second.path
+
+
+def test_collect_outputs_hashes_created_files():
+    with RunWorkspace("art.py", "") as workspace:
+        os.makedirs(os.path.join(workspace.path, "frames"))
+        with open(os.path.join(workspace.path, "abstract_art.png"), "wb") as f:
+            f.write(b"png bytes")
+        with open(os.path.join(workspace.path, "frames", "0001.txt"), "w") as f:
+            f.write("frame")
+        outputs = workspace.collect_outputs()
+
+    assert [output.path for output in outputs] == ["abstract_art.png", "frames/0001.txt"]
+    assert outputs[0].size == 9
+    assert outputs[0].sha256 == hashlib.sha256(b"png bytes").hexdigest()
+    assert "abstract_art.png (9 bytes" in describe_outputs(outputs)
+
+
+def test_keep_outputs_copies_files_out(tmp_path):
+    with RunWorkspace("art.py", "", keep_outputs=str(tmp_path / "kept")) as workspace:
+        with open(os.path.join(workspace.path, "abstract_art.png"), "w") as f:
+            f.write("art")
+
+    assert (tmp_path / "kept" / "abstract_art.png").read_text() == "art"
+    assert not (tmp_path / "kept" / "art.py").exists()
+
+
+def test_tmpfs_workspace():
+    with RunWorkspace("a.py", "", tmpfs=True) as workspace:
+        if os.path.isdir("/dev/shm"):
+            assert workspace.path.startswith("/dev/shm")